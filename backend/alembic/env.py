@@ -0,0 +1,67 @@
+from logging.config import fileConfig
+
+from sqlalchemy import engine_from_config
+from sqlalchemy import pool
+
+from alembic import context
+
+from app.core.config import settings
+from app.core.database import Base
+# Import all models so Base.metadata knows about them
+from app.models import user, organization, asset, stage, material, audit, approval, upload_session, statistics  # noqa
+from app.services.audit_storage_service import DEFAULT_PARTITION, PARTITION_PATTERN
+
+config = context.config
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_name(name, type_, parent_names):
+    # 审计日志的按月分区 / 滚动表由 app.services.audit_storage_service 维护，不参与自动生成对比
+    if type_ == "table":
+        return not (PARTITION_PATTERN.match(name) or name == DEFAULT_PARTITION)
+    return True
+
+
+def run_migrations_offline() -> None:
+    """生成SQL脚本而不连接数据库: alembic upgrade head --sql"""
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        include_name=include_name,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
+            # SQLite 不支持大部分 ALTER TABLE，使用批量模式重建表
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,147 @@
+"""initial schema
+
+与此前 create_all 自动建表得到的结构（即分片上传与内容寻址存储之前的表）完全一致。
+已有数据库（由 create_all 建表）不要执行本迁移，先标记再升级:
+
+    alembic stamp 0001
+    alembic upgrade head
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 14:57:53.675492
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('audit_logs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=100), nullable=False),
+    sa.Column('action', sa.String(length=100), nullable=False),
+    sa.Column('resource_type', sa.String(length=100), nullable=False),
+    sa.Column('resource_id', sa.Integer(), nullable=True),
+    sa.Column('detail', sa.Text(), nullable=True),
+    sa.Column('ip_address', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_audit_logs_id', 'audit_logs', ['id'], unique=False)
+    op.create_table('organizations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('org_type', sa.String(length=50), nullable=False),
+    sa.Column('credit_code', sa.String(length=50), nullable=True),
+    sa.Column('contact_person', sa.String(length=100), nullable=True),
+    sa.Column('contact_phone', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('credit_code')
+    )
+    op.create_index('ix_organizations_id', 'organizations', ['id'], unique=False)
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=100), nullable=False),
+    sa.Column('hashed_password', sa.String(length=200), nullable=False),
+    sa.Column('real_name', sa.String(length=100), nullable=True),
+    sa.Column('role', sa.Enum('DATA_HOLDER', 'REGISTRY_CENTER', 'ASSESSOR', 'COMPLIANCE', 'REGULATOR', 'ADMIN', name='role'), nullable=False),
+    sa.Column('org_id', sa.Integer(), nullable=True),
+    sa.Column('is_active', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['org_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+    op.create_index('ix_users_username', 'users', ['username'], unique=True)
+    op.create_table('data_assets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=300), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('org_id', sa.Integer(), nullable=False),
+    sa.Column('current_stage', sa.Enum('RESOURCE_INVENTORY', 'ASSET_INVENTORY', 'USAGE_SCENARIO', 'COMPLIANCE_ASSESSMENT', 'QUALITY_REPORT', 'ACCOUNTING_GUIDANCE', 'VALUE_ASSESSMENT', 'OPERATION', name='assetstage'), nullable=True),
+    sa.Column('asset_type', sa.String(length=100), nullable=True),
+    sa.Column('data_classification', sa.String(length=50), nullable=True),
+    sa.Column('valuation_amount', sa.Numeric(precision=18, scale=2), nullable=True),
+    sa.Column('accounting_type', sa.String(length=50), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['org_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_data_assets_id', 'data_assets', ['id'], unique=False)
+    op.create_table('stage_records',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('asset_id', sa.Integer(), nullable=False),
+    sa.Column('stage', sa.Enum('RESOURCE_INVENTORY', 'ASSET_INVENTORY', 'USAGE_SCENARIO', 'COMPLIANCE_ASSESSMENT', 'QUALITY_REPORT', 'ACCOUNTING_GUIDANCE', 'VALUE_ASSESSMENT', 'OPERATION', name='assetstage'), nullable=False),
+    sa.Column('status', sa.Enum('DRAFT', 'SUBMITTED', 'APPROVED', 'REJECTED', name='stagestatus'), nullable=True),
+    sa.Column('submitted_by', sa.Integer(), nullable=True),
+    sa.Column('approved_by', sa.Integer(), nullable=True),
+    sa.Column('reject_reason', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['approved_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['asset_id'], ['data_assets.id'], ),
+    sa.ForeignKeyConstraint(['submitted_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_stage_records_id', 'stage_records', ['id'], unique=False)
+    op.create_table('approval_records',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('stage_record_id', sa.Integer(), nullable=False),
+    sa.Column('action', sa.String(length=20), nullable=False),
+    sa.Column('operator_id', sa.Integer(), nullable=False),
+    sa.Column('comment', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['operator_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['stage_record_id'], ['stage_records.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_approval_records_id', 'approval_records', ['id'], unique=False)
+    op.create_table('stage_materials',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('stage_record_id', sa.Integer(), nullable=False),
+    sa.Column('file_name', sa.String(length=500), nullable=False),
+    sa.Column('file_path', sa.String(length=1000), nullable=False),
+    sa.Column('file_size', sa.BigInteger(), nullable=True),
+    sa.Column('file_type', sa.String(length=50), nullable=True),
+    sa.Column('hash_sha256', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=True),
+    sa.Column('uploaded_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['stage_record_id'], ['stage_records.id'], ),
+    sa.ForeignKeyConstraint(['uploaded_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_stage_materials_id', 'stage_materials', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stage_materials_id', table_name='stage_materials')
+    op.drop_table('stage_materials')
+    op.drop_index('ix_approval_records_id', table_name='approval_records')
+    op.drop_table('approval_records')
+    op.drop_index('ix_stage_records_id', table_name='stage_records')
+    op.drop_table('stage_records')
+    op.drop_index('ix_data_assets_id', table_name='data_assets')
+    op.drop_table('data_assets')
+    op.drop_index('ix_users_username', table_name='users')
+    op.drop_index('ix_users_id', table_name='users')
+    op.drop_table('users')
+    op.drop_index('ix_organizations_id', table_name='organizations')
+    op.drop_table('organizations')
+    op.drop_index('ix_audit_logs_id', table_name='audit_logs')
+    op.drop_table('audit_logs')
@@ -0,0 +1,87 @@
+"""content-addressed blob store and resumable upload sessions
+
+material_blobs、upload_sessions、upload_parts 三张表，create_all 建表的旧数据库中没有。
+已有的材料文件不登记到 material_blobs，仍按 stage_materials.file_path 访问。
+早期版本的 0001 也包含这三张表，所以已存在的表跳过；按旧说明先 stamp 0001 再升级到最新、
+因而缺少这三张表的数据库，补建后回到最新版本:
+
+    alembic stamp 0001
+    alembic upgrade 0001b
+    alembic stamp head
+
+Revision ID: 0001b
+Revises: 0001
+Create Date: 2026-10-19 09:12:40.218734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001b'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _existing_tables() -> set:
+    # --sql 离线生成脚本时无法查询，按全新数据库处理
+    if op.get_context().as_sql:
+        return set()
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade() -> None:
+    existing = _existing_tables()
+    if 'material_blobs' not in existing:
+        op.create_table('material_blobs',
+        sa.Column('hash_sha256', sa.String(length=64), nullable=False),
+        sa.Column('file_path', sa.String(length=1000), nullable=False),
+        sa.Column('file_size', sa.BigInteger(), nullable=True),
+        sa.Column('ref_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('hash_sha256')
+        )
+    if 'upload_sessions' not in existing:
+        op.create_table('upload_sessions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('stage_record_id', sa.Integer(), nullable=False),
+        sa.Column('file_name', sa.String(length=500), nullable=False),
+        sa.Column('file_type', sa.String(length=50), nullable=True),
+        sa.Column('total_size', sa.BigInteger(), nullable=False),
+        sa.Column('part_size', sa.Integer(), nullable=False),
+        sa.Column('status', sa.Enum('ACTIVE', 'COMPLETED', name='uploadsessionstatus'), nullable=True),
+        sa.Column('material_id', sa.Integer(), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['material_id'], ['stage_materials.id'], ),
+        sa.ForeignKeyConstraint(['stage_record_id'], ['stage_records.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_upload_sessions_id', 'upload_sessions', ['id'], unique=False)
+    if 'upload_parts' not in existing:
+        op.create_table('upload_parts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('session_id', sa.Integer(), nullable=False),
+        sa.Column('part_number', sa.Integer(), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('hash_sha256', sa.String(length=64), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['session_id'], ['upload_sessions.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('session_id', 'part_number')
+        )
+        op.create_index('ix_upload_parts_id', 'upload_parts', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_upload_parts_id', table_name='upload_parts')
+    op.drop_table('upload_parts')
+    op.drop_index('ix_upload_sessions_id', table_name='upload_sessions')
+    op.drop_table('upload_sessions')
+    op.drop_table('material_blobs')
@@ -0,0 +1,35 @@
+"""keyset pagination indexes for data_assets and audit_logs
+
+Revision ID: 0002
+Revises: 0001b
+Create Date: 2026-10-18 15:05:12.118320
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_data_assets_created_at_id', 'data_assets', ['created_at', 'id'], unique=False)
+    op.create_index('ix_data_assets_org_created_at_id', 'data_assets', ['org_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_audit_logs_created_at_id', 'audit_logs', ['created_at', 'id'], unique=False)
+    op.create_index('ix_audit_logs_resource_created_at', 'audit_logs', ['resource_type', 'resource_id', 'created_at'], unique=False)
+    op.create_index('ix_audit_logs_user_created_at', 'audit_logs', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_audit_logs_action_created_at', 'audit_logs', ['action', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_audit_logs_action_created_at', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_user_created_at', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_resource_created_at', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_created_at_id', table_name='audit_logs')
+    op.drop_index('ix_data_assets_org_created_at_id', table_name='data_assets')
+    op.drop_index('ix_data_assets_created_at_id', table_name='data_assets')
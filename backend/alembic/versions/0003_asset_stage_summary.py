@@ -0,0 +1,50 @@
+"""asset_stage_summary table for dashboard statistics
+
+建表后按现有资产回填，之后由应用增量维护，
+python -m app.scripts.reconcile_stats 定期全量校正。
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 17:20:41.502317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STAGES = ('RESOURCE_INVENTORY', 'ASSET_INVENTORY', 'USAGE_SCENARIO', 'COMPLIANCE_ASSESSMENT', 'QUALITY_REPORT', 'ACCOUNTING_GUIDANCE', 'VALUE_ASSESSMENT', 'OPERATION')
+
+
+def upgrade() -> None:
+    # assetstage 枚举类型已由 0001 创建
+    stage_type = sa.Enum(*STAGES, name='assetstage').with_variant(
+        postgresql.ENUM(*STAGES, name='assetstage', create_type=False), 'postgresql'
+    )
+    op.create_table('asset_stage_summary',
+    sa.Column('org_id', sa.Integer(), nullable=False),
+    sa.Column('stage', stage_type, nullable=False),
+    sa.Column('asset_count', sa.Integer(), nullable=False),
+    sa.Column('valued_count', sa.Integer(), nullable=False),
+    sa.Column('valuation_total', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['org_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('org_id', 'stage')
+    )
+    op.execute(
+        "INSERT INTO asset_stage_summary (org_id, stage, asset_count, valued_count, valuation_total) "
+        "SELECT org_id, current_stage, COUNT(id), COUNT(valuation_amount), COALESCE(SUM(valuation_amount), 0) "
+        "FROM data_assets GROUP BY org_id, current_stage"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('asset_stage_summary')
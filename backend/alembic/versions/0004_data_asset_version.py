@@ -0,0 +1,28 @@
+"""optimistic locking version column on data_assets
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 18:02:13.840516
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('data_assets', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('data_assets', schema=None) as batch_op:
+        batch_op.drop_column('version')
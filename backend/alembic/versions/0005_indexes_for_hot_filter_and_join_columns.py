@@ -0,0 +1,41 @@
+"""indexes for hot filter and join columns
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 15:40:19.926737
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SUBMITTED = sa.text("status = 'SUBMITTED'")
+
+
+def upgrade() -> None:
+    # PostgreSQL 上 CREATE INDEX CONCURRENTLY 不阻塞写入，但不能在事务内执行
+    # uq_stage_records_submitted 要求现存数据中每个 (asset_id, stage) 至多一条 SUBMITTED 记录
+    with op.get_context().autocommit_block():
+        op.create_index('ix_data_assets_stage_created_at_id', 'data_assets', ['current_stage', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_data_assets_name_pattern', 'data_assets', ['name'], unique=False, postgresql_ops={'name': 'text_pattern_ops'}, postgresql_concurrently=True)
+        op.create_index('ix_stage_records_asset_stage_status', 'stage_records', ['asset_id', 'stage', 'status'], unique=False, postgresql_concurrently=True)
+        op.create_index('uq_stage_records_submitted', 'stage_records', ['asset_id', 'stage'], unique=True, sqlite_where=SUBMITTED, postgresql_where=SUBMITTED, postgresql_concurrently=True)
+        op.create_index('ix_approval_records_stage_record_id', 'approval_records', ['stage_record_id', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_stage_materials_record_name_version', 'stage_materials', ['stage_record_id', 'file_name', 'version'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stage_materials_record_name_version', table_name='stage_materials')
+    op.drop_index('ix_approval_records_stage_record_id', table_name='approval_records')
+    op.drop_index('uq_stage_records_submitted', table_name='stage_records')
+    op.drop_index('ix_stage_records_asset_stage_status', table_name='stage_records')
+    op.drop_index('ix_data_assets_name_pattern', table_name='data_assets')
+    op.drop_index('ix_data_assets_stage_created_at_id', table_name='data_assets')
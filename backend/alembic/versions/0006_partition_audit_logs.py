@@ -0,0 +1,119 @@
+"""monthly range partitioning of audit_logs
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 20:12:47.301552
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, user_id, username, action, resource_type, resource_id, detail, ip_address, created_at"
+INDEXES = [
+    ('ix_audit_logs_id', ['id']),
+    ('ix_audit_logs_created_at_id', ['created_at', 'id']),
+    ('ix_audit_logs_resource_created_at', ['resource_type', 'resource_id', 'created_at']),
+    ('ix_audit_logs_user_created_at', ['user_id', 'created_at']),
+    ('ix_audit_logs_action_created_at', ['action', 'created_at']),
+]
+
+# 为旧表中最早的月份到当前月之后 3 个月建分区（之后由 app/scripts/audit_maintenance.py 提前创建）
+CREATE_MONTH_PARTITIONS = """
+DO $$
+DECLARE
+    m date;
+    last date := (date_trunc('month', now()) + interval '3 months')::date;
+BEGIN
+    SELECT date_trunc('month', coalesce(min(created_at), now()))::date INTO m FROM audit_logs_legacy;
+    WHILE m <= last LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+            'audit_logs_' || to_char(m, 'YYYYMM'), m, (m + interval '1 month')::date
+        );
+        m := (m + interval '1 month')::date;
+    END LOOP;
+END $$
+"""
+
+
+def _rename_indexes(suffix_from: str, suffix_to: str) -> None:
+    for name, _ in INDEXES:
+        op.execute(f'ALTER INDEX {name}{suffix_from} RENAME TO {name}{suffix_to}')
+
+
+def upgrade() -> None:
+    op.execute("UPDATE audit_logs SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    if op.get_context().dialect.name != 'postgresql':
+        # SQLite 不分区：按月滚动表由维护脚本创建，这里只把分区键改为非空
+        with op.batch_alter_table('audit_logs', schema=None) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False, existing_server_default=sa.func.now())
+        return
+
+    # 分区表的主键必须包含分区键，改为 (id, created_at)；id 改为 bigint 以容纳数十亿行
+    op.rename_table('audit_logs', 'audit_logs_legacy')
+    _rename_indexes('', '_legacy')
+    op.execute('ALTER TABLE audit_logs_legacy RENAME CONSTRAINT audit_logs_pkey TO audit_logs_legacy_pkey')
+    op.execute('ALTER SEQUENCE audit_logs_id_seq AS bigint')
+    op.execute("""
+        CREATE TABLE audit_logs (
+            id BIGINT NOT NULL DEFAULT nextval('audit_logs_id_seq'),
+            user_id INTEGER NOT NULL,
+            username VARCHAR(100) NOT NULL,
+            action VARCHAR(100) NOT NULL,
+            resource_type VARCHAR(100) NOT NULL,
+            resource_id INTEGER,
+            detail TEXT,
+            ip_address VARCHAR(50),
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+            CONSTRAINT audit_logs_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute('ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id')
+    op.execute('CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT')
+    op.execute(CREATE_MONTH_PARTITIONS)
+    # 先建分区再建父表索引：父表上的索引自动在每个分区上创建
+    for name, columns in INDEXES:
+        op.create_index(name, 'audit_logs', columns, unique=False)
+    op.execute(f'INSERT INTO audit_logs ({COLUMNS}) SELECT {COLUMNS} FROM audit_logs_legacy')
+    op.drop_table('audit_logs_legacy')
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        with op.batch_alter_table('audit_logs', schema=None) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True, existing_server_default=sa.func.now())
+        return
+
+    # 已归档出库的月份不会恢复；降级前如需保留，先用维护脚本 --restore 导回
+    op.rename_table('audit_logs', 'audit_logs_partitioned')
+    _rename_indexes('', '_partitioned')
+    op.execute('ALTER TABLE audit_logs_partitioned RENAME CONSTRAINT audit_logs_pkey TO audit_logs_partitioned_pkey')
+    op.execute("""
+        CREATE TABLE audit_logs (
+            id INTEGER NOT NULL DEFAULT nextval('audit_logs_id_seq'),
+            user_id INTEGER NOT NULL,
+            username VARCHAR(100) NOT NULL,
+            action VARCHAR(100) NOT NULL,
+            resource_type VARCHAR(100) NOT NULL,
+            resource_id INTEGER,
+            detail TEXT,
+            ip_address VARCHAR(50),
+            created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+            CONSTRAINT audit_logs_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute(f'INSERT INTO audit_logs ({COLUMNS}) SELECT {COLUMNS} FROM audit_logs_partitioned')
+    op.execute('ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id')
+    op.execute('ALTER SEQUENCE audit_logs_id_seq AS integer')
+    op.drop_table('audit_logs_partitioned')
+    for name, columns in INDEXES:
+        op.create_index(name, 'audit_logs', columns, unique=False)
@@ -0,0 +1,85 @@
+"""tamper-evident hash chain for audit logs
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 21:42:44.404834
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHAIN_COLUMNS = [
+    ('chain_shard', sa.SmallInteger()),
+    ('chain_seq', sa.BigInteger()),
+    ('chain_hash', sa.String(length=64)),
+]
+
+
+def _month_tables() -> list:
+    """SQLite 上已滚动出的 audit_logs_YYYYMM 表；PostgreSQL 的分区随父表一起变更"""
+    if op.get_context().dialect.name == 'postgresql':
+        return []
+    return [name for name in sa.inspect(op.get_bind()).get_table_names() if re.match(r'^audit_logs_\d{6}$', name)]
+
+
+def upgrade() -> None:
+    op.create_table('audit_chain_heads',
+    sa.Column('shard', sa.SmallInteger(), autoincrement=False, nullable=False),
+    sa.Column('seq', sa.BigInteger(), nullable=False),
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.PrimaryKeyConstraint('shard')
+    )
+    op.create_table('audit_checkpoints',
+    sa.Column('leaf_index', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=False, nullable=False),
+    sa.Column('shard', sa.SmallInteger(), nullable=False),
+    sa.Column('first_seq', sa.BigInteger(), nullable=False),
+    sa.Column('last_seq', sa.BigInteger(), nullable=False),
+    sa.Column('start_hash', sa.String(length=64), nullable=False),
+    sa.Column('end_hash', sa.String(length=64), nullable=False),
+    sa.Column('min_created_at', sa.DateTime(), nullable=False),
+    sa.Column('max_created_at', sa.DateTime(), nullable=False),
+    sa.Column('root', sa.String(length=64), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    sa.PrimaryKeyConstraint('leaf_index')
+    )
+    with op.batch_alter_table('audit_checkpoints', schema=None) as batch_op:
+        batch_op.create_index('ix_audit_checkpoints_shard_last_seq', ['shard', 'last_seq'], unique=False)
+
+    op.create_table('audit_merkle_nodes',
+    sa.Column('level', sa.SmallInteger(), autoincrement=False, nullable=False),
+    sa.Column('idx', sa.BigInteger(), autoincrement=False, nullable=False),
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.PrimaryKeyConstraint('level', 'idx')
+    )
+    # 已有的行不上链（chain_shard 为空），校验时单独计数
+    for table in ['audit_logs'] + _month_tables():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for name, type_ in CHAIN_COLUMNS:
+                batch_op.add_column(sa.Column(name, type_, nullable=True))
+            batch_op.create_index(f'ix_{table}_chain_shard_seq', ['chain_shard', 'chain_seq'], unique=False)
+
+
+
+def downgrade() -> None:
+    for table in ['audit_logs'] + _month_tables():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(f'ix_{table}_chain_shard_seq')
+            for name, _ in reversed(CHAIN_COLUMNS):
+                batch_op.drop_column(name)
+
+    op.drop_table('audit_merkle_nodes')
+    with op.batch_alter_table('audit_checkpoints', schema=None) as batch_op:
+        batch_op.drop_index('ix_audit_checkpoints_shard_last_seq')
+
+    op.drop_table('audit_checkpoints')
+    op.drop_table('audit_chain_heads')
@@ -0,0 +1,81 @@
+"""material integrity scrubber
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 22:53:01.880169
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('material_scrub_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('cursor', sa.String(length=64), nullable=False),
+    sa.Column('total_blobs', sa.Integer(), nullable=False),
+    sa.Column('total_bytes', sa.BigInteger(), nullable=False),
+    sa.Column('scanned_blobs', sa.Integer(), nullable=False),
+    sa.Column('scanned_bytes', sa.BigInteger(), nullable=False),
+    sa.Column('mismatches', sa.Integer(), nullable=False),
+    sa.Column('missing', sa.Integer(), nullable=False),
+    sa.Column('errors', sa.Integer(), nullable=False),
+    sa.Column('workers', sa.Integer(), nullable=True),
+    sa.Column('bandwidth_mb_per_sec', sa.Float(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('material_scrub_runs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_material_scrub_runs_id'), ['id'], unique=False)
+
+    op.create_table('material_scrub_issues',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('run_id', sa.Integer(), nullable=False),
+    sa.Column('hash_sha256', sa.String(length=64), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('actual_sha256', sa.String(length=64), nullable=True),
+    sa.Column('file_path', sa.String(length=1000), nullable=True),
+    sa.Column('file_size', sa.BigInteger(), nullable=True),
+    sa.Column('detail', sa.Text(), nullable=True),
+    sa.Column('detected_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['run_id'], ['material_scrub_runs.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('material_scrub_issues', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_material_scrub_issues_hash_sha256'), ['hash_sha256'], unique=False)
+        batch_op.create_index(batch_op.f('ix_material_scrub_issues_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_material_scrub_issues_run_id'), ['run_id'], unique=False)
+
+    with op.batch_alter_table('material_blobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_verified_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('verify_status', sa.String(length=20), nullable=True))
+
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('material_blobs', schema=None) as batch_op:
+        batch_op.drop_column('verify_status')
+        batch_op.drop_column('last_verified_at')
+
+    with op.batch_alter_table('material_scrub_issues', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_material_scrub_issues_run_id'))
+        batch_op.drop_index(batch_op.f('ix_material_scrub_issues_id'))
+        batch_op.drop_index(batch_op.f('ix_material_scrub_issues_hash_sha256'))
+
+    op.drop_table('material_scrub_issues')
+    with op.batch_alter_table('material_scrub_runs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_material_scrub_runs_id'))
+
+    op.drop_table('material_scrub_runs')
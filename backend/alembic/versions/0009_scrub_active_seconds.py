@@ -0,0 +1,28 @@
+"""active scan time of material scrub runs
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 17:13:50.995899
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('material_scrub_runs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('active_seconds', sa.Float(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('material_scrub_runs', schema=None) as batch_op:
+        batch_op.drop_column('active_seconds')
@@ -1,13 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
+import tempfile
+from datetime import datetime
+from typing import BinaryIO, Iterator, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field, ValidationError
 
-from app.core.database import get_db
-from app.api.v1.auth import get_current_user
+from app.core.audit import log_audit, log_audit_async, client_ip
+from app.core.config import settings
+from app.core.cache import response_cache, asset_scope
+from app.core.database import get_db, get_async_db, get_read_sessionmaker
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.workers import run_io
+from app.api.v1.auth import get_current_user, get_current_user_async, get_read_user, get_read_user_async
+from app.api.v1.materials import MaterialOut
 from app.models.user import User, Role
 from app.models.asset import AssetStage
-from app.services.asset_service import create_asset, list_assets, get_asset
+from app.models.stage import StageStatus
+from app.services.asset_service import (
+    create_asset_async, list_assets_async, get_asset_async, get_asset_full_async, latest_materials, update_valuation_async,
+    select_asset_export,
+)
+from app.services.asset_import_service import IMPORT_FORMATS, iter_import_rows, bulk_create_assets
+from app.services.export_service import EXPORT_FORMATS, ExportError, check_format, iter_export
 
 router = APIRouter(prefix="/api/v1/assets", tags=["资产管理"])
 
@@ -19,6 +36,11 @@ class AssetCreate(BaseModel):
     data_classification: Optional[str] = None
 
 
+class ValuationInput(BaseModel):
+    valuation_amount: Optional[float] = Field(default=None, ge=0)
+    accounting_type: Optional[str] = None
+
+
 class AssetOut(BaseModel):
     id: int
     name: str
@@ -35,24 +57,214 @@ class AssetOut(BaseModel):
         from_attributes = True
 
 
+class OrganizationOut(BaseModel):
+    id: int
+    name: str
+    org_type: str
+
+    class Config:
+        from_attributes = True
+
+
+class ApprovalOut(BaseModel):
+    id: int
+    action: str
+    operator_id: int
+    comment: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class StageHistoryOut(BaseModel):
+    id: int
+    stage: AssetStage
+    status: StageStatus
+    submitted_by: Optional[int] = None
+    approved_by: Optional[int] = None
+    reject_reason: Optional[str] = None
+    created_at: Optional[datetime] = None
+    approvals: List[ApprovalOut]
+    materials: List[MaterialOut]  # 每个文件的最新版本
+
+    class Config:
+        from_attributes = True
+
+
+class AssetFullOut(AssetOut):
+    organization: Optional[OrganizationOut] = None
+    stage_records: List[StageHistoryOut]
+
+
+class ImportRowResult(BaseModel):
+    row: int
+    status: str  # created / error
+    asset_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class ImportReport(BaseModel):
+    created: int
+    failed: int
+    results: List[ImportRowResult]
+
+
 @router.post("", response_model=AssetOut)
-def create(data: AssetCreate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+async def create(data: AssetCreate, request: Request, db: AsyncSession = Depends(get_async_db), user: User = Depends(get_current_user_async)):
     if user.role not in (Role.DATA_HOLDER, Role.ADMIN):
         raise HTTPException(status_code=403, detail="只有数据持有方或管理员可以创建资产")
     if not user.org_id:
         raise HTTPException(status_code=400, detail="用户未关联组织")
-    asset = create_asset(db, data.name, data.description, user, data.asset_type, data.data_classification)
+    asset = await create_asset_async(db, data.name, data.description, user, data.asset_type, data.data_classification)
+    await log_audit_async(user.id, user.username, "create", "asset", asset.id, asset.name, client_ip(request))
     return asset
 
 
+def _import_format(request: Request, fmt: Optional[str]) -> str:
+    if fmt:
+        if fmt not in IMPORT_FORMATS:
+            raise HTTPException(status_code=400, detail=f"format 只支持 {', '.join(IMPORT_FORMATS)}")
+        return fmt
+    content_type = request.headers.get("content-type", "")
+    if "csv" in content_type:
+        return "csv"
+    if "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    raise HTTPException(status_code=415, detail="请使用 text/csv 或 application/x-ndjson 格式，或指定 format 参数")
+
+
+def _validated_rows(fileobj: BinaryIO, fmt: str) -> Iterator[tuple]:
+    for row_no, raw, error in iter_import_rows(fileobj, fmt):
+        if error:
+            yield row_no, None, error
+            continue
+        try:
+            yield row_no, AssetCreate.model_validate(raw), None
+        except ValidationError as e:
+            yield row_no, None, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+
+
+def _import(db: Session, user: User, fileobj: BinaryIO, fmt: str, batch_size: Optional[int]) -> ImportReport:
+    results = bulk_create_assets(db, user, _validated_rows(fileobj, fmt), batch_size)
+    created = sum(1 for r in results if r["status"] == "created")
+    return ImportReport(created=created, failed=len(results) - created, results=results)
+
+
+@router.post("/import", response_model=ImportReport)
+async def import_assets(
+    request: Request,
+    format: Optional[str] = None,
+    batch_size: Optional[int] = Query(default=None, ge=1, le=10000),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """批量导入资产：请求体为 CSV（首行表头）或 NDJSON，字段同单个创建接口；逐批提交并返回逐行结果"""
+    if user.role not in (Role.DATA_HOLDER, Role.ADMIN):
+        raise HTTPException(status_code=403, detail="只有数据持有方或管理员可以创建资产")
+    if not user.org_id:
+        raise HTTPException(status_code=400, detail="用户未关联组织")
+    fmt = _import_format(request, format)
+
+    # 请求体先落到临时文件（小文件留在内存），解析和入库在线程池中流式进行
+    with tempfile.SpooledTemporaryFile(max_size=settings.UPLOAD_PART_SIZE) as spool:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > settings.ASSET_IMPORT_MAX_BYTES:
+                raise HTTPException(status_code=413, detail="导入文件过大")
+            spool.write(chunk)
+        spool.seek(0)
+        report = await run_io(_import, db, user, spool, fmt, batch_size)
+
+    await log_audit_async(user.id, user.username, "import", "asset", None,
+                          f"format={fmt} created={report.created} failed={report.failed}", client_ip(request))
+    return report
+
+
 @router.get("", response_model=List[AssetOut])
-def list_all(stage: Optional[str] = None, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    return list_assets(db, user, stage)
+async def list_all(
+    response: Response,
+    stage: Optional[str] = None,
+    org_id: Optional[int] = None,
+    asset_type: Optional[str] = None,
+    data_classification: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_read_user_async),
+):
+    """分页列表：下一页游标通过 X-Next-Cursor 响应头返回，为空表示已到最后一页"""
+    assets, next_cursor = await list_assets_async(
+        db, user, stage, cursor, limit,
+        org_id=org_id, asset_type=asset_type, data_classification=data_classification, name_prefix=name_prefix,
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return assets
+
+
+@router.get("/export")
+def export_assets(
+    request: Request,
+    format: str = "csv",
+    stage: Optional[str] = None,
+    org_id: Optional[int] = None,
+    asset_type: Optional[str] = None,
+    data_classification: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+    session_factory=Depends(get_read_sessionmaker),
+    user: User = Depends(get_read_user),
+):
+    """导出全部符合条件的资产（csv / ndjson / parquet），过滤条件和数据权限同列表接口；
+    服务器端游标流式输出，内存占用与行数无关"""
+    try:
+        fmt = check_format(format)
+    except ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    stmt = select_asset_export(
+        user, stage, org_id=org_id, asset_type=asset_type, data_classification=data_classification, name_prefix=name_prefix,
+    )
+    log_audit(user.id, user.username, "export", "asset", None, f"format={fmt} {request.url.query}", client_ip(request))
+    filename = f"assets-{datetime.utcnow():%Y%m%dT%H%M%S}.{fmt}"
+    return StreamingResponse(
+        iter_export(session_factory, stmt, fmt),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/{asset_id}/full", response_model=AssetFullOut)
+async def full_detail(asset_id: int, db: AsyncSession = Depends(get_async_db), user: User = Depends(get_read_user_async)):
+    """资产完整详情：组织、按时间排序的阶段记录及其审批记录和最新版本材料"""
+    asset = await get_asset_full_async(db, asset_id, user)
+    if not asset:
+        raise HTTPException(status_code=404, detail="资产不存在或无权访问")
+    result = AssetFullOut.model_validate(asset)
+    for history, record in zip(result.stage_records, asset.stage_records):
+        history.materials = [MaterialOut.model_validate(m) for m in latest_materials(record.materials)]
+    return result
 
 
 @router.get("/{asset_id}", response_model=AssetOut)
-def detail(asset_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    asset = get_asset(db, asset_id, user)
+async def detail(asset_id: int, request: Request, db: AsyncSession = Depends(get_async_db), user: User = Depends(get_read_user_async)):
+    async def build():
+        asset = await get_asset_async(db, asset_id, user)
+        if not asset:
+            raise HTTPException(status_code=404, detail="资产不存在或无权访问")
+        return AssetOut.model_validate(asset)
+
+    return await response_cache.respond_async(request, user, [asset_scope(asset_id)], build)
+
+
+@router.put("/{asset_id}/valuation", response_model=AssetOut)
+async def set_valuation(asset_id: int, data: ValuationInput, request: Request, db: AsyncSession = Depends(get_async_db), user: User = Depends(get_current_user_async)):
+    if user.role not in (Role.ASSESSOR, Role.ADMIN):
+        raise HTTPException(status_code=403, detail="只有评估机构或管理员可以更新估值")
+    asset = await get_asset_async(db, asset_id, user)
     if not asset:
         raise HTTPException(status_code=404, detail="资产不存在或无权访问")
+    asset = await update_valuation_async(db, asset, data.valuation_amount, data.accounting_type)
+    await log_audit_async(user.id, user.username, "valuate", "asset", asset.id, str(asset.valuation_amount), client_ip(request))
     return asset
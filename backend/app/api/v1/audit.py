@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
 
-from app.core.database import get_db
-from app.api.v1.auth import get_current_user
+from app.core.audit import log_audit, client_ip
+from app.core.database import get_async_read_db, get_read_sessionmaker
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.api.v1.auth import get_read_user, get_read_user_async
 from app.models.user import User, Role
-from app.models.audit import AuditLog
+from app.services.audit_storage_service import list_audit_logs_async, select_audit_export
+from app.services.export_service import EXPORT_FORMATS, ExportError, check_format, iter_export
 
 router = APIRouter(prefix="/api/v1/audit", tags=["审计日志"])
 
@@ -27,25 +31,72 @@ class AuditLogOut(BaseModel):
         from_attributes = True
 
 
+def _check_role(user: User) -> None:
+    if user.role not in (Role.ADMIN, Role.REGISTRY_CENTER, Role.REGULATOR):
+        raise HTTPException(status_code=403, detail="无权查看审计日志")
+
+
 @router.get("", response_model=List[AuditLogOut])
-def list_audit_logs(
+async def list_audit_logs(
+    response: Response,
     action: Optional[str] = None,
     resource_type: Optional[str] = None,
+    resource_id: Optional[int] = None,
     user_id: Optional[int] = None,
-    limit: int = Query(default=50, le=200),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=200),
     offset: int = 0,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_read_user_async),
 ):
-    if current_user.role not in (Role.ADMIN, Role.REGISTRY_CENTER, Role.REGULATOR):
-        from fastapi import HTTPException
-        raise HTTPException(status_code=403, detail="无权查看审计日志")
+    """按时间倒序查询；翻页请使用 X-Next-Cursor 响应头返回的游标，offset 仅为兼容保留。
+    较早的月份可能已归档出库（见 app/scripts/audit_maintenance.py），不在查询结果中"""
+    _check_role(current_user)
+
+    logs, next_cursor = await list_audit_logs_async(
+        db, cursor, limit, offset,
+        action=action, resource_type=resource_type, resource_id=resource_id, user_id=user_id, since=since, until=until,
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return logs
 
-    query = db.query(AuditLog)
-    if action:
-        query = query.filter(AuditLog.action == action)
-    if resource_type:
-        query = query.filter(AuditLog.resource_type == resource_type)
-    if user_id:
-        query = query.filter(AuditLog.user_id == user_id)
-    return query.order_by(AuditLog.created_at.desc()).offset(offset).limit(limit).all()
+
+@router.get("/export")
+def export_audit_logs(
+    request: Request,
+    format: str = "csv",
+    action: Optional[str] = None,
+    resource_type: Optional[str] = None,
+    resource_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    session_factory=Depends(get_read_sessionmaker),
+    current_user: User = Depends(get_read_user),
+):
+    """导出完整审计记录（csv / ndjson / parquet），按写入顺序；服务器端游标流式输出，内存占用与行数无关。
+    导出操作本身也记入审计日志"""
+    _check_role(current_user)
+    try:
+        fmt = check_format(format)
+    except ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db = session_factory()
+    try:
+        statements = select_audit_export(
+            db.connection(),
+            action=action, resource_type=resource_type, resource_id=resource_id, user_id=user_id, since=since, until=until,
+        )
+    finally:
+        db.close()
+    log_audit(current_user.id, current_user.username, "export", "audit", None,
+              f"format={fmt} {request.url.query}", client_ip(request))
+    filename = f"audit-{datetime.utcnow():%Y%m%dT%H%M%S}.{fmt}"
+    return StreamingResponse(
+        iter_export(session_factory, statements, fmt),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,11 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional
 
-from app.core.database import get_db
-from app.core.security import verify_password, get_password_hash, create_access_token, decode_access_token, oauth2_scheme
+from app.core.config import settings
+from app.core.database import get_db, get_async_db
+from app.core.security import (
+    verify_password_async, get_password_hash_async, needs_rehash, create_access_token, decode_access_token, oauth2_scheme,
+    login_rate_limiter,
+)
+from app.core.user_cache import UserPrincipal, user_cache
 from app.models.user import User, Role
 
 router = APIRouter(prefix="/api/v1/auth", tags=["认证"])
@@ -36,40 +43,107 @@ class Token(BaseModel):
     user: UserOut
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    payload = decode_access_token(token)
-    user_id = payload.get("sub")
+def _token_user_id(token: str) -> int:
+    user_id = decode_access_token(token).get("sub")
     if user_id is None:
         raise HTTPException(status_code=401, detail="无效的认证凭据")
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    return int(user_id)
+
+
+def _cache_principal(user: Optional[User]) -> UserPrincipal:
     if user is None:
         raise HTTPException(status_code=401, detail="用户不存在")
-    return user
+    principal = UserPrincipal.from_user(user)
+    user_cache.set(principal)
+    return principal
+
+
+def _check_active(principal: UserPrincipal) -> UserPrincipal:
+    if not principal.is_active:
+        raise HTTPException(status_code=401, detail="用户已停用")
+    return principal
+
+
+def _token_principal(token: str) -> Optional[UserPrincipal]:
+    """开启 AUTH_TRUST_TOKEN_CLAIMS 时直接使用令牌中已签名的身份，账号停用要等令牌过期才生效"""
+    if settings.AUTH_TRUST_TOKEN_CLAIMS:
+        payload = decode_access_token(token)
+        if {"sub", "role", "org_id"} <= payload.keys():
+            return UserPrincipal(
+                id=int(payload["sub"]),
+                username=payload.get("username", ""),
+                role=Role(payload["role"]),
+                org_id=payload["org_id"],
+            )
+    return None
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> UserPrincipal:
+    user_id = _token_user_id(token)
+    principal = user_cache.get(user_id)
+    if principal is None:
+        principal = _cache_principal(db.query(User).filter(User.id == user_id).first())
+    return _check_active(principal)
 
 
+def get_read_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> UserPrincipal:
+    """只读接口的认证依赖，见 _token_principal"""
+    return _token_principal(token) or get_current_user(token, db)
+
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> UserPrincipal:
+    """async 接口的认证依赖，缓存未命中时用异步会话查库"""
+    user_id = _token_user_id(token)
+    principal = user_cache.get(user_id)
+    if principal is None:
+        principal = _cache_principal(await db.get(User, user_id))
+    return _check_active(principal)
+
+
+async def get_read_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> UserPrincipal:
+    return _token_principal(token) or await get_current_user_async(token, db)
+
+
+async def _get_user_by_name(db: AsyncSession, username: str) -> Optional[User]:
+    return (await db.execute(select(User).where(User.username == username))).scalar_one_or_none()
+
+
+# 注册与登录是协程：bcrypt 在进程池中执行，等待期间不占用 anyio 线程池，登录高峰不会拖慢其它同步接口
 @router.post("/register", response_model=UserOut)
-def register(data: UserCreate, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.username == data.username).first():
+async def register(data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    if await _get_user_by_name(db, data.username):
         raise HTTPException(status_code=400, detail="用户名已存在")
     user = User(
         username=data.username,
-        hashed_password=get_password_hash(data.password),
+        hashed_password=await get_password_hash_async(data.password),
         real_name=data.real_name,
         role=data.role,
         org_id=data.org_id,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    retry_after = login_rate_limiter.hit(form_data.username)
+    if retry_after is not None:
+        raise HTTPException(status_code=429, detail="登录尝试过于频繁，请稍后再试", headers={"Retry-After": str(retry_after)})
+
+    user = await _get_user_by_name(db, form_data.username)
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="用户名或密码错误")
-    token = create_access_token(data={"sub": str(user.id), "role": user.role.value})
+    login_rate_limiter.reset(form_data.username)
+
+    # bcrypt cost 调整后，在用户登录时透明地升级密码哈希
+    if needs_rehash(user.hashed_password):
+        user.hashed_password = await get_password_hash_async(form_data.password)
+        await db.commit()
+    token = create_access_token(data={
+        "sub": str(user.id), "role": user.role.value, "org_id": user.org_id, "username": user.username,
+    })
     return Token(access_token=token, user=UserOut.from_orm(user))
 
 
@@ -0,0 +1,81 @@
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+from typing import List, Optional
+
+from app.core.audit import audit_sink
+from app.core.config import settings
+from app.core.database import pool_metrics
+from app.core.metrics import route_metrics
+
+router = APIRouter(prefix="/api/v1/internal", tags=["内部监控"])
+
+
+class PoolStats(BaseModel):
+    name: str
+    checkouts: int
+    checkout_seconds_total: float
+    checkout_seconds_max: float
+    overflow_checkouts: int
+    connects: int
+    invalidations: int
+    pool_size: Optional[int] = None
+    checked_out: Optional[int] = None
+    checked_in: Optional[int] = None
+    overflow: Optional[int] = None
+
+
+def require_metrics_token(x_metrics_token: Optional[str] = Header(None)):
+    """监控接口默认关闭：部署时设置环境变量 METRICS_TOKEN，Prometheus 等抓取方在请求头
+    X-Metrics-Token 中携带相同的值。未配置令牌时拒绝所有请求，避免连接池与路由指标被匿名读取"""
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=403, detail="监控接口未启用，请配置 METRICS_TOKEN")
+    if not hmac.compare_digest((x_metrics_token or "").encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="无权访问监控接口")
+
+
+@router.get("/db-pool", response_model=List[PoolStats], dependencies=[Depends(require_metrics_token)])
+def db_pool_stats():
+    """各数据库引擎连接池的借出、等待、溢出与失效统计"""
+    return [metrics.snapshot() for metrics in pool_metrics]
+
+
+def _render_pool_metrics() -> str:
+    lines = []
+    fields = (
+        ("db_pool_checkouts_total", "checkouts", "counter"),
+        ("db_pool_checkout_seconds_total", "checkout_seconds_total", "counter"),
+        ("db_pool_checkout_seconds_max", "checkout_seconds_max", "gauge"),
+        ("db_pool_overflow_checkouts_total", "overflow_checkouts", "counter"),
+        ("db_pool_connects_total", "connects", "counter"),
+        ("db_pool_invalidations_total", "invalidations", "counter"),
+        ("db_pool_checked_out", "checked_out", "gauge"),
+        ("db_pool_overflow", "overflow", "gauge"),
+    )
+    snapshots = [metrics.snapshot() for metrics in pool_metrics]
+    for name, key, kind in fields:
+        lines.append(f"# TYPE {name} {kind}")
+        for snapshot in snapshots:
+            if snapshot.get(key) is not None:
+                lines.append(f'{name}{{pool="{snapshot["name"]}"}} {snapshot[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def _render_audit_metrics() -> str:
+    return (
+        "# TYPE audit_sink_pending gauge\n"
+        f"audit_sink_pending {audit_sink.pending()}\n"
+        "# TYPE audit_sink_dropped_total counter\n"
+        f"audit_sink_dropped_total {audit_sink.dropped}\n"
+    )
+
+
+@router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_metrics_token)])
+def prometheus_metrics():
+    """Prometheus 抓取接口：各路由的延迟直方图、SQL语句数、数据库耗时、返回行数，以及连接池与审计队列指标"""
+    return PlainTextResponse(
+        route_metrics.render() + _render_pool_metrics() + _render_audit_metrics(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
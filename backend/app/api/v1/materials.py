@@ -1,14 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Request, Header, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional
+from datetime import datetime
 
-from app.core.database import get_db
-from app.api.v1.auth import get_current_user
-from app.models.user import User
+from app.core.audit import log_audit_async, client_ip
+from app.core.cache import response_cache, materials_scope
+from app.core.database import get_db, get_async_db, get_read_db
+from app.core.workers import run_io
+from app.api.v1.auth import get_current_user, get_current_user_async, get_read_user, get_read_user_async
+from app.models.user import User, Role
 from app.models.stage import StageRecord
 from app.models.material import StageMaterial
-from app.services.material_service import save_material
+from app.models.upload_session import UploadSession, UploadSessionStatus
+from app.services.material_service import save_material_stream_async, file_chunk_source
+from app.services.scrub_service import scrub_status
+from app.services.upload_session_service import (
+    UploadSessionError, create_session, save_part, complete_session, received_ranges, missing_parts,
+)
 
 router = APIRouter(prefix="/api/v1/materials", tags=["材料管理"])
 
@@ -27,26 +38,199 @@ class MaterialOut(BaseModel):
         from_attributes = True
 
 
+class UploadSessionCreate(BaseModel):
+    file_name: str
+    file_type: str = ""
+    total_size: int
+    part_size: Optional[int] = None
+
+
+class UploadPartOut(BaseModel):
+    part_number: int
+    size: int
+    hash_sha256: str
+
+    class Config:
+        from_attributes = True
+
+
+class UploadSessionOut(BaseModel):
+    id: int
+    stage_record_id: int
+    file_name: str
+    total_size: int
+    part_size: int
+    total_parts: int
+    status: UploadSessionStatus
+    received_ranges: List[List[int]]
+    missing_parts: List[int]
+    material_id: Optional[int] = None
+
+
+def _session_out(upload_session: UploadSession) -> UploadSessionOut:
+    return UploadSessionOut(
+        id=upload_session.id,
+        stage_record_id=upload_session.stage_record_id,
+        file_name=upload_session.file_name,
+        total_size=upload_session.total_size,
+        part_size=upload_session.part_size,
+        total_parts=upload_session.total_parts,
+        status=upload_session.status,
+        received_ranges=[list(r) for r in received_ranges(upload_session)],
+        missing_parts=missing_parts(upload_session),
+        material_id=upload_session.material_id,
+    )
+
+
+def _get_own_session(db: Session, session_id: int, user: User) -> UploadSession:
+    upload_session = db.query(UploadSession).filter(UploadSession.id == session_id).first()
+    if not upload_session:
+        raise HTTPException(status_code=404, detail="上传会话不存在")
+    if upload_session.created_by != user.id:
+        raise HTTPException(status_code=403, detail="只能操作自己创建的上传会话")
+    return upload_session
+
+
 @router.post("/upload/{stage_record_id}", response_model=MaterialOut)
 async def upload(
     stage_record_id: int,
+    request: Request,
     file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user_async),
+):
+    if await db.get(StageRecord, stage_record_id) is None:
+        raise HTTPException(status_code=404, detail="阶段记录不存在")
+    # 分块读取上传文件，内存占用与文件大小无关；哈希和写盘在有界线程池执行，入库走异步驱动
+    material = await save_material_stream_async(
+        db, stage_record_id, file.filename, file_chunk_source(file.file), file.content_type or "", user.id,
+    )
+    await log_audit_async(user.id, user.username, "upload", "material", material.id,
+              f"{material.file_name} v{material.version} sha256={material.hash_sha256}", client_ip(request))
+    return material
+
+
+class ScrubRunOut(BaseModel):
+    id: int
+    status: str
+    started_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    active_seconds: float
+    total_blobs: int
+    total_bytes: int
+    scanned_blobs: int
+    scanned_bytes: int
+    percent: float
+    mb_per_sec: Optional[float] = None
+    eta_seconds: Optional[int] = None
+    mismatches: int
+    missing: int
+    errors: int
+
+
+class ScrubIssueOut(BaseModel):
+    hash_sha256: str
+    status: str
+    actual_sha256: Optional[str] = None
+    file_path: Optional[str] = None
+    detail: Optional[str] = None
+    detected_at: Optional[datetime] = None
+    run_id: int
+    material_ids: List[int]
+
+
+class ScrubStatusOut(BaseModel):
+    run: Optional[ScrubRunOut] = None
+    never_verified_blobs: int
+    issues: List[ScrubIssueOut]
+
+
+@router.get("/integrity", response_model=ScrubStatusOut)
+def material_integrity(
+    issue_limit: int = Query(default=50, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+    user: User = Depends(get_read_user),
+):
+    """材料文件完整性巡检（app/scripts/scrub_materials.py）的进度与发现的问题，仅管理员可见"""
+    if user.role != Role.ADMIN:
+        raise HTTPException(status_code=403, detail="仅管理员可查看完整性巡检结果")
+    return scrub_status(db, issue_limit)
+
+
+@router.get("/{stage_record_id}", response_model=List[MaterialOut])
+async def list_materials(stage_record_id: int, request: Request, db: AsyncSession = Depends(get_async_db), user: User = Depends(get_read_user_async)):
+    async def build():
+        materials = await db.scalars(select(StageMaterial).where(
+            StageMaterial.stage_record_id == stage_record_id
+        ).order_by(StageMaterial.created_at.desc()))
+        return [MaterialOut.model_validate(m) for m in materials]
+
+    return await response_cache.respond_async(request, user, [materials_scope(stage_record_id)], build)
+
+
+@router.post("/upload/{stage_record_id}/sessions", response_model=UploadSessionOut)
+def initiate_upload_session(
+    stage_record_id: int,
+    data: UploadSessionCreate,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
     record = db.query(StageRecord).filter(StageRecord.id == stage_record_id).first()
     if not record:
         raise HTTPException(status_code=404, detail="阶段记录不存在")
+    try:
+        upload_session = create_session(
+            db, stage_record_id, data.file_name, data.file_type, data.total_size, user.id, data.part_size,
+        )
+    except UploadSessionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _session_out(upload_session)
 
-    file_bytes = await file.read()
-    file_type = file.content_type or ""
-    material = save_material(db, stage_record_id, file.filename, file_bytes, file_type, user.id)
-    return material
 
+@router.get("/upload-sessions/{session_id}", response_model=UploadSessionOut)
+def get_upload_session(session_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    return _session_out(_get_own_session(db, session_id, user))
 
-@router.get("/{stage_record_id}", response_model=List[MaterialOut])
-def list_materials(stage_record_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    materials = db.query(StageMaterial).filter(
-        StageMaterial.stage_record_id == stage_record_id
-    ).order_by(StageMaterial.created_at.desc()).all()
-    return materials
+
+@router.put("/upload-sessions/{session_id}/parts/{part_number}", response_model=UploadPartOut)
+async def upload_part(
+    session_id: int,
+    part_number: int,
+    request: Request,
+    x_content_sha256: Optional[str] = Header(default=None),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    upload_session = await run_io(_get_own_session, db, session_id, user)
+    # 分片最多 part_size 字节，超出即拒绝，内存占用有界
+    data = bytearray()
+    async for chunk in request.stream():
+        data.extend(chunk)
+        if len(data) > upload_session.part_size:
+            raise HTTPException(status_code=413, detail="分片超过会话约定的分片大小")
+    try:
+        return await run_io(save_part, db, upload_session, part_number, bytes(data), x_content_sha256)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _complete_own_session(db: Session, session_id: int, user: User) -> StageMaterial:
+    upload_session = _get_own_session(db, session_id, user)
+    try:
+        return complete_session(db, upload_session)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/upload-sessions/{session_id}/complete", response_model=MaterialOut)
+async def complete_upload_session(
+    session_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    material = await run_io(_complete_own_session, db, session_id, user)
+    await log_audit_async(user.id, user.username, "upload", "material", material.id,
+                          f"{material.file_name} v{material.version} sha256={material.hash_sha256}", client_ip(request))
+    return material
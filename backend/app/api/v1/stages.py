@@ -1,14 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
-from app.core.database import get_db
-from app.api.v1.auth import get_current_user
+from app.core.audit import log_audit_async, client_ip
+from app.core.database import get_async_db
+from app.api.v1.auth import get_current_user_async
 from app.models.user import User, Role
 from app.models.asset import DataAsset, AssetStage
 from app.models.stage import StageRecord, StageStatus
-from app.engine.lifecycle import submit_stage, approve_stage, reject_stage, LifecycleError
+from app.engine.lifecycle import (
+    submit_stage_async, approve_stage_async, reject_stage_async, review_stages_async, LifecycleError,
+)
 
 router = APIRouter(prefix="/api/v1/stages", tags=["生命周期"])
 
@@ -30,39 +33,89 @@ class RejectInput(BaseModel):
     reason: str = ""
 
 
+class BatchApproveInput(BaseModel):
+    record_ids: List[int] = Field(min_length=1, max_length=500)
+    comment: str = ""
+
+
+class BatchRejectInput(BaseModel):
+    record_ids: List[int] = Field(min_length=1, max_length=500)
+    reason: str = ""
+
+
+class BatchResultItem(BaseModel):
+    record_id: int
+    status: str  # approved / rejected / skipped / error
+    error: Optional[str] = None
+
+
 @router.post("/{asset_id}/submit", response_model=StageRecordOut)
-def submit(asset_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    asset = db.query(DataAsset).filter(DataAsset.id == asset_id).first()
+async def submit(
+    asset_id: int,
+    request: Request,
+    stage: Optional[AssetStage] = None,
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user_async),
+):
+    """提交当前阶段审批；资产处于并行评审组时用 stage 指定组内阶段"""
+    asset = await db.get(DataAsset, asset_id)
     if not asset:
         raise HTTPException(status_code=404, detail="资产不存在")
     try:
-        record = submit_stage(db, asset, user.id)
-        return record
+        record = await submit_stage_async(db, asset, user.id, stage)
     except LifecycleError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    await log_audit_async(user.id, user.username, "submit", "stage", record.id, record.stage.value, client_ip(request))
+    return record
 
 
 @router.post("/records/{record_id}/approve", response_model=StageRecordOut)
-def approve(record_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+async def approve(record_id: int, request: Request, db: AsyncSession = Depends(get_async_db), user: User = Depends(get_current_user_async)):
     if user.role not in (Role.REGISTRY_CENTER, Role.ADMIN):
         raise HTTPException(status_code=403, detail="只有登记中心或管理员可以审批")
-    record = db.query(StageRecord).filter(StageRecord.id == record_id).first()
+    record = await db.get(StageRecord, record_id)
     if not record:
         raise HTTPException(status_code=404, detail="阶段记录不存在")
     try:
-        return approve_stage(db, record, user.id)
+        record = await approve_stage_async(db, record, user.id)
     except LifecycleError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    await log_audit_async(user.id, user.username, "approve", "stage", record.id, record.stage.value, client_ip(request))
+    return record
 
 
 @router.post("/records/{record_id}/reject", response_model=StageRecordOut)
-def reject(record_id: int, data: RejectInput, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+async def reject(record_id: int, data: RejectInput, request: Request, db: AsyncSession = Depends(get_async_db), user: User = Depends(get_current_user_async)):
     if user.role not in (Role.REGISTRY_CENTER, Role.ADMIN):
         raise HTTPException(status_code=403, detail="只有登记中心或管理员可以退回")
-    record = db.query(StageRecord).filter(StageRecord.id == record_id).first()
+    record = await db.get(StageRecord, record_id)
     if not record:
         raise HTTPException(status_code=404, detail="阶段记录不存在")
     try:
-        return reject_stage(db, record, user.id, data.reason)
+        record = await reject_stage_async(db, record, user.id, data.reason)
     except LifecycleError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    await log_audit_async(user.id, user.username, "reject", "stage", record.id, data.reason, client_ip(request))
+    return record
+
+
+async def _batch_review(request: Request, db: AsyncSession, user: User, record_ids: List[int], action: str, comment: str) -> List[BatchResultItem]:
+    if user.role not in (Role.REGISTRY_CENTER, Role.ADMIN):
+        raise HTTPException(status_code=403, detail="只有登记中心或管理员可以审批")
+    results = await review_stages_async(db, record_ids, user.id, action, comment)
+    ip = client_ip(request)
+    for item in results:
+        if item["status"] in ("approved", "rejected"):
+            await log_audit_async(user.id, user.username, action, "stage", item["record_id"], comment, ip)
+    return results
+
+
+@router.post("/records/batch-approve", response_model=List[BatchResultItem])
+async def batch_approve(data: BatchApproveInput, request: Request, db: AsyncSession = Depends(get_async_db), user: User = Depends(get_current_user_async)):
+    """批量审批通过，逐条返回结果；status=skipped 表示记录正被其他审批处理，可稍后重试"""
+    return await _batch_review(request, db, user, data.record_ids, "approve", data.comment)
+
+
+@router.post("/records/batch-reject", response_model=List[BatchResultItem])
+async def batch_reject(data: BatchRejectInput, request: Request, db: AsyncSession = Depends(get_async_db), user: User = Depends(get_current_user_async)):
+    return await _batch_review(request, db, user, data.record_ids, "reject", data.reason)
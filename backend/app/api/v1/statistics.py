@@ -1,14 +1,16 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from pydantic import BaseModel
 from typing import List, Optional
 
-from app.core.database import get_db
-from app.api.v1.auth import get_current_user
+from app.core.cache import response_cache, STATISTICS_SCOPE
+from app.core.database import get_read_db
+from app.api.v1.auth import get_read_user
 from app.models.user import User, Role
-from app.models.asset import DataAsset, AssetStage
+from app.models.asset import STAGE_ORDER
 from app.models.organization import Organization
+from app.services.statistics_service import summary_rows
 
 router = APIRouter(prefix="/api/v1/statistics", tags=["统计分析"])
 
@@ -31,39 +33,37 @@ class HolderStats(BaseModel):
     total_valuation: float
 
 
-@router.get("/city", response_model=CityStats)
-def city_statistics(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    total = db.query(func.count(DataAsset.id)).scalar()
-    org_count = db.query(func.count(Organization.id)).scalar()
+def _stage_distribution(rows) -> List[StageDistribution]:
+    counts = {}
+    for row in rows:
+        counts[row.stage] = counts.get(row.stage, 0) + row.asset_count
+    return [StageDistribution(stage=stage.value, count=counts[stage]) for stage in STAGE_ORDER if counts.get(stage)]
+
 
-    stage_dist = db.query(
-        DataAsset.current_stage, func.count(DataAsset.id)
-    ).group_by(DataAsset.current_stage).all()
+@router.get("/city", response_model=CityStats)
+def city_statistics(request: Request, db: Session = Depends(get_read_db), user: User = Depends(get_read_user)):
+    def build():
+        rows = summary_rows(db)
+        org_count = db.query(func.count(Organization.id)).scalar()
+        return CityStats(
+            total_assets=sum(row.asset_count for row in rows),
+            stage_distribution=_stage_distribution(rows),
+            org_count=org_count,
+        )
 
-    return CityStats(
-        total_assets=total,
-        stage_distribution=[StageDistribution(stage=s.value if hasattr(s, 'value') else str(s), count=c) for s, c in stage_dist],
-        org_count=org_count,
-    )
+    return response_cache.respond(request, user, [STATISTICS_SCOPE], build)
 
 
 @router.get("/holder", response_model=HolderStats)
-def holder_statistics(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    query = db.query(DataAsset)
-    if user.role == Role.DATA_HOLDER and user.org_id:
-        query = query.filter(DataAsset.org_id == user.org_id)
-
-    total = query.count()
-    stage_dist = query.with_entities(
-        DataAsset.current_stage, func.count(DataAsset.id)
-    ).group_by(DataAsset.current_stage).all()
-
-    valued = query.filter(DataAsset.valuation_amount.isnot(None)).count()
-    total_val = query.with_entities(func.coalesce(func.sum(DataAsset.valuation_amount), 0)).scalar()
-
-    return HolderStats(
-        total_assets=total,
-        stage_distribution=[StageDistribution(stage=s.value if hasattr(s, 'value') else str(s), count=c) for s, c in stage_dist],
-        valued_count=valued,
-        total_valuation=float(total_val),
-    )
+def holder_statistics(request: Request, db: Session = Depends(get_read_db), user: User = Depends(get_read_user)):
+    def build():
+        org_id = user.org_id if user.role == Role.DATA_HOLDER and user.org_id else None
+        rows = summary_rows(db, org_id)
+        return HolderStats(
+            total_assets=sum(row.asset_count for row in rows),
+            stage_distribution=_stage_distribution(rows),
+            valued_count=sum(row.valued_count for row in rows),
+            total_valuation=float(sum(row.valuation_total for row in rows)),
+        )
+
+    return response_cache.respond(request, user, [STATISTICS_SCOPE], build)
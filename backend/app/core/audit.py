@@ -1,12 +1,173 @@
-from functools import wraps
+import asyncio
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from fastapi import Request
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+from app.core.audit_chain import chain_records
+from app.core.config import settings
+from app.core.database import SessionLocal
 from app.models.audit import AuditLog
 
+logger = logging.getLogger(__name__)
+
+
+class AuditSink:
+    """审计日志批量写入器：事件先进入内存队列，达到条数阈值或时间间隔后一次性批量INSERT，
+    同一事务内接到哈希链尾（app/core/audit_chain.py）。
+    队列最多 max_buffer 条，数据库不可写期间超出的事件被丢弃并计入 dropped，写入失败按指数退避重试"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        synchronous: bool = False,
+        max_buffer: int = 100000,
+        max_retry_interval: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.synchronous = synchronous
+        self.max_buffer = max(max_buffer, batch_size)
+        self.max_retry_interval = max_retry_interval
+        self._clock = clock  # 退避计时用，测试时可替换
+        self.dropped = 0
+        self._buffer: List[dict] = []
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def configure(self, session_factory: Optional[Callable[[], Session]] = None, synchronous: Optional[bool] = None):
+        if session_factory is not None:
+            self.session_factory = session_factory
+        if synchronous is not None:
+            self.synchronous = synchronous
+
+    def emit(self, record: dict) -> None:
+        # 同步模式（测试）或已关闭时直接落库，保证不丢
+        if self.synchronous or self._closed:
+            self._write([record])
+            return
+        with self._cond:
+            if len(self._buffer) >= self.max_buffer:
+                self._drop(1)
+                return
+            self._buffer.append(record)
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+        self._ensure_started()
+
+    async def emit_async(self, record: dict) -> None:
+        """协程中使用：需要直接落库时在线程中写入，不阻塞事件循环；否则与 emit 一样只入队"""
+        if self.synchronous or self._closed:
+            await asyncio.to_thread(self._write, [record])
+            return
+        self.emit(record)
+
+    def flush(self) -> None:
+        with self._cond:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return
+        try:
+            self._write(batch)
+        except Exception:
+            # 写入失败时放回队首，下次重试；超出上限的部分丢弃最新的事件
+            with self._cond:
+                self._buffer[:0] = batch
+                overflow = len(self._buffer) - self.max_buffer
+                if overflow > 0:
+                    del self._buffer[-overflow:]
+                    self._drop(overflow)
+            raise
+
+    def close(self) -> None:
+        """停止后台线程并把剩余事件全部写入数据库"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._buffer)
+
+    def _drop(self, count: int) -> None:
+        # 调用方持有 self._cond；首次丢弃及此后每丢弃 max_buffer 条记一次日志，避免刷屏
+        before, self.dropped = self.dropped, self.dropped + count
+        if before == 0 or before // self.max_buffer != self.dropped // self.max_buffer:
+            logger.error("审计日志队列已满（%d 条），累计丢弃 %d 条", self.max_buffer, self.dropped)
+
+    def _write(self, batch: List[dict]) -> None:
+        with self._write_lock:
+            db = self.session_factory()
+            try:
+                chain_records(db, batch)
+                db.execute(insert(AuditLog), batch)  # executemany
+                db.commit()
+            finally:
+                db.close()
 
-def log_audit(db: Session, user_id: int, username: str, action: str, resource_type: str, resource_id: int = None, detail: str = "", ip_address: str = ""):
-    """记录审计日志（只INSERT，不可修改删除）"""
-    log = AuditLog(
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name="audit-sink", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        failures = 0
+        while True:
+            with self._cond:
+                if failures:
+                    # 写入失败后退避等待，队列积压的通知不会提前唤醒，只有 close() 会
+                    deadline = self._clock() + min(self.flush_interval * 2 ** failures, self.max_retry_interval)
+                    while not self._closed and self._clock() < deadline:
+                        self._cond.wait(deadline - self._clock())
+                elif not self._closed and len(self._buffer) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                closed = self._closed
+            if closed:
+                return  # 剩余事件由 close() 写入
+            try:
+                self.flush()
+                failures = 0
+            except Exception:
+                failures += 1
+                logger.exception("审计日志批量写入失败，%d 次连续失败后退避重试", failures)
+
+
+audit_sink = AuditSink(
+    SessionLocal,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    synchronous=settings.AUDIT_SYNC_WRITE,
+    max_buffer=settings.AUDIT_BUFFER_MAX,
+    max_retry_interval=settings.AUDIT_RETRY_MAX_SECONDS,
+)
+atexit.register(audit_sink.close)
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else ""
+
+
+def _audit_record(user_id: int, username: str, action: str, resource_type: str, resource_id: int, detail: str, ip_address: str) -> dict:
+    return dict(
         user_id=user_id,
         username=username,
         action=action,
@@ -14,6 +175,15 @@ def log_audit(db: Session, user_id: int, username: str, action: str, resource_ty
         resource_id=resource_id,
         detail=detail,
         ip_address=ip_address,
+        created_at=datetime.utcnow(),
     )
-    db.add(log)
-    db.commit()
+
+
+def log_audit(user_id: int, username: str, action: str, resource_type: str, resource_id: int = None, detail: str = "", ip_address: str = ""):
+    """记录审计日志（只INSERT，不可修改删除）；由 audit_sink 独立批量写入，不会提交调用方的事务"""
+    audit_sink.emit(_audit_record(user_id, username, action, resource_type, resource_id, detail, ip_address))
+
+
+async def log_audit_async(user_id: int, username: str, action: str, resource_type: str, resource_id: int = None, detail: str = "", ip_address: str = ""):
+    """log_audit 的协程版本，供 async 接口使用"""
+    await audit_sink.emit_async(_audit_record(user_id, username, action, resource_type, resource_id, detail, ip_address))
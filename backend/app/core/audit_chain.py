@@ -0,0 +1,61 @@
+import hashlib
+import json
+import os
+from typing import List, Mapping
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.audit import AuditChainHead
+
+# 每行 chain_hash = SHA-256(前一行 chain_hash + "\n" + 本行规范化内容)，每个分片各自成链。
+# id 由数据库分配、写入前未知，不参与哈希；链内位置由 (chain_shard, chain_seq) 确定
+GENESIS_HASH = "0" * 64
+CHAINED_FIELDS = ("user_id", "username", "action", "resource_type", "resource_id", "detail", "ip_address", "created_at")
+
+
+def _canonical(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def link_hash(prev_hash: str, shard: int, seq: int, row: Mapping) -> str:
+    payload = json.dumps(
+        [shard, seq] + [_canonical(row.get(field)) for field in CHAINED_FIELDS],
+        ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.sha256(f"{prev_hash}\n{payload}".encode("utf-8")).hexdigest()
+
+
+def _claim_head(db: Session) -> AuditChainHead:
+    """锁定一个分片的链尾。优先本进程固定的分片；被其它写入方占用时换任意空闲分片（SKIP LOCKED），
+    各进程的批量写入互不等待。SQLite 不支持行锁，写入本身已由数据库串行化"""
+    shards = max(settings.AUDIT_CHAIN_SHARDS, 1)
+    preferred = os.getpid() % shards
+    locked = select(AuditChainHead).with_for_update(skip_locked=True)
+    head = db.execute(locked.where(AuditChainHead.shard == preferred)).scalar_one_or_none()
+    if head is None:
+        head = db.execute(locked.where(AuditChainHead.shard < shards).limit(1)).scalar_one_or_none()
+    if head is None:
+        # 分片尚未初始化，或所有分片都在写入
+        try:
+            with db.begin_nested():
+                db.add(AuditChainHead(shard=preferred, seq=0, hash=GENESIS_HASH))
+        except IntegrityError:
+            pass
+        head = db.execute(
+            select(AuditChainHead).where(AuditChainHead.shard == preferred).with_for_update()
+        ).scalar_one()
+    return head
+
+
+def chain_records(db: Session, records: List[dict]) -> None:
+    """在调用方的事务中把一批待写入的审计记录接到某个分片的链尾，随该事务一起提交"""
+    head = _claim_head(db)
+    prev_hash, seq = head.hash, head.seq
+    for record in records:
+        seq += 1
+        prev_hash = link_hash(prev_hash, head.shard, seq, record)
+        record.update(chain_shard=head.shard, chain_seq=seq, chain_hash=prev_hash)
+    head.seq, head.hash = seq, prev_hash
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+
+# 版本作用域：写操作提交后递增对应计数，读接口的 ETag 由所依赖作用域的计数计算
+STATISTICS_SCOPE = "statistics"
+
+
+def asset_scope(asset_id: int) -> str:
+    return f"asset:{asset_id}"
+
+
+def materials_scope(stage_record_id: int) -> str:
+    return f"materials:{stage_record_id}"
+
+
+class CacheBackend:
+    """缓存后端接口：响应体存取 + 版本计数。多进程部署时换成共享实现（如 Redis）"""
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        raise NotImplementedError
+
+    def version_token(self, scopes: Sequence[str]) -> str:
+        """返回各作用域当前版本拼成的字符串；后端数据丢失（重启、清空）后不得与之前的取值重复"""
+        raise NotImplementedError
+
+    def bump(self, scopes: Sequence[str]) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """进程内 LRU，仅对当前 worker 可见"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._epoch = uuid.uuid4().hex[:8]  # 进程重启后版本从0开始，加上纪元避免复用旧 ETag
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def version_token(self, scopes: Sequence[str]) -> str:
+        with self._lock:
+            return self._epoch + ":" + ",".join(str(self._versions.get(scope, 0)) for scope in scopes)
+
+    def bump(self, scopes: Sequence[str]) -> None:
+        with self._lock:
+            for scope in scopes:
+                self._versions[scope] = self._versions.get(scope, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._epoch = uuid.uuid4().hex[:8]
+
+
+class RedisCacheBackend(CacheBackend):
+    """多个 worker 共享的 Redis 缓存，需要安装 redis 包"""
+
+    def __init__(self, url: str, prefix: str = "dap:cache:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis 需要安装 redis 包") from e
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(self._prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._client.set(self._prefix + key, value, ex=ttl)
+
+    def version_token(self, scopes: Sequence[str]) -> str:
+        epoch_key = self._prefix + "epoch"
+        values = self._client.mget([epoch_key] + [self._prefix + "v:" + scope for scope in scopes])
+        if values[0] is None:
+            # Redis 被清空后换新纪元
+            self._client.set(epoch_key, uuid.uuid4().hex[:8], nx=True)
+            values[0] = self._client.get(epoch_key)
+        return ":".join(v.decode() if v is not None else "0" for v in values)
+
+    def bump(self, scopes: Sequence[str]) -> None:
+        pipe = self._client.pipeline()
+        for scope in scopes:
+            pipe.incr(self._prefix + "v:" + scope)
+        pipe.execute()
+
+    def clear(self) -> None:
+        keys = list(self._client.scan_iter(self._prefix + "*"))
+        if keys:
+            self._client.delete(*keys)
+
+
+def _create_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCacheBackend(settings.CACHE_REDIS_URL)
+    return MemoryCacheBackend(settings.CACHE_MAX_ENTRIES)
+
+
+class ResponseCache:
+    """基于版本计数的 ETag/304 与序列化响应缓存，按角色+组织隔离（RBAC 过滤结果不同）"""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    def configure(self, backend: CacheBackend) -> None:
+        self.backend = backend
+
+    def bump(self, *scopes: str) -> None:
+        """在写事务提交后调用"""
+        self.backend.bump(scopes)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def _lookup(self, request: Request, user, scopes: Sequence[str]):
+        """返回 (etag, 响应头, 304 响应或已缓存的响应体)"""
+        role = getattr(user.role, "value", user.role)
+        token = self.backend.version_token(scopes)
+        # 版本号只在本进程内递增，其它 worker、脚本或直接 SQL 的写入不会使其变化；
+        # 把 TTL 周期编入 ETag，任何客户端的 304 最多陈旧一个 CACHE_TTL_SECONDS
+        ttl_epoch = int(time.time() // max(settings.CACHE_TTL_SECONDS, 1))
+        raw = f"{request.url.path}?{request.url.query}|{role}:{user.org_id}|{token}|{ttl_epoch}"
+        etag = '"' + hashlib.sha1(raw.encode()).hexdigest() + '"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+
+        # 只认本接口下发过的 ETag：不支持 "*"，否则不存在或无权访问的资源也会在 build() 校验之前返回 304
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return etag, headers, Response(status_code=304, headers=headers)
+        return etag, headers, self.backend.get("resp:" + etag)
+
+    def _store(self, etag: str, headers: dict, value: Any) -> Response:
+        body = json.dumps(jsonable_encoder(value), ensure_ascii=False, separators=(",", ":")).encode()
+        self.backend.set("resp:" + etag, body, settings.CACHE_TTL_SECONDS)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def respond(self, request: Request, user, scopes: Sequence[str], build: Callable[[], Any]) -> Response:
+        etag, headers, cached = self._lookup(request, user, scopes)
+        if isinstance(cached, Response):
+            return cached
+        if cached is not None:
+            return Response(content=cached, media_type="application/json", headers=headers)
+        return self._store(etag, headers, build())
+
+    async def respond_async(self, request: Request, user, scopes: Sequence[str], build: Callable[[], Awaitable[Any]]) -> Response:
+        """respond 的协程版本，build 为返回响应数据的协程函数"""
+        etag, headers, cached = self._lookup(request, user, scopes)
+        if isinstance(cached, Response):
+            return cached
+        if cached is not None:
+            return Response(content=cached, media_type="application/json", headers=headers)
+        return self._store(etag, headers, await build())
+
+
+response_cache = ResponseCache(_create_backend())
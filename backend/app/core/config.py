@@ -1,12 +1,64 @@
+from typing import Any, Dict, List
+
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "数据资产管理平台"
     DATABASE_URL: str = "postgresql://postgres:postgres@db:5432/data_asset"
+    DATABASE_READ_URL: str = ""  # 只读副本，统计、审计等只读接口使用；为空时使用主库
+    DATABASE_ASYNC_URL: str = ""  # 异步接口使用的连接串；为空时由 DATABASE_URL 换成 asyncpg/aiosqlite 驱动
+    DATABASE_READ_ASYNC_URL: str = ""  # 异步只读接口使用的副本连接串；为空时由 DATABASE_READ_URL 换驱动，两者都为空时使用主库
+    DB_POOL_SIZE: int = 10  # 连接池常驻连接数
+    DB_MAX_OVERFLOW: int = 20  # 超出常驻数后允许临时新建的连接数
+    DB_POOL_TIMEOUT: int = 30  # 借出连接的最长等待秒数
+    DB_POOL_RECYCLE: int = 1800  # 连接使用超过该秒数后重建，避免被数据库/代理断开
+    DB_POOL_PRE_PING: bool = True  # 借出前探活，自动丢弃失效连接
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # PostgreSQL statement_timeout，0 表示不限制
     SECRET_KEY: str = "change-me-in-production"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 480
     UPLOAD_DIR: str = "./uploads"
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 流式上传每次读取的块大小（字节）
+    UPLOAD_PART_SIZE: int = 8 * 1024 * 1024  # 分片上传默认分片大小
+    UPLOAD_MAX_PART_SIZE: int = 64 * 1024 * 1024
+    UPLOAD_IO_WORKERS: int = 4  # 材料哈希、写盘、入库的线程池大小，即并发上传上限
+    SCRUB_WORKERS: int = 0  # 材料完整性巡检的进程数，0 表示 CPU 核数
+    SCRUB_BANDWIDTH_MB_PER_SEC: float = 0  # 巡检读盘带宽上限（所有进程合计），0 表示不限制
+    SCRUB_READ_CHUNK_SIZE: int = 8 * 1024 * 1024  # 巡检每次从 mmap 中哈希的字节数
+    SCRUB_CHECKPOINT_SECONDS: float = 30  # 巡检进度和结果写库的间隔，中断后最多重做这么久的工作
+    AUDIT_BATCH_SIZE: int = 500  # 审计日志累积到该条数即批量写入
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0  # 或每隔该时间写入一次
+    AUDIT_SYNC_WRITE: bool = False  # 每条审计日志立即写入（测试用）
+    AUDIT_BUFFER_MAX: int = 100000  # 内存队列上限；数据库长时间不可写时超出的事件记日志后丢弃并计数
+    AUDIT_RETRY_MAX_SECONDS: float = 30.0  # 写入失败后按指数退避重试的最长间隔
+    AUDIT_PARTITION_PREMAKE_MONTHS: int = 3  # PostgreSQL 提前创建的月分区数
+    AUDIT_HOT_MONTHS: int = 2  # SQLite 主表只保留最近几个月，更早的数据按月移入 audit_logs_YYYYMM 表
+    AUDIT_ONLINE_MONTHS: int = 24  # 库中保留的月数，更早的月分区归档为压缩文件后从库中删除；0 表示不归档
+    AUDIT_ARCHIVE_DIR: str = "./audit_archive"
+    AUDIT_ARCHIVE_RETENTION_MONTHS: int = 0  # 归档文件按数据月份保留的月数，0 表示永久保留
+    AUDIT_CHAIN_SHARDS: int = 8  # 审计哈希链分片数，即可并发写入审计日志的进程数上限
+    AUDIT_CHECKPOINT_ROWS: int = 10000  # 每个检查点覆盖的单分片最大行数，校验任意范围时最多多算这么多行
+    AUDIT_VERIFY_WORKERS: int = 0  # 哈希链校验的进程数，0 表示 CPU 核数
+    USER_CACHE_TTL_SECONDS: int = 60  # 认证用户缓存有效期
+    USER_CACHE_MAX_SIZE: int = 10000
+    AUTH_TRUST_TOKEN_CLAIMS: bool = False  # 只读接口直接信任令牌中的角色/组织，不查库
+    PASSWORD_HASH_ROUNDS: int = 12  # bcrypt cost，修改后用户下次登录时自动重新哈希
+    PASSWORD_HASH_WORKERS: int = 2  # bcrypt 进程池大小，0 表示不用进程池：接口在有界 IO 线程池、脚本在当前线程计算
+    LOGIN_RATE_LIMIT_ATTEMPTS: int = 10  # 同一用户名在窗口内最多尝试次数
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: int = 60
+    DEFAULT_WORKFLOW: str = "standard"  # 生命周期工作流，见 app/engine/workflow.py
+    ASSET_TYPE_WORKFLOWS: Dict[str, str] = {}  # 按资产类型选择工作流，如 {"数据集": "parallel_review"}
+    WORKFLOW_DEFINITIONS: Dict[str, List[Any]] = {}  # 自定义工作流，同名时覆盖内置定义
+    ASSET_IMPORT_BATCH_SIZE: int = 1000  # 批量导入每批插入并提交的行数
+    ASSET_IMPORT_MAX_BYTES: int = 200 * 1024 * 1024  # 单次导入请求体上限
+    EXPORT_BATCH_SIZE: int = 1000  # 流式导出每次从服务器端游标读取的行数
+    CACHE_BACKEND: str = "memory"  # 响应缓存后端: memory（进程内）/ redis（多 worker 共享）
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_MAX_ENTRIES: int = 2000  # 进程内缓存的响应条数上限
+    CACHE_TTL_SECONDS: int = 300  # 兜底过期时间，覆盖未经服务层的写入（导入脚本、其它进程）
+    SERVER_TIMING_HEADER: bool = False  # 在响应头 Server-Timing 中返回本次请求的数据库耗时和语句数
+    SLOW_QUERY_MS: float = 500  # 单条SQL超过该毫秒数记慢查询日志，0 表示关闭
+    METRICS_TOKEN: str = ""  # 内部监控接口的访问令牌，抓取方以 X-Metrics-Token 头传入；为空时接口一律 403，设置环境变量 METRICS_TOKEN 后启用
 
     class Config:
         env_file = ".env"
@@ -1,23 +1,223 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.core.config import settings
 
-connect_args = {}
-if settings.DATABASE_URL.startswith("sqlite"):
-    connect_args["check_same_thread"] = False
 
-engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
+class PoolMetrics:
+    """连接池指标：借出次数与等待时间、溢出借出次数、新建连接数、失效次数"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.checkout_seconds_total = 0.0
+        self.checkout_seconds_max = 0.0
+        self.overflow_checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.pool = None
+        self._lock = threading.Lock()
+
+    def observe_checkout(self, seconds: float, overflow: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_seconds_total += seconds
+            self.checkout_seconds_max = max(self.checkout_seconds_max, seconds)
+            if overflow:
+                self.overflow_checkouts += 1
+
+    def incr(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            data = {
+                "name": self.name,
+                "checkouts": self.checkouts,
+                "checkout_seconds_total": round(self.checkout_seconds_total, 6),
+                "checkout_seconds_max": round(self.checkout_seconds_max, 6),
+                "overflow_checkouts": self.overflow_checkouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+            }
+        if isinstance(self.pool, QueuePool):
+            data.update(
+                pool_size=self.pool.size(),
+                checked_out=self.pool.checkedout(),
+                checked_in=self.pool.checkedin(),
+                overflow=max(self.pool.overflow(), 0),
+            )
+        return data
+
+
+def _instrumented_pool_class(metrics: PoolMetrics, base=QueuePool):
+    class InstrumentedQueuePool(base):
+        # 池重建（recreate）时沿用同一个类，指标不会丢失
+        def connect(self):
+            start = time.perf_counter()
+            connection = super().connect()
+            metrics.pool = self
+            metrics.observe_checkout(time.perf_counter() - start, self.checkedout() > self.size())
+            return connection
+
+    return InstrumentedQueuePool
+
+
+def _create_engine(url: str, metrics: PoolMetrics) -> Engine:
+    connect_args = {}
+    kwargs = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if url.startswith("sqlite"):
+        connect_args["check_same_thread"] = False
+    elif settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    # 内存SQLite只能用单连接池，其余数据库使用带监控的QueuePool
+    if ":memory:" not in url and url != "sqlite://":
+        kwargs.update(
+            poolclass=_instrumented_pool_class(metrics),
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+
+    new_engine = create_engine(url, connect_args=connect_args, **kwargs)
+    event.listen(new_engine, "connect", lambda *args: metrics.incr("connects"))
+    event.listen(new_engine, "invalidate", lambda *args: metrics.incr("invalidations"))
+    event.listen(new_engine, "soft_invalidate", lambda *args: metrics.incr("invalidations"))
+    return new_engine
+
+
+engine_metrics = PoolMetrics("primary")
+engine = _create_engine(settings.DATABASE_URL, engine_metrics)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+pool_metrics = [engine_metrics]
+
+# 只读副本：未配置 DATABASE_READ_URL 时与主库共用同一个引擎
+if settings.DATABASE_READ_URL:
+    read_engine_metrics = PoolMetrics("replica")
+    read_engine = _create_engine(settings.DATABASE_READ_URL, read_engine_metrics)
+    pool_metrics.append(read_engine_metrics)
+else:
+    read_engine = engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 
 class Base(DeclarativeBase):
     pass
 
 
+# 异步驱动：PostgreSQL 用 asyncpg，SQLite 用 aiosqlite
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_url(url: str) -> str:
+    """把同步连接串换成对应的异步驱动，如 postgresql:// -> postgresql+asyncpg://"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"不支持异步访问的数据库: {parsed.get_backend_name()}")
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+def _create_async_engine(url: str, metrics: PoolMetrics) -> AsyncEngine:
+    connect_args = {}
+    kwargs = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if url.startswith("postgresql") and settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+    if ":memory:" not in url:
+        kwargs.update(
+            poolclass=_instrumented_pool_class(metrics, AsyncAdaptedQueuePool),
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+
+    new_engine = create_async_engine(url, connect_args=connect_args, **kwargs)
+    event.listen(new_engine.sync_engine, "connect", lambda *args: metrics.incr("connects"))
+    event.listen(new_engine.sync_engine, "invalidate", lambda *args: metrics.incr("invalidations"))
+    event.listen(new_engine.sync_engine, "soft_invalidate", lambda *args: metrics.incr("invalidations"))
+    return new_engine
+
+
+class _AsyncSessionFactories:
+    """异步引擎在首次使用时才创建：只用同步接口的部署不需要安装 asyncpg，导入时也不加载驱动"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.primary: Optional[async_sessionmaker] = None
+        self.read: Optional[async_sessionmaker] = None
+
+    def _init(self) -> None:
+        with self._lock:
+            if self.primary is not None:
+                return
+            metrics = PoolMetrics("primary-async")
+            primary_engine = _create_async_engine(settings.DATABASE_ASYNC_URL or async_url(settings.DATABASE_URL), metrics)
+            pool_metrics.append(metrics)
+            read_engine_async = primary_engine
+            if settings.DATABASE_READ_ASYNC_URL or settings.DATABASE_READ_URL:
+                read_metrics = PoolMetrics("replica-async")
+                read_engine_async = _create_async_engine(
+                    settings.DATABASE_READ_ASYNC_URL or async_url(settings.DATABASE_READ_URL), read_metrics,
+                )
+                pool_metrics.append(read_metrics)
+            # 异步会话提交后不过期属性：过期属性在协程中访问会触发隐式IO而报错
+            self.read = async_sessionmaker(read_engine_async, expire_on_commit=False)
+            self.primary = async_sessionmaker(primary_engine, expire_on_commit=False)
+
+    def get(self, read: bool = False) -> async_sessionmaker:
+        if self.primary is None:
+            self._init()
+        return self.read if read else self.primary
+
+    async def dispose(self) -> None:
+        if self.primary is None:
+            return
+        engines = {self.primary.kw["bind"], self.read.kw["bind"]}
+        for async_engine in engines:
+            await async_engine.dispose()
+
+
+async_session_factories = _AsyncSessionFactories()
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """只读接口使用，可路由到只读副本"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_sessionmaker():
+    """流式导出等在响应体生成器中自行创建会话的接口使用"""
+    return ReadSessionLocal
+
+
+async def get_async_db():
+    async with async_session_factories.get()() as db:
+        yield db
+
+
+async def get_async_read_db():
+    """只读接口的异步会话，可路由到只读副本"""
+    async with async_session_factories.get(read=True)() as db:
+        yield db
@@ -0,0 +1,198 @@
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.slow_query")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "unmatched"  # 未匹配路由统一归类，避免按原始路径产生无限多的标签
+
+
+class RequestStats:
+    __slots__ = ("scope", "statements", "db_seconds", "rows")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+
+    @property
+    def route(self) -> str:
+        # 路由匹配后 FastAPI 把 APIRoute 写入 scope["route"]
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+# 当前请求的统计；同步接口在线程池中执行时上下文会被复制，指向同一个对象
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+
+class RouteMetrics:
+    """按 (方法, 路由模板, 状态码) 聚合的请求指标"""
+
+    def __init__(self):
+        self._latency: Dict[Tuple[str, str, str], _Histogram] = {}
+        self._db: Dict[Tuple[str, str], List[float]] = {}  # [语句数, 数据库耗时, 返回行数]
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        with self._lock:
+            key = (method, route, str(status))
+            histogram = self._latency.get(key)
+            if histogram is None:
+                histogram = self._latency[key] = _Histogram()
+            histogram.observe(seconds)
+            db = self._db.setdefault((method, route), [0, 0.0, 0])
+            db[0] += stats.statements
+            db[1] += stats.db_seconds
+            db[2] += stats.rows
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latency.clear()
+            self._db.clear()
+
+    def render(self) -> str:
+        """Prometheus 文本格式"""
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by route template.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            for (method, route, status), h in sorted(self._latency.items()):
+                labels = f'method="{method}",route="{_escape(route)}",status="{status}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, h.counts):
+                    cumulative += count
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {h.count}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {h.total:.6f}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {h.count}")
+
+            for name, index, help_text in (
+                ("http_request_db_statements_total", 0, "SQL statements executed while serving the route."),
+                ("http_request_db_seconds_total", 1, "Time spent in the database while serving the route."),
+                ("http_request_db_rows_total", 2, "Rows returned or affected (as reported by the DB driver)."),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for (method, route), values in sorted(self._db.items()):
+                    value = values[index]
+                    formatted = f"{value:.6f}" if isinstance(value, float) else str(value)
+                    lines.append(f'{name}{{method="{method}",route="{_escape(route)}"}} {formatted}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+route_metrics = RouteMetrics()
+
+
+def parameter_shape(parameters, executemany: bool = False) -> str:
+    """参数只记录类型，不记录值（避免把个人信息写进日志）"""
+    if executemany:
+        if not parameters:
+            return "[]"
+        return f"[{parameter_shape(parameters[0])} x {len(parameters)}]"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+    return type(parameters).__name__
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+        if cursor.rowcount and cursor.rowcount > 0:
+            stats.rows += cursor.rowcount
+    if settings.SLOW_QUERY_MS and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning(
+            "慢查询 %.1fms route=%s params=%s sql=%s",
+            elapsed * 1000,
+            stats.route if stats is not None else "-",
+            parameter_shape(parameters, executemany),
+            " ".join(statement.split()),
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # 执行失败时不会触发 after_cursor_execute，丢弃对应的开始时间
+    # 连接阶段的错误没有 cursor 属性
+    if getattr(context, "cursor", None) is not None and context.connection is not None:
+        starts = context.connection.info.get("query_start")
+        if starts:
+            starts.pop()
+
+
+class MetricsMiddleware:
+    """纯 ASGI 中间件：记录每个请求的耗时和数据库统计，可选写入 Server-Timing 响应头"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.SERVER_TIMING_HEADER:
+                    total_ms = (time.perf_counter() - start) * 1000
+                    value = (
+                        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} queries", '
+                        f"app;dur={total_ms:.2f}"
+                    )
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", value.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route_metrics.observe(scope["method"], stats.route, status, time.perf_counter() - start, stats)
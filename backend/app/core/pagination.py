@@ -0,0 +1,63 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import DateTime, literal, tuple_
+from sqlalchemy.dialects import sqlite
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: int) -> str:
+    """把 (created_at, id) 编码为不透明游标"""
+    payload = json.dumps([created_at.isoformat() if created_at else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return (datetime.fromisoformat(created_at) if created_at else None), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+
+
+def bind_datetime(value: Optional[datetime]):
+    # SQLite 以字符串保存时间，server_default 写入的值不带微秒；
+    # 绑定参数必须保持同一格式，否则相等的时间会被当成不相等
+    if value is not None and value.microsecond == 0:
+        return literal(value, DateTime().with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite"))
+    return literal(value, DateTime())
+
+
+def _keyset_statement(query, created_col, id_col, cursor: Optional[str], limit: int):
+    # Query 与 select() 都支持 filter/order_by/limit
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(created_col, id_col) < tuple_(bind_datetime(created_at), row_id))
+    return query.order_by(created_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+def _keyset_result(rows, created_col, id_col, limit: int):
+    if limit <= 0:
+        return [], None
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, created_col.key), getattr(last, id_col.key))
+
+
+def keyset_page(query, created_col, id_col, cursor: Optional[str], limit: int):
+    """按 (created_at, id) 倒序做键集分页，返回 (本页数据, 下一页游标)"""
+    rows = _keyset_statement(query, created_col, id_col, cursor, limit).all()
+    return _keyset_result(rows, created_col, id_col, limit)
+
+
+async def keyset_page_async(db, stmt, created_col, id_col, cursor: Optional[str], limit: int):
+    """keyset_page 的 AsyncSession 版本，stmt 为 select(Model)"""
+    result = await db.execute(_keyset_statement(stmt, created_col, id_col, cursor, limit))
+    return _keyset_result(result.scalars().all(), created_col, id_col, limit)
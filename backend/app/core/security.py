@@ -1,3 +1,9 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -7,18 +13,121 @@ from fastapi import HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
 from app.core.config import settings
+from app.core.workers import run_io
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 ALGORITHM = "HS256"
 
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_pool_lock = threading.Lock()
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+
+def _get_hash_pool() -> ProcessPoolExecutor:
+    global _hash_pool
+    if _hash_pool is None:
+        with _hash_pool_lock:
+            if _hash_pool is None:
+                # spawn: 子进程不继承父进程中的线程和数据库连接
+                _hash_pool = ProcessPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _hash_pool
+
+
+def _run_hash(func, *args):
+    """bcrypt 是CPU密集操作，交给独立进程池执行；PASSWORD_HASH_WORKERS=0 时在当前线程执行。
+    会阻塞调用线程直到哈希完成，只供脚本与初始化数据使用，接口请使用 *_async 版本"""
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return func(*args)
+    return _get_hash_pool().submit(func, *args).result()
+
+
+async def _run_hash_async(func, *args):
+    """在协程中等待进程池的结果，排队期间不占用任何线程；PASSWORD_HASH_WORKERS=0 时在有界线程池执行"""
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return await run_io(func, *args)
+    return await asyncio.wrap_future(_get_hash_pool().submit(func, *args))
+
+
+def shutdown_hash_pool() -> None:
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is not None:
+            _hash_pool.shutdown(wait=True)
+            _hash_pool = None
+
+
+def _checkpw(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 
+def _hashpw(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return _run_hash(_checkpw, plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    return _run_hash(_hashpw, password, settings.PASSWORD_HASH_ROUNDS)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hash_async(_checkpw, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hash_async(_hashpw, password, settings.PASSWORD_HASH_ROUNDS)
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """哈希的cost与当前配置不一致时需要重新哈希（格式: $2b$12$...）"""
+    try:
+        return int(hashed_password.split("$")[2]) != settings.PASSWORD_HASH_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+class LoginRateLimiter:
+    """按用户名的滑动窗口限流，登录风暴时在进入bcrypt之前就拒绝"""
+
+    def __init__(self, max_attempts: int, window_seconds: float, max_keys: int = 100000):
+        self.max_attempts = max_attempts
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._attempts: "OrderedDict[str, deque]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str) -> Optional[int]:
+        """记录一次尝试；超限时返回需要等待的秒数"""
+        now = time.monotonic()
+        with self._lock:
+            attempts = self._attempts.get(key)
+            if attempts is None:
+                attempts = self._attempts[key] = deque()
+            self._attempts.move_to_end(key)
+            while attempts and attempts[0] <= now - self.window_seconds:
+                attempts.popleft()
+            if len(attempts) >= self.max_attempts:
+                return int(attempts[0] + self.window_seconds - now) + 1
+            attempts.append(now)
+            while len(self._attempts) > self.max_keys:
+                self._attempts.popitem(last=False)
+            return None
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._attempts.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._attempts.clear()
+
+
+login_rate_limiter = LoginRateLimiter(settings.LOGIN_RATE_LIMIT_ATTEMPTS, settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.models.user import User, Role
+
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """认证后的用户身份快照，字段与 User 同名，接口和服务层可直接当作 User 使用"""
+    id: int
+    username: str
+    role: Role
+    org_id: Optional[int] = None
+    real_name: Optional[str] = None
+    is_active: int = 1
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserPrincipal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            role=user.role,
+            org_id=user.org_id,
+            real_name=user.real_name,
+            is_active=user.is_active,
+        )
+
+
+class UserCache:
+    """进程内按用户ID缓存身份信息（TTL + LRU），认证时命中即不再查库"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[UserPrincipal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def set(self, principal: UserPrincipal) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[principal.id] = (principal, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(settings.USER_CACHE_MAX_SIZE, settings.USER_CACHE_TTL_SECONDS)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    # 角色、组织变更或停用账号后立即失效；其它进程的缓存最多滞后 USER_CACHE_TTL_SECONDS
+    user_cache.invalidate(target.id)
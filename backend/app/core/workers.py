@@ -0,0 +1,39 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+_io_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    global _io_executor
+    if _io_executor is None:
+        with _lock:
+            if _io_executor is None:
+                _io_executor = ThreadPoolExecutor(
+                    max_workers=settings.UPLOAD_IO_WORKERS, thread_name_prefix="material-io",
+                )
+    return _io_executor
+
+
+async def run_io(func: Callable[..., T], *args, **kwargs) -> T:
+    """在有界线程池中执行阻塞的哈希/写盘/数据库操作，不占用事件循环"""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(get_io_executor(), ctx.run, functools.partial(func, *args, **kwargs))
+
+
+def shutdown_io_executor() -> None:
+    global _io_executor
+    with _lock:
+        if _io_executor is not None:
+            _io_executor.shutdown(wait=True)
+            _io_executor = None
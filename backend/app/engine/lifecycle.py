@@ -1,8 +1,17 @@
-from typing import Optional
+from typing import List, Optional
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy.orm.exc import StaleDataError
 
-from app.models.asset import DataAsset, AssetStage, STAGE_ORDER
+from app.core.cache import response_cache, asset_scope, STATISTICS_SCOPE
+from app.engine.workflow import WorkflowError, get_workflow, workflow_for
+from app.models.asset import DataAsset, AssetStage
+from app.models.approval import ApprovalRecord
 from app.models.stage import StageRecord, StageStatus
+from app.services.statistics_service import record_asset_change
 
 
 class LifecycleError(Exception):
@@ -10,67 +19,221 @@ class LifecycleError(Exception):
 
 
 def get_next_stage(current: AssetStage) -> Optional[AssetStage]:
-    idx = STAGE_ORDER.index(current)
-    if idx + 1 < len(STAGE_ORDER):
-        return STAGE_ORDER[idx + 1]
-    return None  # 已在运营阶段
+    """标准8步流程中的下一阶段；None 表示已在运营阶段"""
+    return get_workflow("standard").next_stage(current)
 
 
 def get_prev_stage(current: AssetStage) -> Optional[AssetStage]:
-    idx = STAGE_ORDER.index(current)
-    if idx > 0:
-        return STAGE_ORDER[idx - 1]
-    return None
-
-
-def submit_stage(db: Session, asset: DataAsset, user_id: int) -> StageRecord:
-    """提交当前阶段审批"""
+    return get_workflow("standard").prev_stage(current)
+
+
+def _approved_stages(db: Session, asset_id: int, stages) -> set:
+    """本轮进入该步骤以来审批通过的阶段。资产被退回后再次进入时，之前各轮的通过记录不算数；
+    本轮之前的最后一条阶段记录必然属于其它步骤，以它的 id 为界"""
+    stages = list(stages)
+    boundary = db.query(func.max(StageRecord.id)).filter(
+        StageRecord.asset_id == asset_id,
+        StageRecord.stage.notin_(stages),
+    ).scalar_subquery()
+    rows = db.query(StageRecord.stage).filter(
+        StageRecord.asset_id == asset_id,
+        StageRecord.stage.in_(stages),
+        StageRecord.status == StageStatus.APPROVED,
+        StageRecord.id > func.coalesce(boundary, 0),
+    ).distinct()
+    return {row.stage for row in rows}
+
+
+def submit_stage(db: Session, asset: DataAsset, user_id: int, stage: Optional[AssetStage] = None) -> StageRecord:
+    """提交当前步骤审批；并行评审组中用 stage 指定组内的阶段，默认提交 current_stage"""
+    stage = stage or asset.current_stage
+    workflow = workflow_for(asset)
+    if not workflow.can_submit(asset.current_stage, stage):
+        raise LifecycleError("该阶段不是资产当前可提交的阶段")
     existing = db.query(StageRecord).filter(
         StageRecord.asset_id == asset.id,
-        StageRecord.stage == asset.current_stage,
+        StageRecord.stage == stage,
         StageRecord.status == StageStatus.SUBMITTED,
     ).first()
     if existing:
         raise LifecycleError("当前阶段已提交审批，请等待审批结果")
+    if len(workflow.group(asset.current_stage)) > 1 and _approved_stages(db, asset.id, [stage]):
+        raise LifecycleError("该阶段已审批通过，请等待并行评审组内其它阶段")
 
     record = StageRecord(
         asset_id=asset.id,
-        stage=asset.current_stage,
+        stage=stage,
         status=StageStatus.SUBMITTED,
         submitted_by=user_id,
     )
     db.add(record)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # 并发提交同一阶段时由部分唯一索引 uq_stage_records_submitted 拒绝
+        db.rollback()
+        raise LifecycleError("当前阶段已提交审批，请等待审批结果")
     db.refresh(record)
     return record
 
 
-def approve_stage(db: Session, record: StageRecord, approver_id: int) -> StageRecord:
-    """审批通过，自动推进到下一阶段"""
+def _claim(db: Session, record: StageRecord, status: StageStatus, approver_id: int, reason: Optional[str] = None) -> None:
+    """条件更新 SUBMITTED -> status，并发审批同一记录时只有一个能成功"""
+    values = {StageRecord.status: status, StageRecord.approved_by: approver_id}
+    if reason is not None:
+        values[StageRecord.reject_reason] = reason
+    claimed = db.query(StageRecord).filter(
+        StageRecord.id == record.id,
+        StageRecord.status == StageStatus.SUBMITTED,
+    ).update(values, synchronize_session=False)
+    if not claimed:
+        raise LifecycleError("阶段记录已被其他审批人处理")
+    db.expire(record, ["status", "approved_by", "reject_reason"])
+
+
+def _approve(db: Session, record: StageRecord, approver_id: int, comment: str = "") -> DataAsset:
     if record.status != StageStatus.SUBMITTED:
         raise LifecycleError("只能审批已提交的阶段记录")
 
-    record.status = StageStatus.APPROVED
-    record.approved_by = approver_id
+    # PostgreSQL 下行锁串行化同一资产的审批；SQLite 等不支持行锁时由 DataAsset.version 乐观锁兜底
+    asset = db.query(DataAsset).filter(DataAsset.id == record.asset_id).with_for_update().first()
+    workflow = workflow_for(asset)
+    if not workflow.can_submit(asset.current_stage, record.stage):
+        raise LifecycleError("阶段记录与资产当前阶段不一致")
+    _claim(db, record, StageStatus.APPROVED, approver_id)
+
+    group = workflow.group(asset.current_stage)
+    # 并行评审组内全部阶段通过后才推进
+    if len(group) == 1 or _approved_stages(db, asset.id, group) == group:
+        try:
+            next_stage = workflow.next_stage(asset.current_stage, asset)
+        except WorkflowError as e:
+            raise LifecycleError(str(e))
+        if next_stage:
+            record_asset_change(db, asset.org_id, asset.current_stage, asset.valuation_amount, next_stage, asset.valuation_amount)
+            asset.current_stage = next_stage
+    # 即使未推进也递增版本号，使同一资产上的并发审批互相检测到冲突
+    flag_modified(asset, "current_stage")
+    db.add(ApprovalRecord(stage_record_id=record.id, action="approve", operator_id=approver_id, comment=comment))
+    db.flush()  # 版本号不符时在此抛出 StaleDataError
+    return asset
+
+
+def _reject(db: Session, record: StageRecord, approver_id: int, reason: str = "") -> DataAsset:
+    if record.status != StageStatus.SUBMITTED:
+        raise LifecycleError("只能退回已提交的阶段记录")
 
-    asset = db.query(DataAsset).filter(DataAsset.id == record.asset_id).first()
-    next_stage = get_next_stage(asset.current_stage)
-    if next_stage:
-        asset.current_stage = next_stage
+    asset = db.query(DataAsset).filter(DataAsset.id == record.asset_id).with_for_update().first()
+    workflow = workflow_for(asset)
+    if not workflow.can_submit(asset.current_stage, record.stage):
+        raise LifecycleError("阶段记录与资产当前阶段不一致")
+    _claim(db, record, StageStatus.REJECTED, approver_id, reason)
+    db.add(ApprovalRecord(stage_record_id=record.id, action="reject", operator_id=approver_id, comment=reason))
+
+    try:
+        target = workflow.reject_stage(asset.current_stage)
+    except WorkflowError as e:
+        raise LifecycleError(str(e))
+    if target != asset.current_stage:
+        # 退回到之前的步骤：并行评审组内其它待审批的阶段一并退回
+        siblings = db.query(StageRecord).filter(
+            StageRecord.asset_id == asset.id,
+            StageRecord.stage.in_(list(workflow.group(asset.current_stage) - {record.stage})),
+            StageRecord.status == StageStatus.SUBMITTED,
+        ).all()
+        for sibling in siblings:
+            _claim(db, sibling, StageStatus.REJECTED, approver_id, reason)
+            db.add(ApprovalRecord(stage_record_id=sibling.id, action="reject", operator_id=approver_id, comment=reason))
+        record_asset_change(db, asset.org_id, asset.current_stage, asset.valuation_amount, target, asset.valuation_amount)
+        asset.current_stage = target
+    # 与审批一样递增版本号，同一资产上并发的审批与退回互相检测到冲突
+    flag_modified(asset, "current_stage")
+    db.flush()
+    return asset
 
-    db.commit()
+
+def approve_stage(db: Session, record: StageRecord, approver_id: int) -> StageRecord:
+    """审批通过，自动推进到下一阶段"""
+    try:
+        asset = _approve(db, record, approver_id)
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise LifecycleError("资产已被其他审批修改，请刷新后重试")
+    except LifecycleError:
+        db.rollback()
+        raise
+    response_cache.bump(asset_scope(asset.id), STATISTICS_SCOPE)
     db.refresh(record)
     return record
 
 
 def reject_stage(db: Session, record: StageRecord, approver_id: int, reason: str = "") -> StageRecord:
-    """退回阶段"""
-    if record.status != StageStatus.SUBMITTED:
-        raise LifecycleError("只能退回已提交的阶段记录")
-
-    record.status = StageStatus.REJECTED
-    record.approved_by = approver_id
-    record.reject_reason = reason
-    db.commit()
+    """退回阶段，资产按工作流的退回规则留在本步骤或回到之前的步骤"""
+    try:
+        asset = _reject(db, record, approver_id, reason)
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise LifecycleError("资产已被其他审批修改，请刷新后重试")
+    except LifecycleError:
+        db.rollback()
+        raise
+    response_cache.bump(asset_scope(asset.id), STATISTICS_SCOPE)
     db.refresh(record)
     return record
+
+
+def review_stages(db: Session, record_ids: List[int], approver_id: int, action: str, comment: str = "") -> List[dict]:
+    """批量审批/退回，整批一个事务；单条失败只回滚该条（savepoint），返回逐条结果。
+    被其他事务锁定的记录跳过（FOR UPDATE SKIP LOCKED），由调用方稍后重试"""
+    if action not in ("approve", "reject"):
+        raise LifecycleError(f"不支持的审批操作: {action}")
+    ids = sorted(set(record_ids))
+    existing = {row.id for row in db.query(StageRecord.id).filter(StageRecord.id.in_(ids))}
+    records = db.query(StageRecord).filter(StageRecord.id.in_(ids)).with_for_update(skip_locked=True).all()
+    locked = existing - {record.id for record in records}
+
+    results = {}
+    for record_id in ids:
+        if record_id not in existing:
+            results[record_id] = dict(record_id=record_id, status="error", error="阶段记录不存在")
+        elif record_id in locked:
+            results[record_id] = dict(record_id=record_id, status="skipped", error="阶段记录正在被其他审批处理")
+
+    changed_assets = set()
+    # 按资产排序加锁，避免并发批次之间死锁
+    for record in sorted(records, key=lambda r: (r.asset_id, r.id)):
+        try:
+            with db.begin_nested():
+                if action == "approve":
+                    changed_assets.add(_approve(db, record, approver_id, comment).id)
+                else:
+                    changed_assets.add(_reject(db, record, approver_id, comment).id)
+            results[record.id] = dict(record_id=record.id, status="approved" if action == "approve" else "rejected")
+        except LifecycleError as e:
+            results[record.id] = dict(record_id=record.id, status="error", error=str(e))
+        except StaleDataError:
+            results[record.id] = dict(record_id=record.id, status="error", error="资产已被其他审批修改，请刷新后重试")
+    db.commit()
+
+    if changed_assets:
+        response_cache.bump(*[asset_scope(asset_id) for asset_id in changed_assets], STATISTICS_SCOPE)
+    return [results[record_id] for record_id in ids]
+
+
+# AsyncSession 版本：状态机逻辑只保留一份，通过 run_sync 在异步驱动上执行（不占用线程池）
+async def submit_stage_async(db: AsyncSession, asset: DataAsset, user_id: int, stage: Optional[AssetStage] = None) -> StageRecord:
+    return await db.run_sync(submit_stage, asset, user_id, stage)
+
+
+async def approve_stage_async(db: AsyncSession, record: StageRecord, approver_id: int) -> StageRecord:
+    return await db.run_sync(approve_stage, record, approver_id)
+
+
+async def reject_stage_async(db: AsyncSession, record: StageRecord, approver_id: int, reason: str = "") -> StageRecord:
+    return await db.run_sync(reject_stage, record, approver_id, reason)
+
+
+async def review_stages_async(db: AsyncSession, record_ids: List[int], approver_id: int, action: str, comment: str = "") -> List[dict]:
+    return await db.run_sync(review_stages, record_ids, approver_id, action, comment)
@@ -0,0 +1,181 @@
+"""
+声明式生命周期工作流。
+
+工作流是步骤列表，每个步骤为：
+  - 阶段名，如 "quality_report"
+  - 阶段名列表，表示并行评审组，组内阶段全部审批通过后才进入下一步，如 ["compliance_assessment", "quality_report"]
+  - {"stage": 阶段名或列表, "when": 守卫名}，守卫返回 False 时跳过该步骤
+  - {"stage": ..., "reject_to": 阶段名}，本步骤被退回时资产回到该阶段所在的步骤（只能是本步骤或之前的步骤），
+    未指定时留在本步骤重新提交
+
+启动时编译成以阶段为键的字典，状态转移只做 O(1) 查表。
+"""
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from app.core.config import settings
+from app.models.asset import AssetStage, STAGE_ORDER
+
+PUBLIC_CLASSIFICATION = "公共"
+
+# 守卫：参数为资产（任何带 asset_type / data_classification 属性的对象），返回是否执行该步骤
+GUARDS: Dict[str, Callable[[Any], bool]] = {
+    "not_public": lambda asset: getattr(asset, "data_classification", None) != PUBLIC_CLASSIFICATION,
+}
+
+BUILTIN_WORKFLOWS: Dict[str, List[Any]] = {
+    # 原有的8步串行流程
+    "standard": [stage.value for stage in STAGE_ORDER],
+    # 合规评估与质量报告并行评审，公共数据跳过价值评估
+    "parallel_review": [
+        "resource_inventory",
+        "asset_inventory",
+        "usage_scenario",
+        ["compliance_assessment", "quality_report"],
+        "accounting_guidance",
+        {"stage": "value_assessment", "when": "not_public"},
+        "operation",
+    ],
+}
+
+
+class WorkflowError(Exception):
+    pass
+
+
+class CompiledWorkflow:
+    __slots__ = ("name", "steps", "_step_index", "_group", "_next", "_prev", "_guard", "_reject")
+
+    def __init__(self, name: str, definition: List[Any]):
+        self.name = name
+        steps: List[Tuple[AssetStage, ...]] = []
+        guards: List[Optional[Callable[[Any], bool]]] = []
+        reject_to: List[Optional[AssetStage]] = []
+        for item in definition:
+            when = target = None
+            if isinstance(item, dict):
+                when = item.get("when")
+                target = _parse_stage(name, item["reject_to"]) if item.get("reject_to") else None
+                item = item.get("stage")
+            stages = tuple(_parse_stage(name, s) for s in (item if isinstance(item, (list, tuple)) else [item]))
+            if not stages:
+                raise WorkflowError(f"工作流 {name} 含有空步骤")
+            if when is not None and when not in GUARDS:
+                raise WorkflowError(f"工作流 {name} 引用了未知守卫: {when}")
+            steps.append(stages)
+            guards.append(GUARDS[when] if when else None)
+            reject_to.append(target)
+        if not steps:
+            raise WorkflowError(f"工作流 {name} 没有步骤")
+        if guards[0] is not None:
+            raise WorkflowError(f"工作流 {name} 的第一步不能带守卫")
+
+        self.steps = tuple(steps)
+        self._step_index: Dict[AssetStage, int] = {}
+        self._group: Dict[AssetStage, FrozenSet[AssetStage]] = {}
+        for i, stages in enumerate(steps):
+            for stage in stages:
+                if stage in self._step_index:
+                    raise WorkflowError(f"工作流 {name} 中阶段 {stage.value} 出现多次")
+                self._step_index[stage] = i
+                self._group[stage] = frozenset(stages)
+
+        # 资产的 current_stage 总是所在步骤的第一个阶段；转移表以它为键
+        entries = [stages[0] for stages in steps]
+        self._guard = {entry: guard for entry, guard in zip(entries, guards)}
+        self._next: Dict[AssetStage, Optional[AssetStage]] = {
+            entry: entries[i + 1] if i + 1 < len(entries) else None for i, entry in enumerate(entries)
+        }
+        self._prev: Dict[AssetStage, Optional[AssetStage]] = {
+            entry: entries[i - 1] if i > 0 else None for i, entry in enumerate(entries)
+        }
+        self._reject: Dict[AssetStage, AssetStage] = {}
+        for i, (entry, target) in enumerate(zip(entries, reject_to)):
+            if target is None:
+                self._reject[entry] = entry
+            elif self._step_index.get(target, i + 1) > i:
+                raise WorkflowError(f"工作流 {name} 中 {entry.value} 只能退回到本步骤或之前的步骤")
+            else:
+                self._reject[entry] = entries[self._step_index[target]]
+
+    def __contains__(self, stage: AssetStage) -> bool:
+        return stage in self._step_index
+
+    @property
+    def first_stage(self) -> AssetStage:
+        return self.steps[0][0]
+
+    def group(self, current: AssetStage) -> FrozenSet[AssetStage]:
+        """当前步骤中可以提交审批的阶段（并行组时多于一个）"""
+        try:
+            return self._group[current]
+        except KeyError:
+            raise WorkflowError(f"阶段 {current.value} 不在工作流 {self.name} 中")
+
+    def can_submit(self, current: AssetStage, stage: AssetStage) -> bool:
+        group = self._group.get(current)
+        return group is not None and stage in group
+
+    def next_stage(self, current: AssetStage, asset: Any = None) -> Optional[AssetStage]:
+        """下一步骤的入口阶段，跳过守卫不通过的步骤；None 表示已在最后一步"""
+        if current not in self._next:
+            raise WorkflowError(f"阶段 {current.value} 不在工作流 {self.name} 中")
+        stage = self._next[current]
+        while stage is not None:
+            guard = self._guard[stage]
+            if guard is None or guard(asset):
+                return stage
+            stage = self._next[stage]
+        return None
+
+    def reject_stage(self, current: AssetStage) -> AssetStage:
+        """当前步骤被退回后资产所处的阶段（步骤入口）；与 current 相同表示留在本步骤"""
+        try:
+            return self._reject[current]
+        except KeyError:
+            raise WorkflowError(f"阶段 {current.value} 不在工作流 {self.name} 中")
+
+    def prev_stage(self, current: AssetStage) -> Optional[AssetStage]:
+        if current not in self._prev:
+            raise WorkflowError(f"阶段 {current.value} 不在工作流 {self.name} 中")
+        return self._prev[current]
+
+
+def _parse_stage(workflow: str, value: Any) -> AssetStage:
+    try:
+        return AssetStage(value)
+    except ValueError:
+        raise WorkflowError(f"工作流 {workflow} 引用了未知阶段: {value}")
+
+
+_workflows: Dict[str, CompiledWorkflow] = {}
+_by_asset_type: Dict[str, CompiledWorkflow] = {}
+_default: Optional[CompiledWorkflow] = None
+
+
+def load_workflows() -> None:
+    """编译内置与 WORKFLOW_DEFINITIONS 中的工作流；配置错误时抛出 WorkflowError，阻止应用启动"""
+    global _workflows, _by_asset_type, _default
+    definitions = {**BUILTIN_WORKFLOWS, **settings.WORKFLOW_DEFINITIONS}
+    workflows = {name: CompiledWorkflow(name, definition) for name, definition in definitions.items()}
+    if settings.DEFAULT_WORKFLOW not in workflows:
+        raise WorkflowError(f"未定义默认工作流: {settings.DEFAULT_WORKFLOW}")
+    by_asset_type = {}
+    for asset_type, name in settings.ASSET_TYPE_WORKFLOWS.items():
+        if name not in workflows:
+            raise WorkflowError(f"资产类型 {asset_type} 引用了未定义的工作流: {name}")
+        by_asset_type[asset_type] = workflows[name]
+    _workflows, _by_asset_type, _default = workflows, by_asset_type, workflows[settings.DEFAULT_WORKFLOW]
+
+
+def get_workflow(name: str) -> CompiledWorkflow:
+    try:
+        return _workflows[name]
+    except KeyError:
+        raise WorkflowError(f"未定义的工作流: {name}")
+
+
+def workflow_for(asset: Any) -> CompiledWorkflow:
+    return _by_asset_type.get(getattr(asset, "asset_type", None), _default)
+
+
+load_workflows()
@@ -1,22 +1,41 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine, async_session_factories
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.workers import shutdown_io_executor
+from app.core.security import shutdown_hash_pool
+from app.core.audit import audit_sink
+from app.core.metrics import MetricsMiddleware
 from app.api.v1.auth import router as auth_router
 from app.api.v1.assets import router as assets_router
 from app.api.v1.stages import router as stages_router
 from app.api.v1.materials import router as materials_router
 from app.api.v1.audit import router as audit_router
 from app.api.v1.statistics import router as stats_router
+from app.api.v1.internal import router as internal_router
+
+# Import all models so relationship() string references resolve
+from app.models import user, organization, asset, stage, material, audit, approval, upload_session, statistics  # noqa
+
 
-# Import all models so Base.metadata knows about them
-from app.models import user, organization, asset, stage, material, audit, approval  # noqa
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await async_session_factories.dispose()
+    shutdown_io_executor()
+    shutdown_hash_pool()
+    audit_sink.close()
 
-app = FastAPI(title=settings.PROJECT_NAME)
 
-# Auto-create tables on startup (dev convenience, use Alembic in production)
-Base.metadata.create_all(bind=engine)
+# 表结构由 Alembic 迁移管理（alembic upgrade head），导入和启动时不访问数据库，首次请求才建立连接
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,7 +43,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Server-Timing"],
 )
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth_router)
 app.include_router(assets_router)
@@ -32,8 +53,21 @@ app.include_router(stages_router)
 app.include_router(materials_router)
 app.include_router(audit_router)
 app.include_router(stats_router)
+app.include_router(internal_router)
 
 
 @app.get("/api/health")
 def health_check():
+    """存活检查，不访问数据库"""
+    return {"status": "ok"}
+
+
+@app.get("/api/health/ready")
+def readiness_check():
+    """就绪检查：数据库可连接时返回 200，供负载均衡在滚动重启时判断"""
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except SQLAlchemyError:
+        return JSONResponse(status_code=503, content={"status": "unavailable"})
     return {"status": "ok"}
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, func
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index, func
 from app.core.database import Base
 
 
 class ApprovalRecord(Base):
     __tablename__ = "approval_records"
+    __table_args__ = (
+        # 阶段记录的审批历史（selectinload 按 stage_record_id IN 加载）
+        Index("ix_approval_records_stage_record_id", "stage_record_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     stage_record_id = Column(Integer, ForeignKey("stage_records.id"), nullable=False)
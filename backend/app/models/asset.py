@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Text, Numeric, func
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Text, Numeric, Index, func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -20,6 +20,15 @@ STAGE_ORDER = list(AssetStage)
 
 class DataAsset(Base):
     __tablename__ = "data_assets"
+    __table_args__ = (
+        # 列表键集分页: ORDER BY created_at DESC, id DESC
+        Index("ix_data_assets_created_at_id", "created_at", "id"),
+        Index("ix_data_assets_org_created_at_id", "org_id", "created_at", "id"),
+        # 按阶段筛选的列表（?stage=）
+        Index("ix_data_assets_stage_created_at_id", "current_stage", "created_at", "id"),
+        # 名称前缀搜索 LIKE 'x%'；PostgreSQL 非 C 排序规则下需要 text_pattern_ops 才能走索引
+        Index("ix_data_assets_name_pattern", "name", postgresql_ops={"name": "text_pattern_ops"}),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(300), nullable=False)
@@ -33,6 +42,9 @@ class DataAsset(Base):
     created_by = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    version = Column(Integer, nullable=False, server_default="1")  # 乐观锁版本号，ORM 每次更新自动+1
+
+    __mapper_args__ = {"version_id_col": version}
 
     organization = relationship("Organization", backref="assets")
-    stage_records = relationship("StageRecord", backref="asset", order_by="StageRecord.created_at")
+    stage_records = relationship("StageRecord", backref="asset", order_by="[StageRecord.created_at, StageRecord.id]")
@@ -1,12 +1,23 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, func
+from sqlalchemy import BigInteger, Column, Integer, SmallInteger, String, DateTime, Text, Index, func
 from app.core.database import Base
 
 
 class AuditLog(Base):
-    """审计日志 — 只INSERT，不可UPDATE/DELETE"""
+    """审计日志 — 只INSERT，不可UPDATE/DELETE。
+    PostgreSQL 上按 created_at 月分区（主键为 (id, created_at)），SQLite 上较早的月份滚动到
+    audit_logs_YYYYMM 表，见 app/services/audit_storage_service.py"""
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        # 查询均按 created_at DESC, id DESC 排序并做键集分页
+        Index("ix_audit_logs_created_at_id", "created_at", "id"),
+        Index("ix_audit_logs_resource_created_at", "resource_type", "resource_id", "created_at"),
+        Index("ix_audit_logs_user_created_at", "user_id", "created_at"),
+        Index("ix_audit_logs_action_created_at", "action", "created_at"),
+        Index("ix_audit_logs_chain_shard_seq", "chain_shard", "chain_seq"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    # SQLite 只有 INTEGER PRIMARY KEY 才自增
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, index=True)
     user_id = Column(Integer, nullable=False)
     username = Column(String(100), nullable=False)
     action = Column(String(100), nullable=False)        # create/update/delete/approve/reject/upload
@@ -14,4 +25,46 @@ class AuditLog(Base):
     resource_id = Column(Integer)
     detail = Column(Text)
     ip_address = Column(String(50))
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, nullable=False, server_default=func.now())  # 分区键
+    # 防篡改哈希链，见 app/core/audit_chain.py；为空表示启用哈希链之前写入的行
+    chain_shard = Column(SmallInteger)
+    chain_seq = Column(BigInteger)
+    chain_hash = Column(String(64))
+
+
+class AuditChainHead(Base):
+    """每条哈希链（分片）的链尾：写入方锁定一个分片后在其后追加，不同分片可并发写入"""
+    __tablename__ = "audit_chain_heads"
+
+    shard = Column(SmallInteger, primary_key=True, autoincrement=False)
+    seq = Column(BigInteger, nullable=False, default=0)
+    hash = Column(String(64), nullable=False)
+
+
+class AuditCheckpoint(Base):
+    """检查点：某分片 (first_seq, last_seq] 一段链的首尾哈希，作为叶子依次追加进 Merkle 树。
+    root 为追加后整棵树（tree_size 个叶子）的根，可抄送到库外留存"""
+    __tablename__ = "audit_checkpoints"
+    __table_args__ = (
+        Index("ix_audit_checkpoints_shard_last_seq", "shard", "last_seq"),
+    )
+
+    leaf_index = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=False)
+    shard = Column(SmallInteger, nullable=False)
+    first_seq = Column(BigInteger, nullable=False)  # 不含，即上一检查点的 last_seq
+    last_seq = Column(BigInteger, nullable=False)
+    start_hash = Column(String(64), nullable=False)
+    end_hash = Column(String(64), nullable=False)
+    min_created_at = Column(DateTime, nullable=False)  # 段内行的时间范围，校验时用于裁剪分区
+    max_created_at = Column(DateTime, nullable=False)
+    root = Column(String(64), nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
+class AuditMerkleNode(Base):
+    """检查点 Merkle 树中已完整的子树：第 level 层第 idx 个节点覆盖叶子 [idx·2^level, (idx+1)·2^level)"""
+    __tablename__ = "audit_merkle_nodes"
+
+    level = Column(SmallInteger, primary_key=True, autoincrement=False)
+    idx = Column(BigInteger, primary_key=True, autoincrement=False)
+    hash = Column(String(64), nullable=False)
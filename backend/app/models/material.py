@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, BigInteger, func
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, BigInteger, Float, Index, Text, func
 from app.core.database import Base
 
 
 class StageMaterial(Base):
     __tablename__ = "stage_materials"
+    __table_args__ = (
+        # 同名文件取最新版本号；前缀 stage_record_id 同时服务材料列表
+        Index("ix_stage_materials_record_name_version", "stage_record_id", "file_name", "version"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     stage_record_id = Column(Integer, ForeignKey("stage_records.id"), nullable=False)
@@ -15,3 +19,54 @@ class StageMaterial(Base):
     version = Column(Integer, default=1)
     uploaded_by = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime, server_default=func.now())
+
+
+class MaterialBlob(Base):
+    """内容寻址存储：同一SHA-256的文件只保存一份，ref_count 为引用它的材料记录数"""
+    __tablename__ = "material_blobs"
+
+    hash_sha256 = Column(String(64), primary_key=True)
+    file_path = Column(String(1000), nullable=False)
+    file_size = Column(BigInteger)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, server_default=func.now())
+    # 巡检结果，见 app/services/scrub_service.py
+    last_verified_at = Column(DateTime)  # 最近一次校验通过的时间
+    verify_status = Column(String(20))  # 最近一次校验结果: ok/mismatch/missing/error
+
+
+class MaterialScrubRun(Base):
+    """一次完整性巡检：按 hash_sha256 顺序扫描 material_blobs，cursor 之前的文件均已校验，中断后从 cursor 继续"""
+    __tablename__ = "material_scrub_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String(20), nullable=False, default="running")  # running/paused/completed/failed
+    cursor = Column(String(64), nullable=False, default="")
+    total_blobs = Column(Integer, nullable=False, default=0)  # 开始时的文件数和字节数，用于估算进度
+    total_bytes = Column(BigInteger, nullable=False, default=0)
+    scanned_blobs = Column(Integer, nullable=False, default=0)
+    scanned_bytes = Column(BigInteger, nullable=False, default=0)
+    mismatches = Column(Integer, nullable=False, default=0)
+    missing = Column(Integer, nullable=False, default=0)
+    errors = Column(Integer, nullable=False, default=0)
+    workers = Column(Integer)
+    bandwidth_mb_per_sec = Column(Float)
+    active_seconds = Column(Float, nullable=False, default=0, server_default="0")  # 各次运行实际扫描的累计秒数，不含暂停间隔
+    started_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now())
+    finished_at = Column(DateTime)
+
+
+class MaterialScrubIssue(Base):
+    """巡检发现的问题：内容与记录的 SHA-256 不符、文件丢失或无法读取"""
+    __tablename__ = "material_scrub_issues"
+
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(Integer, ForeignKey("material_scrub_runs.id"), nullable=False, index=True)
+    hash_sha256 = Column(String(64), nullable=False, index=True)
+    status = Column(String(20), nullable=False)  # mismatch/missing/error
+    actual_sha256 = Column(String(64))
+    file_path = Column(String(1000))
+    file_size = Column(BigInteger)
+    detail = Column(Text)
+    detected_at = Column(DateTime, server_default=func.now())
@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Text, func
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Text, Index, func, text
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.models.asset import AssetStage
@@ -14,6 +14,19 @@ class StageStatus(str, enum.Enum):
 
 class StageRecord(Base):
     __tablename__ = "stage_records"
+    __table_args__ = (
+        # 资产阶段历史、提交前查重、并行组审批状态都按 (asset_id, stage, status) 过滤
+        Index("ix_stage_records_asset_stage_status", "asset_id", "stage", "status"),
+        # 部分唯一索引：同一资产同一阶段最多一条待审批记录，并发重复提交由数据库拒绝
+        Index(
+            "uq_stage_records_submitted",
+            "asset_id",
+            "stage",
+            unique=True,
+            sqlite_where=text("status = 'SUBMITTED'"),
+            postgresql_where=text("status = 'SUBMITTED'"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     asset_id = Column(Integer, ForeignKey("data_assets.id"), nullable=False)
@@ -26,3 +39,4 @@ class StageRecord(Base):
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     materials = relationship("StageMaterial", backref="stage_record")
+    approvals = relationship("ApprovalRecord", order_by="ApprovalRecord.id")
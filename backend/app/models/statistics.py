@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, DateTime, Enum, ForeignKey, Numeric, func
+from app.core.database import Base
+from app.models.asset import AssetStage
+
+
+class AssetStageSummary(Base):
+    """按组织、阶段汇总的资产统计，随资产创建、阶段推进、估值变更增量维护"""
+    __tablename__ = "asset_stage_summary"
+
+    org_id = Column(Integer, ForeignKey("organizations.id"), primary_key=True)
+    stage = Column(Enum(AssetStage), primary_key=True)
+    asset_count = Column(Integer, nullable=False, default=0)
+    valued_count = Column(Integer, nullable=False, default=0)  # 已估值资产数
+    valuation_total = Column(Numeric(18, 2), nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,45 @@
+import enum
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, BigInteger, UniqueConstraint, func
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+
+class UploadSessionStatus(str, enum.Enum):
+    ACTIVE = "active"
+    COMPLETED = "completed"
+
+
+class UploadSession(Base):
+    """分片上传会话 — 大文件断点续传"""
+    __tablename__ = "upload_sessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    stage_record_id = Column(Integer, ForeignKey("stage_records.id"), nullable=False)
+    file_name = Column(String(500), nullable=False)
+    file_type = Column(String(50))
+    total_size = Column(BigInteger, nullable=False)
+    part_size = Column(Integer, nullable=False)
+    status = Column(Enum(UploadSessionStatus), default=UploadSessionStatus.ACTIVE)
+    material_id = Column(Integer, ForeignKey("stage_materials.id"))
+    created_by = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    parts = relationship("UploadPart", backref="session", order_by="UploadPart.part_number")
+
+    @property
+    def total_parts(self) -> int:
+        return max(1, -(-self.total_size // self.part_size))
+
+
+class UploadPart(Base):
+    """已接收的分片（文件保存在 UPLOAD_DIR/_sessions/{session_id}/ 下）"""
+    __tablename__ = "upload_parts"
+    __table_args__ = (UniqueConstraint("session_id", "part_number"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("upload_sessions.id"), nullable=False)
+    part_number = Column(Integer, nullable=False)  # 从1开始
+    size = Column(BigInteger, nullable=False)
+    hash_sha256 = Column(String(64), nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
@@ -0,0 +1,70 @@
+"""
+Audit log storage maintenance: partitions, rolling, archiving and retention.
+Usage: cd backend && python -m app.scripts.audit_maintenance [--interval SECONDS] [--list] [--restore YYYY-MM]
+Run daily from cron (or with --interval). PostgreSQL: creates the monthly
+partitions AUDIT_PARTITION_PREMAKE_MONTHS ahead. SQLite: moves rows older than
+AUDIT_HOT_MONTHS out of audit_logs into audit_logs_YYYYMM tables. On both,
+months older than AUDIT_ONLINE_MONTHS are written to gzip NDJSON files (plus a
+manifest with row count and SHA-256) under AUDIT_ARCHIVE_DIR and dropped from
+the database, and months older than AUDIT_ARCHIVE_RETENTION_MONTHS are deleted.
+--restore loads an archived month back so it can be queried again.
+Each run first appends Merkle checkpoints for new hash-chain rows (see
+app.scripts.audit_verify), so months are anchored before they are archived.
+Copy the logged tree root somewhere outside the database to detect rewrites.
+"""
+import argparse
+import json
+import logging
+import sys
+import os
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from app.core.database import engine
+from app.models import user, organization, asset, stage, material, audit, approval, upload_session, statistics  # noqa
+from app.services.audit_chain_service import create_checkpoints
+from app.services.audit_storage_service import list_archives, list_partitions, restore_archive, run_maintenance
+
+logger = logging.getLogger("audit_maintenance")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="审计日志分区、归档与保留期维护")
+    parser.add_argument("--interval", type=float, default=0, help="循环执行的间隔秒数，0 表示只执行一次")
+    parser.add_argument("--list", action="store_true", help="列出库中的按月表和归档文件")
+    parser.add_argument("--restore", metavar="YYYY-MM", help="把已归档的月份导回数据库")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.list:
+        with engine.connect() as conn:
+            online = [p.name for p in list_partitions(conn)]
+        print(json.dumps({"online": online, "archived": [p.name for p in list_archives()]}, ensure_ascii=False, indent=2))
+        return
+    if args.restore:
+        rows = restore_archive(engine, datetime.strptime(args.restore, "%Y-%m"))
+        logger.info("已导回 %s: %d 行", args.restore, rows)
+        return
+
+    while True:
+        started = time.monotonic()
+        try:
+            checkpoints = create_checkpoints(engine)
+            if checkpoints:
+                logger.info("新增 %d 个检查点，树大小 %d，树根 %s",
+                            len(checkpoints), checkpoints[-1]["leaf_index"] + 1, checkpoints[-1]["root"])
+            report = run_maintenance(engine)
+            logger.info("审计日志维护完成，耗时 %.2fs: %s", time.monotonic() - started, json.dumps(report, ensure_ascii=False))
+        except Exception:
+            logger.exception("审计日志维护失败")
+            if not args.interval:
+                raise
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Synthetic data generator for performance testing.
+Usage: cd backend && alembic upgrade head && python -m app.scripts.generate_data --orgs 100 --assets 100000 --audit-rows 1000000
+
+Adds N organizations (one data holder each), shared reviewer accounts,
+M assets spread across all AssetStage values with their stage records and
+materials, and audit rows, using batched executemany inserts. Every generated
+account uses the password given by --password. Runs are additive; use a
+different --prefix to generate into a database that already holds a run.
+"""
+import argparse
+import random
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from sqlalchemy import insert
+
+from app.core.database import SessionLocal
+from app.core.security import get_password_hash
+from app.models import user, organization, asset, stage, material, audit, approval, upload_session, statistics  # noqa
+from app.models.approval import ApprovalRecord
+from app.models.asset import DataAsset, STAGE_ORDER
+from app.models.audit import AuditLog
+from app.models.material import StageMaterial
+from app.models.organization import Organization
+from app.models.stage import StageRecord, StageStatus
+from app.models.user import User, Role
+from app.services.material_service import blob_path
+from app.services.statistics_service import reconcile_statistics
+
+ASSET_TYPES = ["数据集", "算法模型", "API服务", "数据产品"]
+CLASSIFICATIONS = ["公共", "内部", "敏感"]
+AUDIT_ACTIONS = [("create", "asset"), ("submit", "stage"), ("approve", "stage"), ("reject", "stage"), ("upload", "material")]
+REVIEWER_ROLES = [Role.REGISTRY_CENTER, Role.ASSESSOR, Role.COMPLIANCE, Role.REGULATOR, Role.ADMIN]
+
+
+# 直接在表上执行 Core INSERT，绕开 ORM 批量插入的逐行结果拼接
+def _insert_returning_ids(db, model, rows: List[dict]) -> List[int]:
+    if not rows:
+        return []
+    table = model.__table__
+    stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+    return db.connection().execute(stmt, rows).scalars().all()
+
+
+def _insert(db, model, rows: List[dict]) -> None:
+    if rows:
+        db.connection().execute(insert(model.__table__), rows)
+
+
+def generate(
+    orgs: int,
+    assets: int,
+    audit_rows: int,
+    materials_per_record: int = 2,
+    prefix: str = "bench",
+    password: str = "bench123",
+    batch_size: int = 5000,
+    seed: int = 42,
+    log=print,
+    session_factory=SessionLocal,
+) -> dict:
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    db = session_factory()
+    started = time.monotonic()
+    try:
+        # 所有账号共用一个密码哈希，只计算一次 bcrypt
+        hashed = get_password_hash(password)
+        org_ids = _insert_returning_ids(db, Organization, [
+            dict(name=f"{prefix}-组织{i}", org_type=rng.choice(["enterprise", "government", "institution"]))
+            for i in range(orgs)
+        ])
+        holder_ids = _insert_returning_ids(db, User, [
+            dict(username=f"{prefix}_holder{i}", hashed_password=hashed, role=Role.DATA_HOLDER, org_id=org_id, is_active=1)
+            for i, org_id in enumerate(org_ids)
+        ])
+        reviewer_ids = _insert_returning_ids(db, User, [
+            dict(username=f"{prefix}_{role.value}", hashed_password=hashed, role=role, org_id=org_ids[0], is_active=1)
+            for role in REVIEWER_ROLES
+        ])
+        registry_id = reviewer_ids[0]
+        db.commit()
+        log(f"组织 {len(org_ids)}，用户 {len(holder_ids) + len(reviewer_ids)}")
+
+        counts = dict(assets=0, stage_records=0, materials=0, approvals=0)
+        for offset in range(0, assets, batch_size):
+            size = min(batch_size, assets - offset)
+            batch = []
+            for _ in range(size):
+                index = rng.randrange(len(org_ids))
+                stage_index = rng.randrange(len(STAGE_ORDER))
+                batch.append(dict(
+                    name=f"{prefix}-资产{offset + len(batch)}",
+                    description="合成测试数据",
+                    org_id=org_ids[index],
+                    current_stage=STAGE_ORDER[stage_index],
+                    asset_type=rng.choice(ASSET_TYPES),
+                    data_classification=rng.choice(CLASSIFICATIONS),
+                    valuation_amount=round(rng.uniform(1e4, 1e7), 2) if stage_index >= 6 else None,
+                    created_by=holder_ids[index],
+                    created_at=now - timedelta(seconds=rng.randrange(365 * 86400)),
+                ))
+            asset_ids = _insert_returning_ids(db, DataAsset, batch)
+
+            # 已经过的阶段为 APPROVED，当前阶段 30% 处于 SUBMITTED 待审批
+            records, record_meta = [], []
+            for asset_id, row in zip(asset_ids, batch):
+                stage_index = STAGE_ORDER.index(row["current_stage"])
+                created = row["created_at"]
+                for i, stage_value in enumerate(STAGE_ORDER[:stage_index + 1]):
+                    if i == stage_index and rng.random() >= 0.3:
+                        break
+                    status = StageStatus.APPROVED if i < stage_index else StageStatus.SUBMITTED
+                    records.append(dict(
+                        asset_id=asset_id, stage=stage_value, status=status,
+                        submitted_by=row["created_by"],
+                        approved_by=registry_id if status == StageStatus.APPROVED else None,
+                        created_at=created + timedelta(days=i),
+                    ))
+                    record_meta.append(row["created_by"])
+            record_ids = _insert_returning_ids(db, StageRecord, records)
+
+            materials, approvals = [], []
+            for record_id, record, uploader in zip(record_ids, records, record_meta):
+                for m in range(materials_per_record):
+                    hash_value = f"{record_id:032x}{m:032x}"
+                    materials.append(dict(
+                        stage_record_id=record_id, file_name=f"材料{m}.pdf", file_path=blob_path(hash_value),
+                        file_size=rng.randrange(10_000, 5_000_000), file_type="application/pdf",
+                        hash_sha256=hash_value, version=1, uploaded_by=uploader, created_at=record["created_at"],
+                    ))
+                if record["status"] == StageStatus.APPROVED:
+                    approvals.append(dict(stage_record_id=record_id, action="approve", operator_id=registry_id, created_at=record["created_at"]))
+            _insert(db, StageMaterial, materials)
+            _insert(db, ApprovalRecord, approvals)
+            db.commit()
+
+            counts["assets"] += len(asset_ids)
+            counts["stage_records"] += len(record_ids)
+            counts["materials"] += len(materials)
+            counts["approvals"] += len(approvals)
+            log(f"资产 {counts['assets']}/{assets}")
+
+        usernames = {uid: f"{prefix}_holder{i}" for i, uid in enumerate(holder_ids)}
+        usernames.update({uid: f"{prefix}_{role.value}" for uid, role in zip(reviewer_ids, REVIEWER_ROLES)})
+        user_ids = list(usernames)
+        for offset in range(0, audit_rows, batch_size):
+            size = min(batch_size, audit_rows - offset)
+            rows = []
+            for _ in range(size):
+                user_id = rng.choice(user_ids)
+                action, resource_type = rng.choice(AUDIT_ACTIONS)
+                rows.append(dict(
+                    user_id=user_id, username=usernames[user_id], action=action, resource_type=resource_type,
+                    resource_id=rng.randrange(1, max(assets, 1) + 1), detail="", ip_address="127.0.0.1",
+                    created_at=now - timedelta(seconds=rng.randrange(365 * 86400)),
+                ))
+            _insert(db, AuditLog, rows)
+            db.commit()
+            log(f"审计日志 {offset + size}/{audit_rows}")
+        counts["audit_logs"] = audit_rows
+
+        reconcile_statistics(db)
+        counts.update(orgs=len(org_ids), users=len(user_ids), seconds=round(time.monotonic() - started, 1))
+        return counts
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量生成性能测试数据")
+    parser.add_argument("--orgs", type=int, default=50)
+    parser.add_argument("--assets", type=int, default=10000)
+    parser.add_argument("--audit-rows", type=int, default=100000)
+    parser.add_argument("--materials-per-record", type=int, default=2)
+    parser.add_argument("--prefix", default="bench", help="组织名和用户名前缀")
+    parser.add_argument("--password", default="bench123")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    counts = generate(
+        args.orgs, args.assets, args.audit_rows, args.materials_per_record,
+        args.prefix, args.password, args.batch_size, args.seed,
+    )
+    print(f"生成完成: {counts}")
+
+
+if __name__ == "__main__":
+    main()
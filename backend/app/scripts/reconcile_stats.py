@@ -0,0 +1,50 @@
+"""
+Reconcile script: rebuilds asset_stage_summary from data_assets.
+Usage: cd backend && python -m app.scripts.reconcile_stats [--interval SECONDS]
+Run once from cron, or with --interval to keep reconciling periodically.
+"""
+import argparse
+import logging
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from app.core.database import SessionLocal
+from app.models import user, organization, asset, stage, material, audit, approval, upload_session, statistics  # noqa
+from app.services.statistics_service import reconcile_statistics
+
+logger = logging.getLogger("reconcile_stats")
+
+
+def reconcile_once() -> int:
+    db = SessionLocal()
+    try:
+        return reconcile_statistics(db)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="全量重算资产统计汇总表")
+    parser.add_argument("--interval", type=float, default=0, help="循环执行的间隔秒数，0 表示只执行一次")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    while True:
+        started = time.monotonic()
+        try:
+            rows = reconcile_once()
+            logger.info("统计汇总重算完成: %d 行, 耗时 %.2fs", rows, time.monotonic() - started)
+        except Exception:
+            logger.exception("统计汇总重算失败")
+            if not args.interval:
+                raise
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
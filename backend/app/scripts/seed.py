@@ -1,13 +1,13 @@
 """
 Seed script: creates demo organizations, users, and sample assets.
-Usage: cd backend && python -m app.scripts.seed
+Usage: cd backend && alembic upgrade head && python -m app.scripts.seed
 """
 import sys
 import os
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
-from app.core.database import engine, SessionLocal, Base
+from app.core.database import SessionLocal
 from app.core.security import get_password_hash
 from app.models.organization import Organization
 from app.models.user import User, Role
@@ -16,10 +16,12 @@ from app.models.stage import StageRecord
 from app.models.material import StageMaterial  # noqa
 from app.models.audit import AuditLog  # noqa
 from app.models.approval import ApprovalRecord  # noqa
+from app.models.upload_session import UploadSession  # noqa
+from app.models.statistics import AssetStageSummary  # noqa
+from app.services.statistics_service import reconcile_statistics
 
 
 def seed():
-    Base.metadata.create_all(bind=engine)
     db = SessionLocal()
 
     # Check if already seeded
@@ -85,6 +87,7 @@ def seed():
     ]
     db.add_all(assets)
     db.commit()
+    reconcile_statistics(db)  # 直接插入的资产不经过 create_asset，重算统计汇总
 
     print(f"Seed complete: {len(orgs)} orgs, {len(users)} users, {len(assets)} assets")
     print("All user passwords: 123456")
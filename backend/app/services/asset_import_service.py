@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+from collections import Counter
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.cache import response_cache, STATISTICS_SCOPE
+from app.core.config import settings
+from app.engine.workflow import workflow_for
+from app.models.asset import DataAsset
+from app.models.user import User
+from app.services.statistics_service import record_assets_created
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# (行号, 解析出的字段, 错误信息)；解析失败时字段为 None
+RawRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+def iter_csv_rows(fileobj: BinaryIO) -> Iterator[RawRow]:
+    """首行为表头；行号从数据行开始计。空单元格视为未填写，使用字段默认值"""
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    row_no = 0
+    try:
+        for row_no, row in enumerate(reader, start=1):
+            if None in row:
+                yield row_no, None, "列数多于表头"
+                continue
+            yield row_no, {k.strip(): v for k, v in row.items() if k and v not in (None, "")}, None
+    except (UnicodeDecodeError, csv.Error) as e:
+        # 编码或格式错误后无法继续定位后续行，报告在出错行并停止
+        yield row_no + 1, None, f"CSV解析失败，后续行未导入: {e}"
+    finally:
+        text.detach()
+
+
+def iter_ndjson_rows(fileobj: BinaryIO) -> Iterator[RawRow]:
+    """每行一个JSON对象，空行忽略；行号为文件行号"""
+    for row_no, line in enumerate(fileobj, start=1):
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            yield row_no, None, f"JSON解析失败: {e}"
+            continue
+        if not isinstance(value, dict):
+            yield row_no, None, "每行必须是JSON对象"
+            continue
+        yield row_no, value, None
+
+
+def iter_import_rows(fileobj: BinaryIO, fmt: str) -> Iterator[RawRow]:
+    if fmt == "csv":
+        return iter_csv_rows(fileobj)
+    return iter_ndjson_rows(fileobj)
+
+
+def _insert_batch(db: Session, user: User, batch: List[Tuple[int, Any]]) -> List[dict]:
+    params = [
+        dict(
+            name=item.name,
+            description=item.description,
+            org_id=user.org_id,
+            current_stage=workflow_for(item).first_stage,
+            asset_type=item.asset_type,
+            data_classification=item.data_classification,
+            created_by=user.id,
+        )
+        for _, item in batch
+    ]
+    try:
+        # executemany + RETURNING，按参数顺序返回主键
+        ids = db.execute(
+            insert(DataAsset).returning(DataAsset.id, sort_by_parameter_order=True), params,
+        ).scalars().all()
+        for stage, count in Counter(p["current_stage"] for p in params).items():
+            record_assets_created(db, user.org_id, stage, count)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        error = f"批量写入失败: {e.__class__.__name__}"
+        return [dict(row=row_no, status="error", error=error) for row_no, _ in batch]
+    return [dict(row=row_no, status="created", asset_id=asset_id) for (row_no, _), asset_id in zip(batch, ids)]
+
+
+def bulk_create_assets(
+    db: Session,
+    user: User,
+    rows: Iterable[Tuple[int, Any, Optional[str]]],
+    batch_size: Optional[int] = None,
+) -> List[dict]:
+    """批量创建资产，每批一次提交；rows 为 (行号, 已校验的 AssetCreate, 错误信息)，返回逐行结果"""
+    batch_size = batch_size or settings.ASSET_IMPORT_BATCH_SIZE
+    results: List[dict] = []
+    batch: List[Tuple[int, Any]] = []
+    for row_no, item, error in rows:
+        if error:
+            results.append(dict(row=row_no, status="error", error=error))
+            continue
+        batch.append((row_no, item))
+        if len(batch) >= batch_size:
+            results.extend(_insert_batch(db, user, batch))
+            batch = []
+    if batch:
+        results.extend(_insert_batch(db, user, batch))
+
+    if any(r["status"] == "created" for r in results):
+        response_cache.bump(STATISTICS_SCOPE)
+    results.sort(key=lambda r: r["row"])
+    return results
@@ -1,7 +1,15 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, Query, joinedload, selectinload
+from app.core.cache import response_cache, asset_scope, STATISTICS_SCOPE
+from app.core.pagination import keyset_page, keyset_page_async
+from app.engine.workflow import workflow_for
 from app.models.asset import DataAsset, AssetStage
+from app.models.material import StageMaterial
+from app.models.stage import StageRecord
 from app.models.user import User, Role
+from app.services.statistics_service import record_asset_change
 
 
 def create_asset(db: Session, name: str, description: str, user: User, asset_type: str = None, data_classification: str = None) -> DataAsset:
@@ -9,25 +17,93 @@ def create_asset(db: Session, name: str, description: str, user: User, asset_typ
         name=name,
         description=description,
         org_id=user.org_id,
-        current_stage=AssetStage.RESOURCE_INVENTORY,
         asset_type=asset_type,
         data_classification=data_classification,
         created_by=user.id,
     )
+    asset.current_stage = workflow_for(asset).first_stage
     db.add(asset)
+    record_asset_change(db, asset.org_id, None, None, asset.current_stage, None)
     db.commit()
+    response_cache.bump(STATISTICS_SCOPE)
     db.refresh(asset)
     return asset
 
 
-def list_assets(db: Session, user: User, stage: Optional[str] = None) -> List[DataAsset]:
-    query = db.query(DataAsset)
+async def create_asset_async(db: AsyncSession, name: str, description: str, user: User, asset_type: str = None, data_classification: str = None) -> DataAsset:
+    return await db.run_sync(create_asset, name, description, user, asset_type, data_classification)
+
+
+def _asset_criteria(
+    user: User,
+    stage: Optional[str] = None,
+    org_id: Optional[int] = None,
+    asset_type: Optional[str] = None,
+    data_classification: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+) -> list:
+    criteria = []
     # RBAC: 持有方只能看自己组织的资产
     if user.role == Role.DATA_HOLDER:
-        query = query.filter(DataAsset.org_id == user.org_id)
+        criteria.append(DataAsset.org_id == user.org_id)
     if stage:
-        query = query.filter(DataAsset.current_stage == stage)
-    return query.order_by(DataAsset.created_at.desc()).all()
+        criteria.append(DataAsset.current_stage == stage)
+    if org_id:
+        criteria.append(DataAsset.org_id == org_id)
+    if asset_type:
+        criteria.append(DataAsset.asset_type == asset_type)
+    if data_classification:
+        criteria.append(DataAsset.data_classification == data_classification)
+    if name_prefix:
+        criteria.append(DataAsset.name.startswith(name_prefix, autoescape=True))
+    return criteria
+
+
+# 导出字段，与 AssetOut 一致并附带创建时间
+EXPORT_COLUMNS = (
+    DataAsset.id, DataAsset.name, DataAsset.description, DataAsset.org_id, DataAsset.current_stage,
+    DataAsset.asset_type, DataAsset.data_classification, DataAsset.valuation_amount, DataAsset.accounting_type,
+    DataAsset.created_by, DataAsset.created_at,
+)
+
+
+def filter_assets(db: Session, user: User, stage: Optional[str] = None, **filters) -> Query:
+    return db.query(DataAsset).filter(*_asset_criteria(user, stage, **filters))
+
+
+def select_assets(user: User, stage: Optional[str] = None, **filters):
+    """filter_assets 的 select() 版本，供 AsyncSession 使用"""
+    return select(DataAsset).where(*_asset_criteria(user, stage, **filters))
+
+
+def select_asset_export(user: User, stage: Optional[str] = None, **filters):
+    """与 list_assets 相同的数据权限和过滤条件，只取导出字段、按主键顺序，不构造ORM对象"""
+    return select(*EXPORT_COLUMNS).where(*_asset_criteria(user, stage, **filters)).order_by(DataAsset.id)
+
+
+def list_assets(
+    db: Session,
+    user: User,
+    stage: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    **filters,
+) -> Tuple[List[DataAsset], Optional[str]]:
+    """按创建时间倒序分页，返回 (本页资产, 下一页游标)"""
+    query = filter_assets(db, user, stage, **filters)
+    return keyset_page(query, DataAsset.created_at, DataAsset.id, cursor, limit)
+
+
+async def list_assets_async(
+    db: AsyncSession,
+    user: User,
+    stage: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    **filters,
+) -> Tuple[List[DataAsset], Optional[str]]:
+    stmt = select_assets(user, stage, **filters)
+    return await keyset_page_async(db, stmt, DataAsset.created_at, DataAsset.id, cursor, limit)
 
 
 def get_asset(db: Session, asset_id: int, user: User) -> Optional[DataAsset]:
@@ -38,3 +114,62 @@ def get_asset(db: Session, asset_id: int, user: User) -> Optional[DataAsset]:
     if user.role == Role.DATA_HOLDER and asset.org_id != user.org_id:
         return None
     return asset
+
+
+async def get_asset_async(db: AsyncSession, asset_id: int, user: User) -> Optional[DataAsset]:
+    asset = await db.get(DataAsset, asset_id)
+    if not asset:
+        return None
+    if user.role == Role.DATA_HOLDER and asset.org_id != user.org_id:
+        return None
+    return asset
+
+
+def _select_asset_full(asset_id: int, user: User):
+    stmt = select(DataAsset).options(
+        joinedload(DataAsset.organization),
+        selectinload(DataAsset.stage_records).selectinload(StageRecord.approvals),
+        selectinload(DataAsset.stage_records).selectinload(StageRecord.materials),
+    ).where(DataAsset.id == asset_id)
+    # RBAC: 持有方只能看自己组织的资产
+    if user.role == Role.DATA_HOLDER:
+        stmt = stmt.where(DataAsset.org_id == user.org_id)
+    return stmt
+
+
+def get_asset_full(db: Session, asset_id: int, user: User) -> Optional[DataAsset]:
+    """资产详情连同组织、阶段记录、审批记录和材料一起加载，查询条数固定（4条），与阶段和材料数量无关"""
+    return db.execute(_select_asset_full(asset_id, user)).unique().scalar_one_or_none()
+
+
+async def get_asset_full_async(db: AsyncSession, asset_id: int, user: User) -> Optional[DataAsset]:
+    # 关系全部预加载，返回后在协程中访问不会触发隐式IO
+    return (await db.execute(_select_asset_full(asset_id, user))).unique().scalar_one_or_none()
+
+
+def latest_materials(materials: List[StageMaterial]) -> List[StageMaterial]:
+    """同名文件只保留最新版本，按文件名排序"""
+    latest = {}
+    for material in materials:
+        current = latest.get(material.file_name)
+        if current is None or material.version > current.version:
+            latest[material.file_name] = material
+    return [latest[name] for name in sorted(latest)]
+
+
+def update_valuation(db: Session, asset: DataAsset, amount: Optional[float], accounting_type: Optional[str] = None) -> DataAsset:
+    """更新估值金额（None 表示清除估值），同步维护统计汇总"""
+    db.refresh(asset, with_for_update=True)  # 锁定后重读，保证旧估值与汇总扣减一致
+    old_amount = asset.valuation_amount
+    asset.valuation_amount = amount
+    if accounting_type is not None:
+        asset.accounting_type = accounting_type
+    record_asset_change(db, asset.org_id, asset.current_stage, old_amount, asset.current_stage, amount)
+    db.commit()
+    response_cache.bump(asset_scope(asset.id), STATISTICS_SCOPE)
+    db.refresh(asset)
+    return asset
+
+
+async def update_valuation_async(db: AsyncSession, asset: DataAsset, amount: Optional[float], accounting_type: Optional[str] = None) -> DataAsset:
+    return await db.run_sync(lambda session: update_valuation(session, asset, amount, accounting_type))
@@ -0,0 +1,310 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import create_engine, func, insert, select, tuple_
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.audit_chain import CHAINED_FIELDS, GENESIS_HASH, link_hash
+from app.core.config import settings
+from app.core.pagination import bind_datetime
+from app.models.audit import AuditChainHead, AuditCheckpoint, AuditMerkleNode
+from app.services.audit_storage_service import audit_sources
+
+
+class ChainError(Exception):
+    pass
+
+
+# ---- 检查点 Merkle 树（与 RFC 6962 相同的树形），只保存已完整的子树 ----
+
+def leaf_hash(shard: int, first_seq: int, last_seq: int, start_hash: str, end_hash: str) -> str:
+    return hashlib.sha256(b"\x00" + f"{shard}:{first_seq}:{last_seq}:{start_hash}:{end_hash}".encode()).hexdigest()
+
+
+def node_hash(left: str, right: str) -> str:
+    return hashlib.sha256(b"\x01" + bytes.fromhex(left) + bytes.fromhex(right)).hexdigest()
+
+
+def _peaks(tree_size: int) -> List[Tuple[int, int]]:
+    """大小为 tree_size 的树按二进制位拆成的完整子树 (level, idx)，从左到右"""
+    peaks, start = [], 0
+    for level in range(tree_size.bit_length() - 1, -1, -1):
+        if tree_size >> level & 1:
+            peaks.append((level, start >> level))
+            start += 1 << level
+    return peaks
+
+
+def _fold(peak_hashes: List[str]) -> str:
+    root = peak_hashes[-1]
+    for peak in reversed(peak_hashes[:-1]):
+        root = node_hash(peak, root)
+    return root
+
+
+def _nodes(conn: Connection, keys: List[Tuple[int, int]]) -> Dict[Tuple[int, int], str]:
+    if not keys:
+        return {}
+    found = dict(
+        ((level, idx), h) for level, idx, h in conn.execute(
+            select(AuditMerkleNode.level, AuditMerkleNode.idx, AuditMerkleNode.hash)
+            .where(tuple_(AuditMerkleNode.level, AuditMerkleNode.idx).in_(keys))
+        ).all()
+    )
+    missing = [k for k in keys if k not in found]
+    if missing:
+        raise ChainError(f"Merkle 树缺少节点 {missing}")
+    return found
+
+
+def tree_root(conn: Connection, tree_size: int) -> str:
+    peaks = _peaks(tree_size)
+    nodes = _nodes(conn, peaks)
+    return _fold([nodes[p] for p in peaks])
+
+
+def _append_leaf(conn: Connection, index: int, leaf: str) -> str:
+    """追加第 index 个叶子，补上由此变完整的子树，返回新树根"""
+    level, idx, current = 0, index, leaf
+    conn.execute(insert(AuditMerkleNode).values(level=0, idx=index, hash=leaf))
+    while idx % 2 == 1:
+        left = _nodes(conn, [(level, idx - 1)])[(level, idx - 1)]
+        level, idx, current = level + 1, idx // 2, node_hash(left, current)
+        conn.execute(insert(AuditMerkleNode).values(level=level, idx=idx, hash=current))
+    return tree_root(conn, index + 1)
+
+
+def inclusion_root(conn: Connection, index: int, leaf: str, tree_size: int) -> str:
+    """由叶子和 O(log n) 个兄弟节点 / 其它完整子树重算大小为 tree_size 的树根"""
+    peaks = _peaks(tree_size)
+    start = 0
+    for level, idx in peaks:
+        if start <= index < start + (1 << level):
+            own = (level, idx)
+            break
+        start += 1 << level
+    siblings = [(l, (index >> l) ^ 1) for l in range(own[0])]
+    nodes = _nodes(conn, siblings + [p for p in peaks if p != own])
+    current = leaf
+    for l, sibling in siblings:
+        current = node_hash(nodes[(l, sibling)], current) if index >> l & 1 else node_hash(current, nodes[(l, sibling)])
+    return _fold([current if p == own else nodes[p] for p in peaks])
+
+
+# ---- 按分片读取一段链 ----
+
+class Segment(NamedTuple):
+    shard: int
+    first_seq: int  # 不含
+    last_seq: int
+    start_hash: str
+    end_hash: Optional[str]  # 为空时不比对链尾（建检查点时）
+    since: Optional[datetime] = None  # 段内行的时间范围（已知时用于裁剪分区 / 按月表）
+    until: Optional[datetime] = None
+    leaf_index: Optional[int] = None  # 尚未做检查点的链尾为 None
+
+
+class SegmentResult(NamedTuple):
+    rows: int
+    errors: List[str]
+    end_hash: str
+    min_created_at: Optional[datetime]
+    max_created_at: Optional[datetime]
+
+
+def _segment_rows(conn: Connection, segment: Segment) -> list:
+    rows = []
+    for entity in audit_sources(conn, segment.since, segment.until):
+        criteria = [entity.chain_shard == segment.shard, entity.chain_seq > segment.first_seq, entity.chain_seq <= segment.last_seq]
+        if segment.since:
+            criteria.append(entity.created_at >= bind_datetime(segment.since))
+        if segment.until:
+            criteria.append(entity.created_at < bind_datetime(segment.until))
+        columns = [entity.chain_seq, entity.chain_hash] + [getattr(entity, f) for f in CHAINED_FIELDS]
+        rows += conn.execute(select(*columns).where(*criteria)).all()
+    rows.sort(key=lambda row: row.chain_seq)
+    return rows
+
+
+def check_segment(conn: Connection, segment: Segment) -> SegmentResult:
+    """从 start_hash 起重算整段链：报告缺行/多行、行内容被改、链尾与检查点不符"""
+    errors = []
+    prev_hash, expected_seq = segment.start_hash, segment.first_seq + 1
+    rows = _segment_rows(conn, segment)
+    for row in rows:
+        if row.chain_seq != expected_seq:
+            errors.append(f"分片 {segment.shard} 第 {expected_seq} 行缺失或重复（读到第 {row.chain_seq} 行）")
+            expected_seq = row.chain_seq
+        prev_hash = link_hash(prev_hash, segment.shard, row.chain_seq, row._mapping)
+        if prev_hash != row.chain_hash:
+            errors.append(f"分片 {segment.shard} 第 {row.chain_seq} 行哈希不符，内容或链已被修改")
+            prev_hash = row.chain_hash  # 从该行继续，只报告首个受影响的行
+        expected_seq += 1
+    if expected_seq != segment.last_seq + 1:
+        errors.append(f"分片 {segment.shard} 第 {expected_seq}~{segment.last_seq} 行缺失")
+    if segment.end_hash is not None and prev_hash != segment.end_hash:
+        errors.append(f"分片 {segment.shard} 第 {segment.first_seq + 1}~{segment.last_seq} 行的链尾与检查点不符")
+    created = [row.created_at for row in rows]
+    return SegmentResult(len(rows), errors, prev_hash, min(created, default=None), max(created, default=None))
+
+
+# ---- 检查点 ----
+
+def create_checkpoints(engine: Engine) -> List[dict]:
+    """为每个分片自上一检查点以来的新行建检查点（每段至多 AUDIT_CHECKPOINT_ROWS 行）。
+    入树前先重算该段的链，有问题则不建并抛出 ChainError，避免把被篡改的数据固化进树里"""
+    created = []
+    with engine.begin() as conn:
+        heads = conn.execute(select(AuditChainHead.shard, AuditChainHead.seq).order_by(AuditChainHead.shard)).all()
+        last = {
+            row.shard: row for row in conn.execute(
+                select(AuditCheckpoint).where(AuditCheckpoint.leaf_index.in_(
+                    select(func.max(AuditCheckpoint.leaf_index)).group_by(AuditCheckpoint.shard)
+                ))
+            ).all()
+        }
+        index = conn.execute(select(func.count()).select_from(AuditCheckpoint)).scalar()
+        for shard, head_seq in heads:
+            first_seq = last[shard].last_seq if shard in last else 0
+            start_hash = last[shard].end_hash if shard in last else GENESIS_HASH
+            while first_seq < head_seq:
+                last_seq = min(head_seq, first_seq + max(settings.AUDIT_CHECKPOINT_ROWS, 1))
+                result = check_segment(conn, Segment(shard, first_seq, last_seq, start_hash, None))
+                if result.errors:
+                    raise ChainError("; ".join(result.errors))
+                end_hash = result.end_hash
+                root = _append_leaf(conn, index, leaf_hash(shard, first_seq, last_seq, start_hash, end_hash))
+                conn.execute(insert(AuditCheckpoint).values(
+                    leaf_index=index, shard=shard, first_seq=first_seq, last_seq=last_seq,
+                    start_hash=start_hash, end_hash=end_hash, root=root,
+                    min_created_at=result.min_created_at, max_created_at=result.max_created_at,
+                ))
+                created.append({"leaf_index": index, "shard": shard, "last_seq": last_seq, "root": root})
+                index += 1
+                first_seq, start_hash = last_seq, end_hash
+    return created
+
+
+# ---- 校验 ----
+
+def _range_segments(conn: Connection, since: Optional[datetime], until: Optional[datetime]) -> Tuple[List[Segment], int]:
+    """时间范围内的行所在的链段：已做检查点的段按检查点边界整段校验，其后的链尾校验到当前链尾。
+    返回 (链段, 范围内未上链的行数)"""
+    bounds: Dict[int, List[int]] = {}
+    unchained = 0
+    for entity in audit_sources(conn, since, until):
+        criteria = []
+        if since:
+            criteria.append(entity.created_at >= bind_datetime(since))
+        if until:
+            criteria.append(entity.created_at < bind_datetime(until))
+        for shard, low, high, count in conn.execute(
+            select(entity.chain_shard, func.min(entity.chain_seq), func.max(entity.chain_seq), func.count())
+            .where(*criteria).group_by(entity.chain_shard)
+        ).all():
+            if shard is None:
+                unchained += count
+            elif shard in bounds:
+                bounds[shard] = [min(bounds[shard][0], low), max(bounds[shard][1], high)]
+            else:
+                bounds[shard] = [low, high]
+
+    segments = []
+    for shard, (low, high) in sorted(bounds.items()):
+        checkpoints = conn.execute(
+            select(AuditCheckpoint)
+            .where(AuditCheckpoint.shard == shard, AuditCheckpoint.last_seq >= low, AuditCheckpoint.first_seq < high)
+            .order_by(AuditCheckpoint.last_seq)
+        ).all()
+        for cp in checkpoints:
+            segments.append(Segment(
+                shard, cp.first_seq, cp.last_seq, cp.start_hash, cp.end_hash,
+                cp.min_created_at, cp.max_created_at + timedelta(microseconds=1), cp.leaf_index,
+            ))
+        covered = checkpoints[-1].last_seq if checkpoints else None
+        if covered is None or covered < high:
+            if covered is None:
+                previous = conn.execute(
+                    select(AuditCheckpoint.last_seq, AuditCheckpoint.end_hash)
+                    .where(AuditCheckpoint.shard == shard, AuditCheckpoint.last_seq < low)
+                    .order_by(AuditCheckpoint.last_seq.desc()).limit(1)
+                ).first()
+                covered, start_hash = previous if previous else (0, GENESIS_HASH)
+            else:
+                start_hash = checkpoints[-1].end_hash
+            head = conn.execute(select(AuditChainHead.seq, AuditChainHead.hash).where(AuditChainHead.shard == shard)).one()
+            segments.append(Segment(shard, covered, head.seq, start_hash, head.hash))
+    return segments, unchained
+
+
+_worker_engines: Dict[str, Engine] = {}
+
+
+def _verify_in_worker(database_url: str, segment: Segment) -> SegmentResult:
+    """进程池中执行：每个子进程按连接串建一次自己的引擎"""
+    engine = _worker_engines.get(database_url)
+    if engine is None:
+        engine = _worker_engines[database_url] = create_engine(database_url)
+    with engine.connect() as conn:
+        return check_segment(conn, segment)
+
+
+def verify_range(
+    engine: Engine,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    root: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> dict:
+    """校验 [since, until) 内审计日志的哈希链。
+    每个涉及的链段从上一检查点重算到本检查点（至多 AUDIT_CHECKPOINT_ROWS 行），检查点本身用 O(log n) 个
+    Merkle 节点证明包含在树根中，因此代价为 O(范围 + log n)，与全部历史的大小无关。
+    root 为库外留存的可信树根（如维护脚本日志中记录的）；为空时使用库中最新的树根。
+    链段分给 workers 个进程并行重算，workers 为 1 时在当前进程内执行"""
+    errors: List[str] = []
+    with engine.connect() as conn:
+        latest = conn.execute(select(AuditCheckpoint).order_by(AuditCheckpoint.leaf_index.desc()).limit(1)).first()
+        anchor = latest
+        if root:
+            anchor = conn.execute(select(AuditCheckpoint).where(AuditCheckpoint.root == root)).first()
+            if anchor is None:
+                raise ChainError(f"库中没有树根为 {root} 的检查点")
+        if latest is not None and tree_root(conn, latest.leaf_index + 1) != latest.root:
+            errors.append("Merkle 树节点与最新检查点记录的树根不符")
+
+        segments, unchained = _range_segments(conn, since, until)
+        for segment in segments:
+            if segment.leaf_index is None:
+                continue
+            # 可信树根之后新增的检查点只能对照库中最新的树根
+            trusted = anchor if segment.leaf_index <= anchor.leaf_index else latest
+            leaf = leaf_hash(segment.shard, segment.first_seq, segment.last_seq, segment.start_hash, segment.end_hash)
+            if inclusion_root(conn, segment.leaf_index, leaf, trusted.leaf_index + 1) != trusted.root:
+                errors.append(f"分片 {segment.shard} 第 {segment.first_seq + 1}~{segment.last_seq} 行的检查点不在 Merkle 树中")
+
+    workers = workers or settings.AUDIT_VERIFY_WORKERS or os.cpu_count() or 1
+    if workers > 1 and len(segments) > 1:
+        url = engine.url.render_as_string(hide_password=False)
+        with ProcessPoolExecutor(max_workers=min(workers, len(segments))) as pool:
+            results = list(pool.map(_verify_in_worker, [url] * len(segments), segments))
+    else:
+        with engine.connect() as conn:
+            results = [check_segment(conn, segment) for segment in segments]
+
+    rows = 0
+    for result in results:
+        rows += result.rows
+        errors += result.errors
+    return {
+        "ok": not errors,
+        "segments": len(segments),
+        "rows_checked": rows,
+        "unanchored_rows": sum(s.last_seq - s.first_seq for s in segments if s.leaf_index is None),
+        "unchained_rows": unchained,
+        "tree_size": anchor.leaf_index + 1 if anchor else 0,
+        "root": anchor.root if anchor else None,
+        "errors": errors,
+    }
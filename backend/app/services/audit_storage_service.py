@@ -0,0 +1,355 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import Index, MetaData, Table, delete, func, inspect, insert, select, text, union_all
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.core.pagination import bind_datetime, encode_cursor, keyset_page_async
+from app.models.audit import AuditLog
+from app.services.export_service import iter_ndjson
+
+# 按月表命名 audit_logs_YYYYMM：PostgreSQL 上是 audit_logs 的分区，SQLite 上是滚动出主表的历史表
+PARTITION_PATTERN = re.compile(r"^audit_logs_(\d{4})(\d{2})$")
+DEFAULT_PARTITION = "audit_logs_default"  # PostgreSQL 默认分区，兜住没有对应月分区的行
+EXPORT_FIELDS = (
+    "id", "user_id", "username", "action", "resource_type", "resource_id", "detail", "ip_address", "created_at",
+    "chain_shard", "chain_seq", "chain_hash",  # 归档导回后仍可校验哈希链
+)
+
+
+def month_floor(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"audit_logs_{month:%Y%m}"
+
+
+class Partition(NamedTuple):
+    name: str
+    month: datetime  # 覆盖 [month, 下个月)
+
+    @property
+    def end(self) -> datetime:
+        return add_months(self.month, 1)
+
+
+def _partition(name: str) -> Optional[Partition]:
+    match = PARTITION_PATTERN.match(name)
+    if not match:
+        return None
+    return Partition(name, datetime(int(match.group(1)), int(match.group(2)), 1))
+
+
+@lru_cache(maxsize=None)
+def month_table(name: str) -> Table:
+    """与 audit_logs 同结构的按月表，索引名把表名前缀换成月表名（SQLite 索引名库内唯一）"""
+    base = AuditLog.__table__
+    columns = [c._copy() for c in base.columns]
+    for column in columns:
+        column.index = None  # 列上的 index=True 已包含在 base.indexes 中
+    table = Table(name, MetaData(), *columns)
+    for index in base.indexes:
+        Index(index.name.replace(base.name, name, 1), *(table.c[c.name] for c in index.columns))
+    return table
+
+
+def list_partitions(conn: Connection) -> List[Partition]:
+    """库中现有的按月表，按月份升序"""
+    if conn.dialect.name == "postgresql":
+        names = conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = 'audit_logs'"
+        )).scalars().all()
+    else:
+        names = inspect(conn).get_table_names()
+    return sorted(p for p in map(_partition, names) if p is not None)
+
+
+def audit_sources(conn: Connection, since: Optional[datetime] = None, until: Optional[datetime] = None) -> list:
+    """查询 [since, until) 需要访问的表，按时间从新到旧。
+    PostgreSQL 由分区裁剪自动跳过无关分区，只查父表；SQLite 先查主表，再按月份倒序查与时间范围相交的历史表"""
+    if conn.dialect.name == "postgresql":
+        return [AuditLog]
+    partitions = [
+        p for p in list_partitions(conn)
+        if (until is None or p.month < until) and (since is None or p.end > since)
+    ]
+    return [AuditLog] + [aliased(AuditLog, month_table(p.name), adapt_on_names=True) for p in reversed(partitions)]
+
+
+def audit_criteria(
+    entity,
+    action: Optional[str] = None,
+    resource_type: Optional[str] = None,
+    resource_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> list:
+    criteria = []
+    if action:
+        criteria.append(entity.action == action)
+    if resource_type:
+        criteria.append(entity.resource_type == resource_type)
+    # 0 是合法的资源 ID，不能按真值判断
+    if resource_id is not None:
+        criteria.append(entity.resource_id == resource_id)
+    if user_id is not None:
+        criteria.append(entity.user_id == user_id)
+    if since:
+        criteria.append(entity.created_at >= bind_datetime(since))
+    if until:
+        criteria.append(entity.created_at < bind_datetime(until))
+    return criteria
+
+
+def _union_entity(sources: list):
+    tables = [inspect(entity).selectable for entity in sources]
+    return aliased(AuditLog, union_all(*(select(t) for t in tables)).subquery("audit_logs_all"), adapt_on_names=True)
+
+
+async def list_audit_logs_async(
+    db: AsyncSession, cursor: Optional[str], limit: int, offset: int = 0, **filters,
+) -> Tuple[List[AuditLog], Optional[str]]:
+    """按 (created_at, id) 倒序键集分页。各表时间范围互不重叠，从新到旧逐表取数，
+    取满一页即停止：查询近期数据只访问主表（PostgreSQL 上为最近的分区）"""
+    sources = await db.run_sync(lambda session: audit_sources(session.connection(), filters.get("since"), filters.get("until")))
+    if offset and len(sources) > 1:
+        # offset 仅为兼容保留，跨表时退化为 UNION ALL
+        sources = [_union_entity(sources)]
+
+    rows: List[AuditLog] = []
+    next_cursor = None
+    if limit <= 0:
+        return rows, next_cursor
+    for entity in sources:
+        stmt = select(entity).where(*audit_criteria(entity, **filters))
+        if offset:
+            stmt = stmt.offset(offset)
+        if len(rows) == limit:
+            # 本页已满，只需确认更早的表里还有没有数据
+            if (await db.execute(stmt.with_only_columns(entity.id).limit(1))).first() is not None:
+                next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+            break
+        page, next_cursor = await keyset_page_async(db, stmt, entity.created_at, entity.id, cursor, limit - len(rows))
+        rows += page
+        if next_cursor:
+            break
+    return rows, next_cursor
+
+
+def select_audit_export(conn: Connection, **filters) -> list:
+    """导出语句，按时间从旧到新每张表一条、表内按主键顺序"""
+    statements = []
+    for entity in reversed(audit_sources(conn, filters.get("since"), filters.get("until"))):
+        columns = [getattr(entity, field) for field in EXPORT_FIELDS]
+        statements.append(select(*columns).where(*audit_criteria(entity, **filters)).order_by(entity.id))
+    return statements
+
+
+# ---- 维护：建分区、滚动、归档、保留期 ----
+
+def _ddl_date(value: datetime) -> str:
+    return f"'{value:%Y-%m-%d %H:%M:%S}'"
+
+
+def _create_pg_partition(conn: Connection, month: datetime) -> None:
+    name, end = partition_name(month), add_months(month, 1)
+    conn.execute(text(f'CREATE TABLE "{name}" (LIKE audit_logs INCLUDING DEFAULTS)'))
+    # 默认分区里落在该月的行先移入新表，否则 ATTACH 会违反默认分区的约束
+    conn.execute(text(
+        f'WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end RETURNING *) '
+        f'INSERT INTO "{name}" SELECT * FROM moved'
+    ), {"start": month, "end": end})
+    conn.execute(text(
+        f'ALTER TABLE audit_logs ATTACH PARTITION "{name}" FOR VALUES FROM ({_ddl_date(month)}) TO ({_ddl_date(end)})'
+    ))
+
+
+def ensure_partitions(engine: Engine, now: Optional[datetime] = None) -> List[str]:
+    """PostgreSQL：保证当前月及之后 AUDIT_PARTITION_PREMAKE_MONTHS 个月的分区存在"""
+    if engine.dialect.name != "postgresql":
+        return []
+    current = month_floor(now or datetime.utcnow())
+    created = []
+    with engine.begin() as conn:
+        existing = {p.name for p in list_partitions(conn)}
+        for i in range(settings.AUDIT_PARTITION_PREMAKE_MONTHS + 1):
+            month = add_months(current, i)
+            if partition_name(month) not in existing:
+                _create_pg_partition(conn, month)
+                created.append(partition_name(month))
+    return created
+
+
+def roll_hot_table(engine: Engine, now: Optional[datetime] = None) -> List[str]:
+    """SQLite：主表只保留最近 AUDIT_HOT_MONTHS 个月，更早的行按月移入 audit_logs_YYYYMM，每月一个事务"""
+    if engine.dialect.name == "postgresql":
+        return []
+    boundary = add_months(month_floor(now or datetime.utcnow()), 1 - max(settings.AUDIT_HOT_MONTHS, 1))
+    with engine.connect() as conn:
+        oldest = conn.execute(
+            select(func.min(AuditLog.created_at)).where(AuditLog.created_at < bind_datetime(boundary))
+        ).scalar()
+    if oldest is None:
+        return []
+
+    rolled = []
+    month = month_floor(oldest)
+    while month < boundary:
+        end = add_months(month, 1)
+        in_month = (AuditLog.created_at >= bind_datetime(month), AuditLog.created_at < bind_datetime(end))
+        with engine.begin() as conn:
+            if conn.execute(select(AuditLog.id).where(*in_month).limit(1)).first() is not None:
+                table = month_table(partition_name(month))
+                table.create(conn, checkfirst=True)
+                columns = list(AuditLog.__table__.c)
+                conn.execute(insert(table).from_select([c.name for c in columns], select(*columns).where(*in_month)))
+                conn.execute(delete(AuditLog).where(*in_month))
+                rolled.append(table.name)
+        month = end
+    return rolled
+
+
+def archive_path(name: str) -> str:
+    return os.path.join(settings.AUDIT_ARCHIVE_DIR, f"{name}.ndjson.gz")
+
+
+def _counting(batches: Iterator[Sequence], stats: dict) -> Iterator[Sequence]:
+    for rows in batches:
+        stats["rows"] += len(rows)
+        yield rows
+
+
+def _drop_partition(conn: Connection, name: str) -> None:
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(f'ALTER TABLE audit_logs DETACH PARTITION "{name}"'))
+    conn.execute(text(f'DROP TABLE "{name}"'))
+
+
+def archive_partition(engine: Engine, partition: Partition) -> dict:
+    """按月表导出为 gzip 压缩的 NDJSON（附带清单文件），核对行数后从库中删除"""
+    os.makedirs(settings.AUDIT_ARCHIVE_DIR, exist_ok=True)
+    path = archive_path(partition.name)
+    tmp_path = path + ".tmp"
+    table = month_table(partition.name)
+    stats = {"rows": 0}
+    with engine.connect() as conn:
+        result = conn.execute(select(table).order_by(table.c.id).execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        with gzip.open(tmp_path, "wb") as f:
+            for chunk in iter_ndjson(list(EXPORT_FIELDS), _counting(result.partitions(), stats)):
+                f.write(chunk)
+
+    digest = hashlib.sha256()
+    with open(tmp_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    manifest = {
+        "table": partition.name,
+        "from": partition.month.isoformat(),
+        "to": partition.end.isoformat(),
+        "rows": stats["rows"],
+        "sha256": digest.hexdigest(),
+        "archived_at": datetime.utcnow().isoformat(timespec="seconds"),
+    }
+    with engine.begin() as conn:
+        # 历史月份不会再有写入；行数对不上说明有并发写入或导出不完整，保留表不删
+        count = conn.execute(select(func.count()).select_from(table)).scalar()
+        if count != stats["rows"]:
+            os.remove(tmp_path)
+            raise RuntimeError(f"{partition.name} 归档行数 {stats['rows']} 与表中 {count} 行不一致")
+        os.replace(tmp_path, path)
+        with open(path[:-len(".ndjson.gz")] + ".json", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        _drop_partition(conn, partition.name)
+    return manifest
+
+
+def restore_archive(engine: Engine, month: datetime, batch_size: int = 5000) -> int:
+    """把归档文件重新导入对应的按月表，用于查询已归档的历史数据"""
+    name = partition_name(month)
+    table = month_table(name)
+    restored = 0
+    with engine.begin() as conn:
+        if name in {p.name for p in list_partitions(conn)}:
+            raise RuntimeError(f"{name} 已在库中")
+        if conn.dialect.name == "postgresql":
+            _create_pg_partition(conn, month)
+        else:
+            table.create(conn)
+        batch = []
+        with gzip.open(archive_path(name), "rt", encoding="utf-8") as f:
+            for line in f:
+                row = json.loads(line)
+                row["created_at"] = datetime.fromisoformat(row["created_at"])
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    conn.execute(insert(table), batch)
+                    restored += len(batch)
+                    batch = []
+        if batch:
+            conn.execute(insert(table), batch)
+            restored += len(batch)
+    return restored
+
+
+def list_archives() -> List[Partition]:
+    if not os.path.isdir(settings.AUDIT_ARCHIVE_DIR):
+        return []
+    names = (f[:-len(".ndjson.gz")] for f in os.listdir(settings.AUDIT_ARCHIVE_DIR) if f.endswith(".ndjson.gz"))
+    return sorted(p for p in map(_partition, names) if p is not None)
+
+
+def apply_retention(engine: Engine, now: Optional[datetime] = None) -> List[str]:
+    """超过 AUDIT_ARCHIVE_RETENTION_MONTHS 的月份：删除归档文件，仍在库中的按月表直接删除"""
+    if not settings.AUDIT_ARCHIVE_RETENTION_MONTHS:
+        return []
+    cutoff = add_months(month_floor(now or datetime.utcnow()), -settings.AUDIT_ARCHIVE_RETENTION_MONTHS)
+    expired = []
+    with engine.begin() as conn:
+        for partition in list_partitions(conn):
+            if partition.month < cutoff:
+                _drop_partition(conn, partition.name)
+                expired.append(partition.name)
+    for partition in list_archives():
+        if partition.month < cutoff:
+            base = archive_path(partition.name)[:-len(".ndjson.gz")]
+            for path in (base + ".ndjson.gz", base + ".json"):
+                if os.path.exists(path):
+                    os.remove(path)
+            expired.append(partition.name)
+    return sorted(set(expired))
+
+
+def run_maintenance(engine: Engine, now: Optional[datetime] = None) -> dict:
+    """定时执行（如每天一次）：建分区 / 滚动主表 → 按保留期删除 → 归档超出在线月数的按月表"""
+    now = now or datetime.utcnow()
+    report = {
+        "created": ensure_partitions(engine, now),
+        "rolled": roll_hot_table(engine, now),
+        "expired": apply_retention(engine, now),
+        "archived": [],
+    }
+    if settings.AUDIT_ONLINE_MONTHS:
+        cutoff = add_months(month_floor(now), 1 - settings.AUDIT_ONLINE_MONTHS)
+        with engine.connect() as conn:
+            partitions = [p for p in list_partitions(conn) if p.month < cutoff]
+        for partition in partitions:
+            report["archived"].append(archive_partition(engine, partition))
+    return report
@@ -0,0 +1,149 @@
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Iterator, List, Sequence
+
+from sqlalchemy import DateTime, Enum, Float, Integer, Numeric
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",  # 需要安装 pyarrow
+}
+
+
+class ExportError(Exception):
+    pass
+
+
+def check_format(fmt: str) -> str:
+    """开始输出响应体之前校验格式，之后出错已无法返回错误状态码"""
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"format 只支持 {', '.join(EXPORT_FORMATS)}")
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa
+        except ImportError as e:
+            raise ExportError("parquet 导出需要安装 pyarrow") from e
+    return fmt
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def iter_batches(session_factory: Callable[[], Session], statements: Sequence, batch_size: int = None) -> Iterator[Sequence]:
+    """服务器端游标分批取行（PostgreSQL 为命名游标），内存占用只与批大小有关；多条语句依次输出。
+    会话由生成器自己持有：响应体开始输出时请求依赖注入的会话已经关闭"""
+    db = session_factory()
+    try:
+        for stmt in statements:
+            result = db.execute(stmt.execution_options(yield_per=batch_size or settings.EXPORT_BATCH_SIZE))
+            for rows in result.partitions():
+                yield rows
+    finally:
+        db.close()
+
+
+def iter_csv(columns: List[str], batches: Iterator[Sequence]) -> Iterator[bytes]:
+    # 带 BOM，Excel 打开中文不乱码；与导入接口的 utf-8-sig 对应
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_plain(v) for v in row] for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_ndjson(columns: List[str], batches: Iterator[Sequence]) -> Iterator[bytes]:
+    for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(columns, map(_plain, row))), ensure_ascii=False) + "\n" for row in rows
+        ).encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """ParquetWriter 的输出目标：写入的字节暂存，每写完一个 row group 取走一次"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_type(column_type):
+    import pyarrow as pa
+
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Numeric) and not isinstance(column_type, Float) and column_type.scale is not None:
+        return pa.decimal128(column_type.precision or 38, column_type.scale)
+    if isinstance(column_type, (Float, Numeric)):
+        return pa.float64()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us")
+    return pa.string()  # 字符串、文本和枚举（导出枚举值）
+
+
+def iter_parquet(columns: List[str], column_types: List[Any], batches: Iterator[Sequence]) -> Iterator[bytes]:
+    """每批写成一个 row group；schema 取自列定义，不依赖首批数据推断"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(name, _arrow_type(t)) for name, t in zip(columns, column_types)])
+    enum_columns = [i for i, t in enumerate(column_types) if isinstance(t, Enum)]
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for rows in batches:
+            data = [list(col) for col in zip(*rows)]
+            for i in enum_columns:
+                data[i] = [_plain(v) for v in data[i]]
+            writer.write_table(pa.Table.from_arrays([pa.array(d, type=f.type) for d, f in zip(data, schema)], schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def iter_export(session_factory: Callable[[], Session], stmt, fmt: str, batch_size: int = None) -> Iterator[bytes]:
+    """stmt 为 select(列...)，列名即导出字段名；也可以是列相同的多条语句（如按月分表的审计日志）"""
+    statements = stmt if isinstance(stmt, (list, tuple)) else [stmt]
+    selected = statements[0].selected_columns
+    columns = [c.key for c in selected]
+    batches = iter_batches(session_factory, statements, batch_size)
+    if fmt == "csv":
+        return iter_csv(columns, batches)
+    if fmt == "ndjson":
+        return iter_ndjson(columns, batches)
+    return iter_parquet(columns, [c.type for c in selected], batches)
@@ -1,53 +1,202 @@
 import hashlib
 import os
-from typing import Optional
+import tempfile
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
 
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache import response_cache, materials_scope
 from app.core.config import settings
-from app.models.material import StageMaterial
+from app.core.workers import run_io
+from app.models.material import StageMaterial, MaterialBlob
 from app.models.stage import StageRecord
 
+# 返回一个新的分块迭代器；内容需要落盘时会被再次调用
+ChunkSource = Callable[[], Iterable[bytes]]
+
 
 def compute_sha256(file_bytes: bytes) -> str:
     return hashlib.sha256(file_bytes).hexdigest()
 
 
-def save_material(
-    db: Session,
-    stage_record_id: int,
-    file_name: str,
-    file_bytes: bytes,
-    file_type: str,
-    uploaded_by: int,
-) -> StageMaterial:
-    hash_value = compute_sha256(file_bytes)
+def iter_chunks(fileobj: BinaryIO, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+    """按固定大小分块读取文件对象，避免一次性载入内存"""
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def file_chunk_source(fileobj: BinaryIO) -> ChunkSource:
+    """可重复读取的文件对象（如 UploadFile.file），每次从头分块读取"""
+    def source() -> Iterator[bytes]:
+        fileobj.seek(0)
+        return iter_chunks(fileobj)
+    return source
+
+
+def blob_path(hash_value: str) -> str:
+    return os.path.join(settings.UPLOAD_DIR, "blobs", hash_value[:2], hash_value[2:4], hash_value)
+
+
+def _write_blob(hash_value: str, chunks: Iterable[bytes]) -> str:
+    """写入临时文件后原子重命名到内容地址，写入过程中再次校验哈希"""
+    path = blob_path(hash_value)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    hasher = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".upload-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                hasher.update(chunk)
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        if hasher.hexdigest() != hash_value:
+            raise IOError("文件内容在写入过程中发生变化")
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return path
+
 
+def _incr_blob_ref(db: Session, hash_value: str) -> bool:
+    updated = db.query(MaterialBlob).filter(MaterialBlob.hash_sha256 == hash_value).update(
+        {MaterialBlob.ref_count: MaterialBlob.ref_count + 1}, synchronize_session=False,
+    )
+    return updated > 0
+
+
+def _insert_blob(db: Session, hash_value: str, path: str, file_size: int) -> None:
+    try:
+        with db.begin_nested():
+            db.add(MaterialBlob(hash_sha256=hash_value, file_path=path, file_size=file_size, ref_count=1))
+    except IntegrityError:
+        # 并发上传了相同内容，对方已插入记录
+        _incr_blob_ref(db, hash_value)
+
+
+def acquire_blob(db: Session, hash_value: str, file_size: int, source: ChunkSource) -> str:
+    """引用已有内容或写入新内容，返回文件路径；引用计数在调用方事务内更新"""
+    path = blob_path(hash_value)
+    if _incr_blob_ref(db, hash_value):
+        if not os.path.exists(path):
+            _write_blob(hash_value, source())  # 文件丢失时顺便修复
+        return path
+
+    _write_blob(hash_value, source())
+    _insert_blob(db, hash_value, path, file_size)
+    return path
+
+
+def _next_version(db: Session, stage_record_id: int, file_name: str) -> int:
     # Version control: check existing file with same name
     existing = db.query(StageMaterial).filter(
         StageMaterial.stage_record_id == stage_record_id,
         StageMaterial.file_name == file_name,
     ).order_by(StageMaterial.version.desc()).first()
-    version = (existing.version + 1) if existing else 1
+    return (existing.version + 1) if existing else 1
 
-    # Save file to disk
-    upload_dir = os.path.join(settings.UPLOAD_DIR, str(stage_record_id))
-    os.makedirs(upload_dir, exist_ok=True)
-    file_path = os.path.join(upload_dir, f"v{version}_{file_name}")
-    with open(file_path, "wb") as f:
-        f.write(file_bytes)
 
+def _hash_source(source: ChunkSource):
+    hasher = hashlib.sha256()
+    file_size = 0
+    for chunk in source():
+        hasher.update(chunk)
+        file_size += len(chunk)
+    return hasher.hexdigest(), file_size
+
+
+def _add_material(
+    db: Session,
+    stage_record_id: int,
+    file_name: str,
+    file_path: str,
+    file_size: int,
+    file_type: str,
+    hash_value: str,
+    version: int,
+    uploaded_by: int,
+    commit: bool = True,
+) -> StageMaterial:
     material = StageMaterial(
         stage_record_id=stage_record_id,
         file_name=file_name,
         file_path=file_path,
-        file_size=len(file_bytes),
+        file_size=file_size,
         file_type=file_type,
         hash_sha256=hash_value,
         version=version,
         uploaded_by=uploaded_by,
     )
     db.add(material)
+    if not commit:
+        db.flush()
+        return material
     db.commit()
+    response_cache.bump(materials_scope(stage_record_id))
     db.refresh(material)
     return material
+
+
+def save_material_stream(
+    db: Session,
+    stage_record_id: int,
+    file_name: str,
+    source: ChunkSource,
+    file_type: str,
+    uploaded_by: int,
+    commit: bool = True,
+) -> StageMaterial:
+    """流式保存材料：先分块计算SHA-256，内容已存在时只增加引用，否则写入内容寻址存储。
+    commit=False 时只 flush，由调用方在同一事务中提交，并在提交后使 materials 缓存失效"""
+    hash_value, file_size = _hash_source(source)
+    version = _next_version(db, stage_record_id, file_name)
+    file_path = acquire_blob(db, hash_value, file_size, source)
+    return _add_material(db, stage_record_id, file_name, file_path, file_size, file_type, hash_value, version, uploaded_by, commit)
+
+
+def _ensure_blob_file(hash_value: str, source: ChunkSource) -> str:
+    path = blob_path(hash_value)
+    if not os.path.exists(path):
+        _write_blob(hash_value, source())
+    return path
+
+
+def _record_material(db: Session, stage_record_id: int, file_name: str, path: str, file_size: int, file_type: str, hash_value: str, uploaded_by: int) -> StageMaterial:
+    version = _next_version(db, stage_record_id, file_name)
+    if not _incr_blob_ref(db, hash_value):
+        _insert_blob(db, hash_value, path, file_size)
+    return _add_material(db, stage_record_id, file_name, path, file_size, file_type, hash_value, version, uploaded_by)
+
+
+async def save_material_stream_async(
+    db: AsyncSession,
+    stage_record_id: int,
+    file_name: str,
+    source: ChunkSource,
+    file_type: str,
+    uploaded_by: int,
+) -> StageMaterial:
+    """save_material_stream 的 AsyncSession 版本：哈希和写盘放在有界线程池，
+    内容文件先于数据库记录落盘（内容寻址，重复写入无害），数据库部分在异步驱动上执行"""
+    hash_value, file_size = await run_io(_hash_source, source)
+    path = await run_io(_ensure_blob_file, hash_value, source)
+    return await db.run_sync(_record_material, stage_record_id, file_name, path, file_size, file_type, hash_value, uploaded_by)
+
+
+def save_material(
+    db: Session,
+    stage_record_id: int,
+    file_name: str,
+    file_bytes: bytes,
+    file_type: str,
+    uploaded_by: int,
+) -> StageMaterial:
+    return save_material_stream(db, stage_record_id, file_name, lambda: [file_bytes], file_type, uploaded_by)
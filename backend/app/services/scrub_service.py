@@ -0,0 +1,296 @@
+import hashlib
+import mmap
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.material import MaterialBlob, MaterialScrubIssue, MaterialScrubRun, StageMaterial
+
+UNFINISHED = ("running", "paused")
+
+
+class ScrubResult(NamedTuple):
+    status: str  # ok/mismatch/missing/error
+    actual_sha256: Optional[str]
+    bytes_read: int
+    detail: Optional[str] = None
+
+
+class Throttle:
+    """令牌桶：平均读取速率不超过 bytes_per_sec，0 表示不限制"""
+
+    def __init__(self, bytes_per_sec: float):
+        self.bytes_per_sec = bytes_per_sec
+        self._started = time.monotonic()
+        self._consumed = 0
+
+    def consume(self, size: int) -> None:
+        if self.bytes_per_sec <= 0:
+            return
+        self._consumed += size
+        ahead = self._consumed / self.bytes_per_sec - (time.monotonic() - self._started)
+        if ahead > 0:
+            time.sleep(ahead)
+
+
+_throttle: Optional[Throttle] = None
+
+
+def _worker_throttle(bytes_per_sec: float) -> Throttle:
+    # 每个进程一个令牌桶，在该进程处理的所有文件间累计
+    global _throttle
+    if _throttle is None or _throttle.bytes_per_sec != bytes_per_sec:
+        _throttle = Throttle(bytes_per_sec)
+    return _throttle
+
+
+def hash_file(path: str, chunk_size: int, throttle: Optional[Throttle] = None) -> str:
+    """以内存映射方式顺序读取并计算 SHA-256：不经过用户态缓冲区拷贝，内核按顺序预读"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return digest.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, "madvise"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, size, chunk_size):
+                    chunk = view[offset:offset + chunk_size]
+                    digest.update(chunk)
+                    if throttle is not None:
+                        throttle.consume(len(chunk))
+                    chunk.release()
+            finally:
+                view.release()
+    return digest.hexdigest()
+
+
+def check_blob(path: str, expected: str, chunk_size: int, bytes_per_sec: float) -> ScrubResult:
+    """在工作进程中执行；bytes_per_sec 为本进程分到的带宽"""
+    try:
+        size = os.path.getsize(path)
+        actual = hash_file(path, chunk_size, _worker_throttle(bytes_per_sec))
+    except FileNotFoundError:
+        return ScrubResult("missing", None, 0, "文件不存在")
+    except OSError as e:
+        return ScrubResult("error", None, 0, f"{type(e).__name__}: {e}")
+    if actual != expected:
+        return ScrubResult("mismatch", actual, size, "内容与记录的 SHA-256 不符")
+    return ScrubResult("ok", actual, size)
+
+
+def start_run(db: Session, workers: int, bandwidth_mb_per_sec: float, restart: bool = False) -> MaterialScrubRun:
+    """继续最近一次未完成的巡检（进程被杀时状态仍为 running），没有或 restart 时新建"""
+    run = db.query(MaterialScrubRun).filter(MaterialScrubRun.status.in_(UNFINISHED)).order_by(MaterialScrubRun.id.desc()).first()
+    if run is not None and restart:
+        run.status, run.finished_at = "failed", datetime.utcnow()
+        run = None
+    if run is None:
+        total_blobs, total_bytes = db.query(func.count(), func.coalesce(func.sum(MaterialBlob.file_size), 0)).select_from(MaterialBlob).one()
+        run = MaterialScrubRun(status="running", cursor="", total_blobs=total_blobs, total_bytes=total_bytes)
+        db.add(run)
+    run.status, run.workers, run.bandwidth_mb_per_sec = "running", workers, bandwidth_mb_per_sec or None
+    run.updated_at = datetime.utcnow()
+    db.commit()
+    return run
+
+
+def _iter_blobs(session_factory: Callable[[], Session], cursor: str, batch_size: int = 1000):
+    """按主键键集分批读取，每批一个短会话，不长时间占用连接"""
+    while True:
+        db = session_factory()
+        try:
+            batch = db.execute(
+                select(MaterialBlob.hash_sha256, MaterialBlob.file_path, MaterialBlob.file_size)
+                .where(MaterialBlob.hash_sha256 > cursor).order_by(MaterialBlob.hash_sha256).limit(batch_size)
+            ).all()
+        finally:
+            db.close()
+        yield from batch
+        if len(batch) < batch_size:
+            return
+        cursor = batch[-1].hash_sha256
+
+
+def _record(db: Session, run: MaterialScrubRun, results: List[tuple], cursor: str, now: datetime, active_seconds: float) -> None:
+    """写入一批结果并推进检查点，同一事务提交；active_seconds 为上个检查点以来的运行时间"""
+    ok = [blob.hash_sha256 for blob, result in results if result.status == "ok"]
+    if ok:
+        db.execute(
+            update(MaterialBlob).where(MaterialBlob.hash_sha256.in_(ok))
+            .values(last_verified_at=now, verify_status="ok").execution_options(synchronize_session=False)
+        )
+    bad = [(blob, result) for blob, result in results if result.status != "ok"]
+    if bad:
+        # 巡检期间被删除的文件不算丢失
+        existing = set(db.execute(
+            select(MaterialBlob.hash_sha256).where(MaterialBlob.hash_sha256.in_([blob.hash_sha256 for blob, _ in bad]))
+        ).scalars())
+        bad = [(blob, result) for blob, result in bad if blob.hash_sha256 in existing]
+    for blob, result in bad:
+        db.add(MaterialScrubIssue(
+            run_id=run.id, hash_sha256=blob.hash_sha256, status=result.status, actual_sha256=result.actual_sha256,
+            file_path=blob.file_path, file_size=blob.file_size, detail=result.detail, detected_at=now,
+        ))
+        db.execute(
+            update(MaterialBlob).where(MaterialBlob.hash_sha256 == blob.hash_sha256)
+            .values(verify_status=result.status).execution_options(synchronize_session=False)
+        )
+        if result.status == "mismatch":
+            run.mismatches += 1
+        elif result.status == "missing":
+            run.missing += 1
+        else:
+            run.errors += 1
+    run.scanned_blobs += len(results)
+    run.scanned_bytes += sum(result.bytes_read for _, result in results)
+    run.cursor = cursor
+    run.active_seconds += active_seconds
+    run.updated_at = now
+    db.commit()
+
+
+def _executor(workers: int) -> Executor:
+    # 单进程时用线程执行，便于调试和测试；hashlib 处理大块数据时释放 GIL
+    return ProcessPoolExecutor(max_workers=workers) if workers > 1 else ThreadPoolExecutor(max_workers=1)
+
+
+def run_scrub(
+    session_factory: Callable[[], Session],
+    workers: Optional[int] = None,
+    bandwidth_mb_per_sec: Optional[float] = None,
+    max_seconds: float = 0,
+    restart: bool = False,
+) -> MaterialScrubRun:
+    """重新哈希 material_blobs 中的全部文件并与记录的 SHA-256 比对。
+    多进程并行读取，带宽上限在各进程间平分；每 SCRUB_CHECKPOINT_SECONDS 把结果和进度写库，
+    进度只推进到“之前的文件都已完成”的位置，中断后重跑会从该处继续。
+    max_seconds 到时停止派发新文件，等在途文件完成后以 paused 状态退出，下次继续"""
+    workers = workers or settings.SCRUB_WORKERS or os.cpu_count() or 1
+    bandwidth = settings.SCRUB_BANDWIDTH_MB_PER_SEC if bandwidth_mb_per_sec is None else bandwidth_mb_per_sec
+    per_worker = bandwidth * 1024 * 1024 / workers if bandwidth else 0
+    chunk_size = settings.SCRUB_READ_CHUNK_SIZE
+
+    db = session_factory()
+    run = None
+    try:
+        run = start_run(db, workers, bandwidth, restart)
+        started = time.monotonic()
+        last_checkpoint = started
+        blobs = _iter_blobs(session_factory, run.cursor)
+        pending: Dict = {}
+        order = deque()  # 已派发、按主键顺序
+        finished = set()
+        results: List[tuple] = []
+        cursor, exhausted, stopped = run.cursor, False, False
+        with _executor(workers) as executor:
+            while True:
+                while not (exhausted or stopped) and len(pending) < workers * 4:
+                    blob = next(blobs, None)
+                    if blob is None:
+                        exhausted = True
+                        break
+                    pending[executor.submit(check_blob, blob.file_path, blob.hash_sha256, chunk_size, per_worker)] = blob
+                    order.append(blob.hash_sha256)
+                if not pending:
+                    break
+                done, _ = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    blob = pending.pop(future)
+                    results.append((blob, future.result()))
+                    finished.add(blob.hash_sha256)
+                while order and order[0] in finished:
+                    finished.discard(order[0])
+                    cursor = order.popleft()
+                if max_seconds and time.monotonic() - started >= max_seconds:
+                    stopped = True
+                if results and time.monotonic() - last_checkpoint >= settings.SCRUB_CHECKPOINT_SECONDS:
+                    now = time.monotonic()
+                    _record(db, run, results, cursor, datetime.utcnow(), now - last_checkpoint)
+                    results, last_checkpoint = [], now
+
+        now = datetime.utcnow()
+        if stopped and not exhausted:
+            run.status = "paused"
+        else:
+            run.status, run.finished_at = "completed", now
+        _record(db, run, results, cursor, now, time.monotonic() - last_checkpoint)
+        db.refresh(run)
+        return run
+    except BaseException:
+        db.rollback()
+        if run is None:
+            raise
+        db.query(MaterialScrubRun).filter(MaterialScrubRun.id == run.id, MaterialScrubRun.status == "running").update(
+            {MaterialScrubRun.status: "paused", MaterialScrubRun.updated_at: datetime.utcnow()}, synchronize_session=False,
+        )
+        db.commit()
+        raise
+    finally:
+        db.close()
+
+
+def scrub_status(db: Session, issue_limit: int = 50) -> dict:
+    """最近一次巡检的进度、吞吐和预计剩余时间，以及最近发现的问题及其影响的材料"""
+    run = db.query(MaterialScrubRun).order_by(MaterialScrubRun.id.desc()).first()
+    issues = db.query(MaterialScrubIssue).order_by(MaterialScrubIssue.id.desc()).limit(issue_limit).all()
+    materials: Dict[str, List[int]] = {}
+    if issues:
+        for material_id, hash_value in db.execute(
+            select(StageMaterial.id, StageMaterial.hash_sha256)
+            .where(StageMaterial.hash_sha256.in_({issue.hash_sha256 for issue in issues})).order_by(StageMaterial.id)
+        ).all():
+            materials.setdefault(hash_value, []).append(material_id)
+    never_verified = db.query(func.count()).select_from(MaterialBlob).filter(MaterialBlob.last_verified_at.is_(None)).scalar()
+
+    progress = None
+    if run is not None:
+        # 按实际运行时间计算吞吐：分多晚完成的巡检，暂停的间隔不计入
+        rate = run.scanned_bytes / run.active_seconds if run.active_seconds else None
+        remaining = max(run.total_bytes - run.scanned_bytes, 0)
+        progress = {
+            "id": run.id,
+            "status": run.status,
+            "started_at": run.started_at,
+            "updated_at": run.updated_at,
+            "finished_at": run.finished_at,
+            "active_seconds": round(run.active_seconds, 2),
+            "total_blobs": run.total_blobs,
+            "total_bytes": run.total_bytes,
+            "scanned_blobs": run.scanned_blobs,
+            "scanned_bytes": run.scanned_bytes,
+            # 丢失的文件不计字节，中断后从检查点继续又会重扫少量文件，按字节估算的进度只是近似值
+            "percent": 100.0 if run.status == "completed" or not run.total_bytes
+            else min(round(100 * run.scanned_bytes / run.total_bytes, 2), 99.99),
+            "mb_per_sec": round(rate / 1024 / 1024, 2) if rate else None,
+            "eta_seconds": round(remaining / rate) if rate and run.status in UNFINISHED else None,
+            "mismatches": run.mismatches,
+            "missing": run.missing,
+            "errors": run.errors,
+        }
+    return {
+        "run": progress,
+        "never_verified_blobs": never_verified,
+        "issues": [
+            {
+                "hash_sha256": issue.hash_sha256,
+                "status": issue.status,
+                "actual_sha256": issue.actual_sha256,
+                "file_path": issue.file_path,
+                "detail": issue.detail,
+                "detected_at": issue.detected_at,
+                "run_id": issue.run_id,
+                "material_ids": materials.get(issue.hash_sha256, []),
+            }
+            for issue in issues
+        ],
+    }
@@ -0,0 +1,103 @@
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, insert, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.cache import response_cache, STATISTICS_SCOPE
+from app.models.asset import DataAsset, AssetStage
+from app.models.statistics import AssetStageSummary
+
+
+def _to_decimal(amount) -> Decimal:
+    if amount is None:
+        return Decimal(0)
+    return amount if isinstance(amount, Decimal) else Decimal(str(amount))
+
+
+def _apply_delta(db: Session, org_id: int, stage: AssetStage, asset_count: int, valued_count: int, valuation_total: Decimal) -> None:
+    values = {
+        AssetStageSummary.asset_count: AssetStageSummary.asset_count + asset_count,
+        AssetStageSummary.valued_count: AssetStageSummary.valued_count + valued_count,
+        AssetStageSummary.valuation_total: AssetStageSummary.valuation_total + valuation_total,
+    }
+    query = db.query(AssetStageSummary).filter(AssetStageSummary.org_id == org_id, AssetStageSummary.stage == stage)
+    if query.update(values, synchronize_session=False):
+        return
+    try:
+        with db.begin_nested():
+            db.add(AssetStageSummary(
+                org_id=org_id, stage=stage,
+                asset_count=asset_count, valued_count=valued_count, valuation_total=valuation_total,
+            ))
+    except IntegrityError:
+        # 并发插入了同一行，改为累加
+        query.update(values, synchronize_session=False)
+
+
+def record_asset_change(
+    db: Session,
+    org_id: int,
+    old_stage: Optional[AssetStage],
+    old_amount,
+    new_stage: Optional[AssetStage],
+    new_amount,
+) -> None:
+    """资产新增（old_stage 为 None）、阶段推进或估值变更时调用，在调用方事务内更新汇总表"""
+    deltas: Dict[AssetStage, list] = defaultdict(lambda: [0, 0, Decimal(0)])
+    if old_stage is not None:
+        delta = deltas[old_stage]
+        delta[0] -= 1
+        if old_amount is not None:
+            delta[1] -= 1
+            delta[2] -= _to_decimal(old_amount)
+    if new_stage is not None:
+        delta = deltas[new_stage]
+        delta[0] += 1
+        if new_amount is not None:
+            delta[1] += 1
+            delta[2] += _to_decimal(new_amount)
+
+    for stage, (asset_count, valued_count, valuation_total) in deltas.items():
+        if asset_count or valued_count or valuation_total:
+            _apply_delta(db, org_id, stage, asset_count, valued_count, valuation_total)
+
+
+def record_assets_created(db: Session, org_id: int, stage: AssetStage, count: int) -> None:
+    """批量导入时一次累加整批新资产"""
+    if count:
+        _apply_delta(db, org_id, stage, count, 0, Decimal(0))
+
+
+def reconcile_statistics(db: Session) -> int:
+    """按 data_assets 全量重算汇总表，修正增量维护可能产生的偏差；返回汇总行数"""
+    if db.get_bind().dialect.name == "postgresql":
+        # 阻塞增量写入直到重算提交，避免期间的变更被覆盖
+        db.execute(text("LOCK TABLE asset_stage_summary IN EXCLUSIVE MODE"))
+
+    rows = db.query(
+        DataAsset.org_id,
+        DataAsset.current_stage,
+        func.count(DataAsset.id),
+        func.count(DataAsset.valuation_amount),
+        func.coalesce(func.sum(DataAsset.valuation_amount), 0),
+    ).group_by(DataAsset.org_id, DataAsset.current_stage).all()
+
+    db.query(AssetStageSummary).delete(synchronize_session=False)
+    if rows:
+        db.execute(insert(AssetStageSummary), [
+            dict(org_id=org_id, stage=stage, asset_count=count, valued_count=valued, valuation_total=total)
+            for org_id, stage, count, valued, total in rows
+        ])
+    db.commit()
+    response_cache.bump(STATISTICS_SCOPE)
+    return len(rows)
+
+
+def summary_rows(db: Session, org_id: Optional[int] = None) -> List[AssetStageSummary]:
+    query = db.query(AssetStageSummary)
+    if org_id is not None:
+        query = query.filter(AssetStageSummary.org_id == org_id)
+    return query.all()
@@ -0,0 +1,173 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import response_cache, materials_scope
+from app.core.config import settings
+from app.models.material import StageMaterial
+from app.models.upload_session import UploadSession, UploadPart, UploadSessionStatus
+from app.services.material_service import iter_chunks, save_material_stream
+
+
+class UploadSessionError(Exception):
+    pass
+
+
+def session_dir(session_id: int) -> str:
+    return os.path.join(settings.UPLOAD_DIR, "_sessions", str(session_id))
+
+
+def _part_path(session_id: int, part_number: int) -> str:
+    return os.path.join(session_dir(session_id), f"{part_number}.part")
+
+
+def create_session(
+    db: Session,
+    stage_record_id: int,
+    file_name: str,
+    file_type: str,
+    total_size: int,
+    user_id: int,
+    part_size: Optional[int] = None,
+) -> UploadSession:
+    part_size = part_size or settings.UPLOAD_PART_SIZE
+    if total_size < 0:
+        raise UploadSessionError("文件大小不能为负数")
+    if part_size <= 0 or part_size > settings.UPLOAD_MAX_PART_SIZE:
+        raise UploadSessionError(f"分片大小必须在1到{settings.UPLOAD_MAX_PART_SIZE}字节之间")
+
+    upload_session = UploadSession(
+        stage_record_id=stage_record_id,
+        file_name=file_name,
+        file_type=file_type,
+        total_size=total_size,
+        part_size=part_size,
+        status=UploadSessionStatus.ACTIVE,
+        created_by=user_id,
+    )
+    db.add(upload_session)
+    db.commit()
+    db.refresh(upload_session)
+    os.makedirs(session_dir(upload_session.id), exist_ok=True)
+    return upload_session
+
+
+def expected_part_size(upload_session: UploadSession, part_number: int) -> int:
+    if part_number < upload_session.total_parts:
+        return upload_session.part_size
+    return upload_session.total_size - (upload_session.total_parts - 1) * upload_session.part_size
+
+
+def save_part(
+    db: Session,
+    upload_session: UploadSession,
+    part_number: int,
+    data: bytes,
+    expected_sha256: Optional[str] = None,
+) -> UploadPart:
+    """保存单个分片；同一分片重复上传时覆盖，便于客户端重试"""
+    if upload_session.status != UploadSessionStatus.ACTIVE:
+        raise UploadSessionError("上传会话已结束")
+    if part_number < 1 or part_number > upload_session.total_parts:
+        raise UploadSessionError(f"分片序号必须在1到{upload_session.total_parts}之间")
+    if len(data) != expected_part_size(upload_session, part_number):
+        raise UploadSessionError(f"分片{part_number}大小应为{expected_part_size(upload_session, part_number)}字节")
+
+    hash_value = hashlib.sha256(data).hexdigest()
+    if expected_sha256 and expected_sha256.lower() != hash_value:
+        raise UploadSessionError(f"分片{part_number}的SHA-256校验失败，请重新上传")
+
+    directory = session_dir(upload_session.id)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".part-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, _part_path(upload_session.id, part_number))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    part = db.query(UploadPart).filter(
+        UploadPart.session_id == upload_session.id,
+        UploadPart.part_number == part_number,
+    ).first()
+    if part is None:
+        part = UploadPart(session_id=upload_session.id, part_number=part_number)
+        db.add(part)
+    part.size = len(data)
+    part.hash_sha256 = hash_value
+    db.commit()
+    db.refresh(part)
+    return part
+
+
+def received_ranges(upload_session: UploadSession) -> List[Tuple[int, int]]:
+    """已接收的字节区间（左闭右开），相邻分片合并"""
+    ranges: List[Tuple[int, int]] = []
+    for part in upload_session.parts:
+        start = (part.part_number - 1) * upload_session.part_size
+        end = start + part.size
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+def missing_parts(upload_session: UploadSession) -> List[int]:
+    received = {part.part_number for part in upload_session.parts}
+    return [n for n in range(1, upload_session.total_parts + 1) if n not in received]
+
+
+def _iter_assembled(upload_session: UploadSession) -> Iterator[bytes]:
+    # 拼接时逐片复核哈希，防止分片文件在磁盘上被篡改或损坏
+    for part in upload_session.parts:
+        hasher = hashlib.sha256()
+        with open(_part_path(upload_session.id, part.part_number), "rb") as f:
+            for chunk in iter_chunks(f):
+                hasher.update(chunk)
+                yield chunk
+        if hasher.hexdigest() != part.hash_sha256:
+            raise UploadSessionError(f"分片{part.part_number}文件已损坏，请重新上传")
+
+
+def complete_session(db: Session, upload_session: UploadSession) -> StageMaterial:
+    """合并分片并生成材料记录，版本规则与 save_material 一致。
+    材料记录与会话状态在同一事务中提交；客户端重试已完成的会话时返回同一份材料"""
+    # 锁定会话行，并发的两次完成请求串行执行，后者看到 COMPLETED
+    upload_session = db.query(UploadSession).filter(
+        UploadSession.id == upload_session.id,
+    ).with_for_update().populate_existing().one()
+    if upload_session.status == UploadSessionStatus.COMPLETED and upload_session.material_id:
+        material = db.get(StageMaterial, upload_session.material_id)
+        if material:
+            return material
+    if upload_session.status != UploadSessionStatus.ACTIVE:
+        raise UploadSessionError("上传会话已结束")
+    missing = missing_parts(upload_session)
+    if missing:
+        raise UploadSessionError(f"仍缺少分片: {missing}")
+
+    material = save_material_stream(
+        db,
+        upload_session.stage_record_id,
+        upload_session.file_name,
+        lambda: _iter_assembled(upload_session),
+        upload_session.file_type or "",
+        upload_session.created_by,
+        commit=False,
+    )
+
+    upload_session.status = UploadSessionStatus.COMPLETED
+    upload_session.material_id = material.id
+    db.commit()
+    response_cache.bump(materials_scope(upload_session.stage_record_id))
+    db.refresh(material)
+    shutil.rmtree(session_dir(upload_session.id), ignore_errors=True)
+    return material
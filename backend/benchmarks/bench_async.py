@@ -0,0 +1,203 @@
+"""
+Benchmark: throughput and latency of the async API layer against the
+equivalent sync (thread pool) handlers under high concurrency.
+Usage: cd backend && python -m benchmarks.bench_async [--concurrency 500] [--requests 5000]
+Starts two uvicorn processes on settings.DATABASE_URL: app.main:app (async
+handlers on asyncpg/aiosqlite) and create_sync_app() below, which serves the
+same read paths with sync handlers and the sync services. Each is loaded with
+--concurrency simultaneous HTTP connections. Expects data from
+app.scripts.generate_data (same --prefix/--password). Meaningful numbers need
+PostgreSQL: SQLite serializes all access to the file either way. Once
+concurrency exceeds the thread pool and DB_POOL_SIZE + DB_MAX_OVERFLOW the sync
+variant stalls until DB_POOL_TIMEOUT (its sessions hold pooled connections
+while waiting for a thread to run the dependency cleanup), so it can take far
+longer than the async run; use --variants to run one side only.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+
+
+def create_sync_app():
+    """与 async 接口相同路径、相同服务逻辑的同步实现，作为对照组"""
+    from fastapi import Depends, FastAPI, HTTPException, Response
+    from sqlalchemy.orm import Session
+
+    from app.api.v1.assets import AssetFullOut, AssetOut
+    from app.api.v1.audit import AuditLogOut
+    from app.api.v1.auth import get_read_user, router as auth_router
+    from app.api.v1.materials import MaterialOut
+    from app.core.database import get_db, get_read_db
+    from app.core.pagination import NEXT_CURSOR_HEADER, keyset_page
+    from app.models import user, organization, asset, stage, material, audit, approval, upload_session, statistics  # noqa
+    from app.models.audit import AuditLog
+    from app.models.user import User
+    from app.services.asset_service import get_asset_full, latest_materials, list_assets
+
+    sync_app = FastAPI()
+    sync_app.include_router(auth_router)
+
+    @sync_app.get("/api/v1/assets", response_model=List[AssetOut])
+    def list_all(response: Response, cursor: Optional[str] = None, limit: int = 50,
+                 db: Session = Depends(get_db), user: User = Depends(get_read_user)):
+        assets, next_cursor = list_assets(db, user, None, cursor, limit)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return assets
+
+    @sync_app.get("/api/v1/assets/{asset_id}/full", response_model=AssetFullOut)
+    def full_detail(asset_id: int, db: Session = Depends(get_db), user: User = Depends(get_read_user)):
+        asset = get_asset_full(db, asset_id, user)
+        if not asset:
+            raise HTTPException(status_code=404)
+        result = AssetFullOut.model_validate(asset)
+        for history, record in zip(result.stage_records, asset.stage_records):
+            history.materials = [MaterialOut.model_validate(m) for m in latest_materials(record.materials)]
+        return result
+
+    @sync_app.get("/api/v1/audit", response_model=List[AuditLogOut])
+    def list_audit_logs(limit: int = 50, db: Session = Depends(get_read_db), user: User = Depends(get_read_user)):
+        logs, _ = keyset_page(db.query(AuditLog), AuditLog.created_at, AuditLog.id, None, limit)
+        return logs
+
+    return sync_app
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start(target: List[str], port: int, timeout: float = 30.0) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", *target, "--host", "127.0.0.1", "--port", str(port),
+         "--no-access-log", "--backlog", "4096"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/docs", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            if proc.poll() is not None:
+                raise RuntimeError("uvicorn 进程启动失败")
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("uvicorn 启动超时")
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+async def _load(base_url: str, paths: List[str], headers: dict, concurrency: int, total: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    timings, errors = [], 0
+    counter = iter(range(total))
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=120) as client:
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                t0 = time.perf_counter()
+                try:
+                    resp = await client.get(paths[i % len(paths)])
+                    ok = resp.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                timings.append(time.perf_counter() - t0)
+                errors += not ok
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    timings.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / wall, 1),
+        "p50_ms": round(_percentile(timings, 50) * 1000, 1),
+        "p99_ms": round(_percentile(timings, 99) * 1000, 1),
+        "max_ms": round(timings[-1] * 1000, 1),
+    }
+
+
+def _sample_asset_ids(limit: int) -> List[int]:
+    from app.core.database import SessionLocal
+    from app.models import user, organization, asset, stage, material, audit, approval, upload_session, statistics  # noqa
+    from app.models.asset import DataAsset
+
+    db = SessionLocal()
+    try:
+        return [row.id for row in db.query(DataAsset.id).order_by(DataAsset.id.desc()).limit(limit)]
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="async 与同步接口高并发对比")
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=5000, help="每个场景的请求总数")
+    parser.add_argument("--prefix", default="bench")
+    parser.add_argument("--password", default="bench123")
+    parser.add_argument("--variants", nargs="*", default=["sync", "async"], choices=["sync", "async"])
+    parser.add_argument("--output", help="结果写入的JSON文件")
+    args = parser.parse_args()
+
+    asset_ids = _sample_asset_ids(200)
+    if not asset_ids:
+        sys.exit("没有资产数据，请先运行 python -m app.scripts.generate_data")
+    scenarios = {
+        "asset_list": ["/api/v1/assets?limit=50"],
+        "asset_full_detail": [f"/api/v1/assets/{asset_id}/full" for asset_id in asset_ids],
+        "audit_recent": ["/api/v1/audit?limit=50"],
+    }
+    variants = {
+        "sync": ["--factory", "benchmarks.bench_async:create_sync_app"],
+        "async": ["app.main:app"],
+    }
+
+    report = {"benchmark": "async", "concurrency": args.concurrency, "results": []}
+    for variant in args.variants:
+        target = variants[variant]
+        port = _free_port()
+        proc = _start(target, port)
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            resp = httpx.post(f"{base_url}/api/v1/auth/login",
+                              data={"username": f"{args.prefix}_admin", "password": args.password}, timeout=30)
+            resp.raise_for_status()
+            headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+            for scenario, paths in scenarios.items():
+                asyncio.run(_load(base_url, paths, headers, 20, min(200, args.requests)))  # 预热连接池
+                result = asyncio.run(_load(base_url, paths, headers, args.concurrency, args.requests))
+                result.update(variant=variant, scenario=scenario)
+                report["results"].append(result)
+                print(json.dumps(result, ensure_ascii=False), flush=True)
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
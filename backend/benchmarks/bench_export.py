@@ -0,0 +1,58 @@
+"""
+Benchmark: streaming export throughput and peak Python memory per format.
+Usage: cd backend && python -m benchmarks.bench_export [--rows 10000 100000] [--formats csv ndjson parquet]
+Runs the audit log export statement through app.services.export_service on
+settings.DATABASE_URL populated by app.scripts.generate_data. Peak memory is
+measured with tracemalloc and should stay flat as --rows grows.
+"""
+import argparse
+import json
+import sys
+import os
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import select
+
+from app.core.database import SessionLocal
+from app.models import user, organization, asset, stage, material, audit, approval, upload_session, statistics  # noqa
+from app.models.audit import AuditLog
+from app.services.audit_storage_service import EXPORT_FIELDS
+from app.services.export_service import ExportError, check_format, iter_export
+
+
+def main():
+    parser = argparse.ArgumentParser(description="流式导出吞吐与内存峰值")
+    parser.add_argument("--rows", type=int, nargs="*", default=[10000, 100000])
+    parser.add_argument("--formats", nargs="*", default=["csv", "ndjson", "parquet"])
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    for fmt in args.formats:
+        try:
+            check_format(fmt)
+        except ExportError as e:
+            print(json.dumps({"format": fmt, "skipped": str(e)}, ensure_ascii=False))
+            continue
+        for rows in args.rows:
+            stmt = select(*(getattr(AuditLog, field) for field in EXPORT_FIELDS)).order_by(AuditLog.id).limit(rows)
+            tracemalloc.start()
+            started = time.perf_counter()
+            size = sum(len(chunk) for chunk in iter_export(SessionLocal, stmt, fmt, args.batch_size))
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(json.dumps({
+                "format": fmt,
+                "rows": rows,
+                "seconds": round(elapsed, 2),
+                "rows_per_second": round(rows / elapsed),
+                "output_mb": round(size / 1e6, 2),
+                "peak_python_mb": round(peak / 1e6, 2),
+            }), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmark: query plans and latency of the hot queries with and without the
+indexes added in migration 0005.
+Usage: cd backend && python -m benchmarks.bench_indexes [--repeat 50]
+Runs against settings.DATABASE_URL populated by app.scripts.generate_data.
+The indexes are dropped for the "before" pass and re-created afterwards; run
+it on a benchmark database, not on one that serves traffic.
+"""
+import argparse
+import json
+import sys
+import os
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import func
+
+from app.core.database import SessionLocal, engine
+from app.models import user, organization, asset, stage, material, audit, approval, upload_session, statistics  # noqa
+from app.models.approval import ApprovalRecord
+from app.models.asset import DataAsset, AssetStage
+from app.models.material import StageMaterial
+from app.models.stage import StageRecord, StageStatus
+
+# 迁移 0005 新增的索引
+INDEXES = {
+    "data_assets": ["ix_data_assets_stage_created_at_id", "ix_data_assets_name_pattern"],
+    "stage_records": ["ix_stage_records_asset_stage_status", "uq_stage_records_submitted"],
+    "approval_records": ["ix_approval_records_stage_record_id"],
+    "stage_materials": ["ix_stage_materials_record_name_version"],
+}
+
+
+def _indexes():
+    for table_name, names in INDEXES.items():
+        table = DataAsset.metadata.tables[table_name]
+        for index in table.indexes:
+            if index.name in names:
+                yield index
+
+
+def _queries(db) -> Dict[str, object]:
+    """与接口/服务中的查询形状一致；样本取一条待审批记录及其资产"""
+    record = db.query(StageRecord).filter(StageRecord.status == StageStatus.SUBMITTED).order_by(StageRecord.id.desc()).first()
+    if record is None:
+        sys.exit("没有待审批的阶段记录，请先运行 python -m app.scripts.generate_data")
+    record_ids = [row.id for row in db.query(StageRecord.id).filter(StageRecord.asset_id == record.asset_id)]
+    sample_name = db.query(DataAsset.name).filter(DataAsset.id == record.asset_id).scalar()
+    return {
+        # 资产列表 ?stage= 首页（键集分页）
+        "asset_list_by_stage": db.query(DataAsset).filter(DataAsset.current_stage == AssetStage.VALUE_ASSESSMENT)
+        .order_by(DataAsset.created_at.desc(), DataAsset.id.desc()).limit(51),
+        # 资产列表 ?name_prefix=
+        "asset_list_by_name_prefix": db.query(DataAsset).filter(DataAsset.name.startswith(sample_name[:-1], autoescape=True))
+        .order_by(DataAsset.created_at.desc(), DataAsset.id.desc()).limit(51),
+        # submit_stage 提交前查重
+        "submit_duplicate_check": db.query(StageRecord).filter(
+            StageRecord.asset_id == record.asset_id,
+            StageRecord.stage == record.stage,
+            StageRecord.status == StageStatus.SUBMITTED,
+        ).limit(1),
+        # 并行评审组审批状态
+        "approved_stages": db.query(StageRecord.stage).filter(
+            StageRecord.asset_id == record.asset_id,
+            StageRecord.stage.in_([AssetStage.COMPLIANCE_ASSESSMENT, AssetStage.QUALITY_REPORT]),
+            StageRecord.status == StageStatus.APPROVED,
+        ).distinct(),
+        # 资产详情的阶段历史
+        "asset_stage_history": db.query(StageRecord).filter(StageRecord.asset_id == record.asset_id)
+        .order_by(StageRecord.created_at, StageRecord.id),
+        # 阶段历史的审批记录（selectinload）
+        "approvals_for_records": db.query(ApprovalRecord).filter(ApprovalRecord.stage_record_id.in_(record_ids))
+        .order_by(ApprovalRecord.id),
+        # 上传材料时的同名版本号查询
+        "material_next_version": db.query(StageMaterial).filter(
+            StageMaterial.stage_record_id == record.id,
+            StageMaterial.file_name == "材料0.pdf",
+        ).order_by(StageMaterial.version.desc()).limit(1),
+        # 材料列表
+        "materials_for_record": db.query(StageMaterial).filter(StageMaterial.stage_record_id == record.id)
+        .order_by(StageMaterial.created_at.desc()),
+    }
+
+
+def _sql(query) -> str:
+    return str(query.statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def _plan(conn, sql: str) -> List[str]:
+    if engine.dialect.name == "sqlite":
+        return [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+    if engine.dialect.name == "postgresql":
+        return [row[0] for row in conn.exec_driver_sql("EXPLAIN (ANALYZE, BUFFERS) " + sql)]
+    return [str(row) for row in conn.exec_driver_sql("EXPLAIN " + sql)]
+
+
+def _measure(sqls: Dict[str, str], repeat: int) -> Dict[str, dict]:
+    results = {}
+    with engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+        for name, sql in sqls.items():
+            plan = _plan(conn, sql)
+            conn.exec_driver_sql(sql).fetchall()  # 预热
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                conn.exec_driver_sql(sql).fetchall()
+                timings.append(time.perf_counter() - started)
+            timings.sort()
+            results[name] = {
+                "p50_ms": round(timings[len(timings) // 2] * 1000, 3),
+                "max_ms": round(timings[-1] * 1000, 3),
+                "plan": plan,
+            }
+        conn.rollback()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="索引前后查询计划与耗时对比")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", help="结果写入的JSON文件")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    sqls = {name: _sql(query) for name, query in _queries(db).items()}
+    counts = {
+        "data_assets": db.query(func.count(DataAsset.id)).scalar(),
+        "stage_records": db.query(func.count(StageRecord.id)).scalar(),
+        "approval_records": db.query(func.count(ApprovalRecord.id)).scalar(),
+        "stage_materials": db.query(func.count(StageMaterial.id)).scalar(),
+    }
+    db.close()
+
+    indexes = list(_indexes())
+    for index in indexes:
+        index.drop(engine, checkfirst=True)
+    try:
+        before = _measure(sqls, args.repeat)
+    finally:
+        for index in indexes:
+            index.create(engine, checkfirst=True)
+    after = _measure(sqls, args.repeat)
+
+    report = {"benchmark": "indexes", "database": engine.dialect.name, "rows": counts, "queries": []}
+    for name, sql in sqls.items():
+        report["queries"].append({
+            "query": name,
+            "sql": " ".join(sql.split()),
+            "before_p50_ms": before[name]["p50_ms"],
+            "after_p50_ms": after[name]["p50_ms"],
+            "speedup": round(before[name]["p50_ms"] / after[name]["p50_ms"], 1) if after[name]["p50_ms"] else None,
+            "before_plan": before[name]["plan"],
+            "after_plan": after[name]["plan"],
+        })
+        print(json.dumps({k: v for k, v in report["queries"][-1].items() if k != "sql"}, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
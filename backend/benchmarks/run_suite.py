@@ -0,0 +1,280 @@
+"""
+Benchmark suite: p50/p95/p99 latency and throughput of the main API paths.
+Usage: cd backend && python -m benchmarks.run_suite [--generate] [--iterations 200] [--compare benchmarks/results/<old>.json]
+Runs in-process against settings.DATABASE_URL (SQLite or a local PostgreSQL),
+which must be migrated with `alembic upgrade head`. Expects data from
+app.scripts.generate_data with the same --prefix/--password; --generate
+creates it when missing.
+Results are printed as JSON lines and written to benchmarks/results/ tagged
+with the git commit, so runs between commits can be diffed with --compare.
+Note: the upload and approval scenarios write to the database.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.testclient import TestClient
+
+from app.core.audit import audit_sink
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.core.security import login_rate_limiter
+from app.main import app
+from app.models.stage import StageRecord, StageStatus
+from app.models.user import User
+from app.scripts.generate_data import generate
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    # nearest-rank
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def measure(name: str, call: Callable[[int], None], iterations: int, warmup: int) -> dict:
+    for i in range(warmup):
+        call(i)
+    timings = []
+    started = time.perf_counter()
+    for i in range(warmup, warmup + iterations):
+        t0 = time.perf_counter()
+        call(i)
+        timings.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - started
+    timings.sort()
+    return {
+        "scenario": name,
+        "iterations": iterations,
+        "p50_ms": round(_percentile(timings, 50) * 1000, 3),
+        "p95_ms": round(_percentile(timings, 95) * 1000, 3),
+        "p99_ms": round(_percentile(timings, 99) * 1000, 3),
+        "mean_ms": round(sum(timings) / len(timings) * 1000, 3),
+        "max_ms": round(timings[-1] * 1000, 3),
+        "throughput_rps": round(iterations / wall, 1),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class Suite:
+    def __init__(self, client: TestClient, prefix: str, password: str):
+        self.client = client
+        self.prefix = prefix
+        self.password = password
+        self.tokens = {}
+
+    def token(self, username: str) -> dict:
+        if username not in self.tokens:
+            resp = self.client.post("/api/v1/auth/login", data={"username": username, "password": self.password})
+            resp.raise_for_status()
+            self.tokens[username] = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+        return self.tokens[username]
+
+    def get(self, url: str, username: str) -> Callable[[int], None]:
+        headers = self.token(username)
+
+        def call(_):
+            resp = self.client.get(url, headers=headers)
+            assert resp.status_code == 200, (url, resp.status_code, resp.text[:200])
+        return call
+
+    def uncached(self, call: Callable[[int], None]) -> Callable[[int], None]:
+        def wrapped(i):
+            response_cache.clear()
+            call(i)
+        return wrapped
+
+    def login(self, username: str) -> Callable[[int], None]:
+        def call(_):
+            login_rate_limiter.reset(username)
+            resp = self.client.post("/api/v1/auth/login", data={"username": username, "password": self.password})
+            assert resp.status_code == 200, resp.text[:200]
+        return call
+
+    def upload(self, record_ids: List[int], username: str, size: int) -> Callable[[int], None]:
+        headers = self.token(username)
+        run_id = uuid.uuid4().bytes
+
+        def call(i):
+            # 每次内容不同，避免命中内容寻址去重
+            body = run_id + i.to_bytes(8, "big") + os.urandom(max(size - 24, 0))
+            resp = self.client.post(
+                f"/api/v1/materials/upload/{record_ids[i % len(record_ids)]}",
+                files={"file": ("bench.bin", body, "application/octet-stream")},
+                headers=headers,
+            )
+            assert resp.status_code == 200, resp.text[:200]
+        return call
+
+    def approve(self, record_ids: List[int], username: str) -> Callable[[int], None]:
+        headers = self.token(username)
+
+        def call(i):
+            resp = self.client.post(f"/api/v1/stages/records/{record_ids[i]}/approve", headers=headers)
+            assert resp.status_code == 200, resp.text[:200]
+        return call
+
+    def batch_approve(self, record_ids: List[int], username: str, batch: int) -> Callable[[int], None]:
+        headers = self.token(username)
+
+        def call(i):
+            ids = record_ids[i * batch:(i + 1) * batch]
+            resp = self.client.post("/api/v1/stages/records/batch-approve", json={"record_ids": ids}, headers=headers)
+            assert resp.status_code == 200, resp.text[:200]
+        return call
+
+
+def _submitted_records(prefix: str, limit: int) -> List[int]:
+    db = SessionLocal()
+    try:
+        holders = db.query(User.id).filter(User.username.like(f"{prefix}\\_holder%", escape="\\"))
+        rows = db.query(StageRecord.id).filter(
+            StageRecord.status == StageStatus.SUBMITTED,
+            StageRecord.submitted_by.in_(holders.scalar_subquery()),
+        ).order_by(StageRecord.id).limit(limit)
+        return [row.id for row in rows]
+    finally:
+        db.close()
+
+
+def _asset_of(record_id: int) -> int:
+    db = SessionLocal()
+    try:
+        return db.query(StageRecord.asset_id).filter(StageRecord.id == record_id).scalar()
+    finally:
+        db.close()
+
+
+def _user_exists(username: str) -> bool:
+    db = SessionLocal()
+    try:
+        return db.query(User.id).filter(User.username == username).first() is not None
+    finally:
+        db.close()
+
+
+def _compare(results: List[dict], baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {r["scenario"]: r for r in json.load(f)["results"]}
+    for result in results:
+        old = baseline.get(result["scenario"])
+        if not old:
+            continue
+        delta = (result["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100 if old["p50_ms"] else 0.0
+        print(json.dumps({
+            "scenario": result["scenario"], "p50_ms": result["p50_ms"], "baseline_p50_ms": old["p50_ms"],
+            "p50_change_pct": round(delta, 1), "p99_ms": result["p99_ms"], "baseline_p99_ms": old["p99_ms"],
+        }, ensure_ascii=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="接口性能基准套件")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--prefix", default="bench")
+    parser.add_argument("--password", default="bench123")
+    parser.add_argument("--generate", action="store_true", help="数据不存在时先生成")
+    parser.add_argument("--orgs", type=int, default=50)
+    parser.add_argument("--assets", type=int, default=10000)
+    parser.add_argument("--audit-rows", type=int, default=100000)
+    parser.add_argument("--upload-bytes", type=int, default=64 * 1024)
+    parser.add_argument("--batch-size", type=int, default=50, help="批量审批每批记录数")
+    parser.add_argument("--skip", nargs="*", default=[], help="跳过的场景名")
+    parser.add_argument("--output", help="结果文件路径，默认写入 benchmarks/results/")
+    parser.add_argument("--compare", help="与之前的结果文件对比")
+    args = parser.parse_args()
+
+    holder, registry, admin = f"{args.prefix}_holder0", f"{args.prefix}_registry_center", f"{args.prefix}_admin"
+    if not _user_exists(holder):
+        if not args.generate:
+            sys.exit(f"未找到用户 {holder}，请先运行 python -m app.scripts.generate_data 或加 --generate")
+        generate(args.orgs, args.assets, args.audit_rows, prefix=args.prefix, password=args.password, log=lambda msg: None)
+
+    if engine.dialect.name == "sqlite":
+        # SQLite 只有库级写锁：后台审计写入与批量审批（先读后写）并发时锁升级会直接报 database is locked
+        audit_sink.configure(synchronous=True)
+    upload_dir = tempfile.mkdtemp(prefix="bench-uploads-")
+    settings.UPLOAD_DIR = upload_dir
+    client = TestClient(app)
+    suite = Suite(client, args.prefix, args.password)
+    n, w = args.iterations, args.warmup
+
+    scenarios = [
+        ("asset_list_admin", suite.get("/api/v1/assets?limit=50", admin)),
+        ("asset_list_holder", suite.get("/api/v1/assets?limit=50", holder)),
+        ("asset_list_stage_filter", suite.get("/api/v1/assets?limit=50&stage=value_assessment", admin)),
+        ("statistics_city_uncached", suite.uncached(suite.get("/api/v1/statistics/city", admin))),
+        ("statistics_city_cached", suite.get("/api/v1/statistics/city", admin)),
+        ("statistics_holder_uncached", suite.uncached(suite.get("/api/v1/statistics/holder", holder))),
+        ("audit_recent", suite.get("/api/v1/audit?limit=50", admin)),
+        ("audit_by_action", suite.get("/api/v1/audit?action=approve&limit=50", admin)),
+        ("audit_by_resource", suite.get("/api/v1/audit?resource_type=asset&resource_id=1&limit=50", admin)),
+        ("login", suite.login(holder)),
+    ]
+    pending = _submitted_records(args.prefix, 2 * (n + w) + (n + w) * args.batch_size)
+    single, rest = pending[:n + w], pending[n + w:]
+    if pending:
+        # 有待审批记录的资产带完整的阶段历史，用它测详情接口
+        scenarios.insert(3, ("asset_detail_full", suite.get(f"/api/v1/assets/{_asset_of(pending[-1])}/full", admin)))
+        scenarios.append(("upload", suite.upload(pending, holder, args.upload_bytes)))
+    if len(single) == n + w:
+        scenarios.append(("approve", suite.approve(single, registry)))
+    batch_rounds = len(rest) // args.batch_size
+    batch_results = []
+
+    results = []
+    for name, call in scenarios:
+        if name in args.skip:
+            continue
+        result = measure(name, call, n, w)
+        results.append(result)
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+
+    if "batch_approve" not in args.skip and batch_rounds > w:
+        result = measure("batch_approve", suite.batch_approve(rest, registry, args.batch_size), batch_rounds - w, w)
+        result["records_per_second"] = round(result["throughput_rps"] * args.batch_size, 1)
+        batch_results.append(result)
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+    results += batch_results
+
+    report = {
+        "suite": "api",
+        "git_commit": _git_commit(),
+        "database": engine.dialect.name,
+        "started_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "iterations": n,
+        "warmup": w,
+        "prefix": args.prefix,
+        "results": results,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.utcnow():%Y%m%dT%H%M%S}-{report['git_commit']}-{report['database']}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {output}", file=sys.stderr)
+
+    if args.compare:
+        _compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,24 @@
+from contextlib import contextmanager
+
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
-from app.core.database import Base, get_db
+from app.core.audit import audit_sink
+from app.core.cache import response_cache
+from app.core.database import Base, get_db, get_read_db, get_async_db, get_async_read_db, get_read_sessionmaker
+from app.core.security import login_rate_limiter
+from app.core.user_cache import user_cache
 from app.main import app
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test_all.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# 异步接口用 aiosqlite 访问同一个文件；TestClient 每次请求可能换事件循环，不复用连接
+async_engine = create_async_engine("sqlite+aiosqlite:///./test_all.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
 
 
 def override_get_db():
@@ -18,7 +29,43 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+app.dependency_overrides[get_async_read_db] = override_get_async_db
+app.dependency_overrides[get_read_sessionmaker] = lambda: TestingSessionLocal
+audit_sink.configure(session_factory=TestingSessionLocal, synchronous=True)
+
+
+@contextmanager
+def count_queries():
+    """记录代码块内对测试库执行的SQL语句"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = (engine, async_engine.sync_engine)
+    for target in engines:
+        event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+
+@contextmanager
+def query_budget(limit):
+    """代码块内执行的SQL超过 limit 条即失败，用于发现 N+1 查询"""
+    with count_queries() as statements:
+        yield statements
+    assert len(statements) <= limit, f"执行了 {len(statements)} 条SQL，超出预算 {limit}:\n" + "\n".join(statements)
 
 
 @pytest.fixture(autouse=True)
@@ -27,10 +74,15 @@ def setup_db(tmp_path, monkeypatch):
     from app.models.user import User  # noqa
     from app.models.asset import DataAsset  # noqa
     from app.models.stage import StageRecord  # noqa
-    from app.models.material import StageMaterial  # noqa
+    from app.models.material import StageMaterial, MaterialBlob  # noqa
     from app.models.audit import AuditLog  # noqa
     from app.models.approval import ApprovalRecord  # noqa
+    from app.models.upload_session import UploadSession, UploadPart  # noqa
+    from app.models.statistics import AssetStageSummary  # noqa
     Base.metadata.create_all(bind=engine)
     monkeypatch.setattr("app.core.config.settings.UPLOAD_DIR", str(tmp_path))
+    user_cache.clear()
+    response_cache.clear()
+    login_rate_limiter.clear()
     yield
     Base.metadata.drop_all(bind=engine)
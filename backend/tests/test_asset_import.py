@@ -0,0 +1,88 @@
+import json
+
+from fastapi.testclient import TestClient
+from tests.conftest import TestingSessionLocal
+from app.main import app
+from app.models.asset import DataAsset
+from app.models.audit import AuditLog
+
+client = TestClient(app)
+
+
+def _create_org_and_user(role="data_holder"):
+    db = TestingSessionLocal()
+    from app.models.organization import Organization
+    from app.models.user import User
+    from app.core.security import get_password_hash
+
+    org = Organization(name="测试公司", org_type="enterprise")
+    db.add(org)
+    db.commit()
+    db.refresh(org)
+    db.add(User(username=f"user_{role}", hashed_password=get_password_hash("pass123"), role=role, org_id=org.id))
+    db.commit()
+    db.close()
+
+    resp = client.post("/api/v1/auth/login", data={"username": f"user_{role}", "password": "pass123"})
+    return resp.json()["access_token"]
+
+
+def _h(token, content_type):
+    return {"Authorization": f"Bearer {token}", "Content-Type": content_type}
+
+
+def test_import_ndjson_in_batches():
+    token = _create_org_and_user()
+    lines = [json.dumps({"name": f"资产{i}", "asset_type": "数据集"}) for i in range(25)]
+    resp = client.post("/api/v1/assets/import?batch_size=10", content="\n".join(lines), headers=_h(token, "application/x-ndjson"))
+    assert resp.status_code == 200
+    report = resp.json()
+    assert report["created"] == 25
+    assert report["failed"] == 0
+    assert [r["row"] for r in report["results"]] == list(range(1, 26))
+
+    db = TestingSessionLocal()
+    assert db.query(DataAsset).count() == 25
+    asset = db.query(DataAsset).filter(DataAsset.id == report["results"][3]["asset_id"]).one()
+    assert asset.name == "资产3"
+    # 整个导入只记一条审计日志
+    assert db.query(AuditLog).filter(AuditLog.action == "import").count() == 1
+    db.close()
+
+    stats = client.get("/api/v1/statistics/holder", headers={"Authorization": f"Bearer {token}"}).json()
+    assert stats["total_assets"] == 25
+
+
+def test_import_csv_reports_row_errors():
+    token = _create_org_and_user()
+    body = "name,description,asset_type\n客户数据,CRM,数据集\n,缺少名称,\n交通数据,,\n多余列,a,b,c\n"
+    resp = client.post("/api/v1/assets/import", content=body.encode(), headers=_h(token, "text/csv"))
+    assert resp.status_code == 200
+    report = resp.json()
+    assert report["created"] == 2
+    assert [r["status"] for r in report["results"]] == ["created", "error", "created", "error"]
+    assert report["results"][1]["error"].startswith("name")
+
+    db = TestingSessionLocal()
+    traffic = db.query(DataAsset).filter(DataAsset.name == "交通数据").one()
+    assert traffic.description == ""
+    assert traffic.asset_type is None
+    db.close()
+
+
+def test_import_validation_errors():
+    token = _create_org_and_user()
+    body = '{"name": "好的"}\n{"description": "没有名称"}\nnot json\n[1, 2]\n'
+    report = client.post("/api/v1/assets/import?format=ndjson", content=body, headers=_h(token, "text/plain")).json()
+    assert report["created"] == 1
+    errors = {r["row"]: r["error"] for r in report["results"] if r["status"] == "error"}
+    assert set(errors) == {2, 3, 4}
+    assert errors[2].startswith("name")
+
+
+def test_import_requires_format_and_role():
+    token = _create_org_and_user()
+    assert client.post("/api/v1/assets/import", content="{}", headers=_h(token, "text/plain")).status_code == 415
+    assessor = _create_org_and_user("assessor")
+    resp = client.post("/api/v1/assets/import", content="{}", headers=_h(assessor, "application/x-ndjson"))
+    assert resp.status_code == 403
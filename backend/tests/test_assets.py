@@ -71,3 +71,45 @@ def test_get_asset_not_found():
     token = _create_org_and_user("data_holder")
     resp = client.get("/api/v1/assets/9999", headers=_auth_header(token))
     assert resp.status_code == 404
+
+
+def test_list_assets_cursor_pagination():
+    token = _create_org_and_user("data_holder")
+    created = [
+        client.post("/api/v1/assets", json={"name": f"分页资产{i}"}, headers=_auth_header(token)).json()["id"]
+        for i in range(5)
+    ]
+
+    seen, cursor = [], None
+    for _ in range(5):
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get("/api/v1/assets", params=params, headers=_auth_header(token))
+        assert resp.status_code == 200
+        assert len(resp.json()) <= 2
+        seen.extend(a["id"] for a in resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == sorted(created, reverse=True)
+
+
+def test_list_assets_filters():
+    token = _create_org_and_user("data_holder")
+    client.post("/api/v1/assets", json={"name": "交通流量", "asset_type": "数据集", "data_classification": "公共"}, headers=_auth_header(token))
+    client.post("/api/v1/assets", json={"name": "交通事故", "asset_type": "API服务"}, headers=_auth_header(token))
+    client.post("/api/v1/assets", json={"name": "信用评分", "asset_type": "数据集"}, headers=_auth_header(token))
+
+    resp = client.get("/api/v1/assets", params={"name_prefix": "交通"}, headers=_auth_header(token))
+    assert {a["name"] for a in resp.json()} == {"交通流量", "交通事故"}
+    resp = client.get("/api/v1/assets", params={"asset_type": "数据集", "data_classification": "公共"}, headers=_auth_header(token))
+    assert [a["name"] for a in resp.json()] == ["交通流量"]
+    resp = client.get("/api/v1/assets", params={"name_prefix": "%"}, headers=_auth_header(token))
+    assert resp.json() == []
+
+
+def test_list_assets_invalid_cursor():
+    token = _create_org_and_user("data_holder")
+    resp = client.get("/api/v1/assets", params={"cursor": "not-a-cursor"}, headers=_auth_header(token))
+    assert resp.status_code == 400
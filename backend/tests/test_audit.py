@@ -0,0 +1,179 @@
+import time
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from tests.conftest import TestingSessionLocal
+from app.main import app
+
+client = TestClient(app)
+
+BASE_TIME = datetime(2026, 3, 1, 9, 0, 0)
+
+
+def _setup(role="admin"):
+    db = TestingSessionLocal()
+    from app.models.user import User
+    from app.models.audit import AuditLog
+    from app.core.security import get_password_hash
+
+    db.add(User(username=f"audit_{role}", hashed_password=get_password_hash("pass"), role=role))
+    for i in range(6):
+        db.add(AuditLog(
+            user_id=1 if i % 2 == 0 else 2,
+            username="someone",
+            action="create",
+            resource_type="asset",
+            resource_id=i % 3,
+            created_at=BASE_TIME + timedelta(hours=i),
+        ))
+    db.commit()
+    db.close()
+
+    token = client.post("/api/v1/auth/login", data={"username": f"audit_{role}", "password": "pass"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_audit_cursor_pagination():
+    headers = _setup()
+    seen, cursor = [], None
+    for _ in range(6):
+        params = {"limit": 4}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get("/api/v1/audit", params=params, headers=headers)
+        assert resp.status_code == 200
+        seen.extend(log["id"] for log in resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == [6, 5, 4, 3, 2, 1]
+
+
+def test_audit_time_range_and_resource_filters():
+    headers = _setup()
+    resp = client.get("/api/v1/audit", params={
+        "since": (BASE_TIME + timedelta(hours=1)).isoformat(),
+        "until": (BASE_TIME + timedelta(hours=4)).isoformat(),
+    }, headers=headers)
+    assert [log["id"] for log in resp.json()] == [4, 3, 2]
+
+    resp = client.get("/api/v1/audit", params={"resource_type": "asset", "resource_id": 1}, headers=headers)
+    assert [log["id"] for log in resp.json()] == [5, 2]
+
+    resp = client.get("/api/v1/audit", params={"user_id": 2, "limit": 2}, headers=headers)
+    assert [log["id"] for log in resp.json()] == [6, 4]
+
+    resp = client.get("/api/v1/audit", params={"resource_id": 0}, headers=headers)
+    assert [log["id"] for log in resp.json()] == [4, 1]
+
+
+def test_audit_limit_validation():
+    headers = _setup()
+    assert client.get("/api/v1/audit", params={"limit": 0}, headers=headers).status_code == 422
+    assert client.get("/api/v1/audit", params={"limit": 201}, headers=headers).status_code == 422
+
+
+def test_audit_forbidden_for_holder():
+    headers = _setup("data_holder")
+    resp = client.get("/api/v1/audit", headers=headers)
+    assert resp.status_code == 403
+
+
+def _audit_count():
+    from app.models.audit import AuditLog
+    db = TestingSessionLocal()
+    try:
+        return db.query(AuditLog).count()
+    finally:
+        db.close()
+
+
+def test_audit_sink_batches_writes():
+    from app.core.audit import AuditSink
+    sink = AuditSink(TestingSessionLocal, batch_size=3, flush_interval=60)
+    record = dict(user_id=1, username="u", action="upload", resource_type="material", created_at=BASE_TIME)
+
+    sink.emit(dict(record))
+    sink.emit(dict(record))
+    assert _audit_count() == 0
+    assert sink.pending() == 2
+
+    sink.emit(dict(record))  # 达到批量阈值，后台线程写入
+    for _ in range(50):
+        if _audit_count() == 3:
+            break
+        time.sleep(0.05)
+    assert _audit_count() == 3
+
+    sink.emit(dict(record))
+    sink.close()  # 关闭时把剩余事件写完
+    assert _audit_count() == 4
+    assert sink.pending() == 0
+
+
+def _until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_audit_sink_bounded_buffer_and_backoff():
+    from app.core.audit import AuditSink
+    now, attempts = [0.0], []
+
+    def broken_session():
+        attempts.append(now[0])
+        raise RuntimeError("数据库不可用")
+
+    # 退避按注入的时钟计时：时钟不前进就不会重试，断言只看重试次数，与机器快慢无关
+    sink = AuditSink(broken_session, batch_size=2, flush_interval=0.05, max_buffer=4, max_retry_interval=0.15,
+                     clock=lambda: now[0])
+    record = dict(user_id=1, username="u", action="upload", resource_type="material", created_at=BASE_TIME)
+    for _ in range(10):
+        sink.emit(dict(record))
+    assert _until(lambda: len(attempts) == 1 and sink.pending() == 4 and sink.dropped == 6)
+
+    time.sleep(0.2)
+    assert len(attempts) == 1
+    now[0] += 0.05  # 第一次失败后退避 0.1
+    time.sleep(0.2)
+    assert len(attempts) == 1
+    now[0] += 0.06
+    assert _until(lambda: len(attempts) == 2)
+
+    now[0] += 0.1  # 第二次失败后退避 0.2，被 max_retry_interval 限制为 0.15
+    time.sleep(0.2)
+    assert len(attempts) == 2
+    now[0] += 0.06
+    assert _until(lambda: len(attempts) == 3)
+
+    sink.configure(session_factory=TestingSessionLocal)
+    now[0] += 1
+    assert _until(lambda: sink.pending() == 0)
+    sink.close()
+    assert _audit_count() == 4
+    assert sink.dropped == 6
+
+
+def test_write_endpoints_are_audited():
+    headers = _setup("data_holder")
+    db = TestingSessionLocal()
+    from app.models.organization import Organization
+    from app.models.user import User
+    org = Organization(name="审计测试公司", org_type="enterprise")
+    db.add(org)
+    db.flush()
+    db.query(User).filter(User.username == "audit_data_holder").update({User.org_id: org.id})
+    db.commit()
+    db.close()
+
+    asset = client.post("/api/v1/assets", json={"name": "审计资产"}, headers=headers).json()
+    db = TestingSessionLocal()
+    from app.models.audit import AuditLog
+    log = db.query(AuditLog).filter(AuditLog.username == "audit_data_holder").one()
+    db.close()
+    assert log.action == "create"
+    assert log.resource_type == "asset"
+    assert log.resource_id == asset["id"]
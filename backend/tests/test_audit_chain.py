@@ -0,0 +1,157 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+from tests.conftest import TestingSessionLocal, engine
+from app.core.audit import AuditSink
+from app.core.audit_chain import GENESIS_HASH, link_hash
+from app.services.audit_chain_service import (
+    ChainError, create_checkpoints, inclusion_root, leaf_hash, node_hash, tree_root, verify_range,
+)
+from app.services.audit_storage_service import list_partitions, roll_hot_table
+
+BASE_TIME = datetime(2026, 4, 20, 9, 0, 0)
+
+
+@pytest.fixture(autouse=True)
+def chain_settings(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.AUDIT_CHECKPOINT_ROWS", 3)
+    monkeypatch.setattr("app.core.config.settings.AUDIT_HOT_MONTHS", 1)
+    yield
+    with engine.begin() as conn:
+        for partition in list_partitions(conn):
+            conn.execute(text(f'DROP TABLE "{partition.name}"'))
+
+
+def _write(count, start=0, days=1):
+    """经 AuditSink 写入，与接口记录审计日志的路径相同；第 i 行时间为 BASE_TIME + i 天"""
+    sink = AuditSink(TestingSessionLocal, synchronous=True)
+    for i in range(start, start + count):
+        sink.emit(dict(user_id=1, username="chain", action="update", resource_type="asset", resource_id=i,
+                       detail=f"第{i}次", ip_address="10.0.0.1", created_at=BASE_TIME + timedelta(days=i * days)))
+
+
+def _execute(sql, **params):
+    with engine.begin() as conn:
+        conn.execute(text(sql), params)
+
+
+def _mth(leaves):
+    """RFC 6962 Merkle 树根的直接递归实现，用于对照"""
+    if len(leaves) == 1:
+        return leaves[0]
+    k = 1 << (len(leaves) - 1).bit_length() - 1
+    return node_hash(_mth(leaves[:k]), _mth(leaves[k:]))
+
+
+def test_rows_are_chained_and_verified():
+    _write(5)
+    db = TestingSessionLocal()
+    rows = db.execute(text("SELECT chain_shard, chain_seq, chain_hash FROM audit_logs ORDER BY id")).all()
+    db.close()
+    assert [r.chain_seq for r in rows] == [1, 2, 3, 4, 5]
+    assert len({r.chain_shard for r in rows}) == 1
+    assert len({r.chain_hash for r in rows}) == 5
+
+    report = verify_range(engine, workers=1)
+    assert report["ok"] and report["rows_checked"] == 5
+    assert report["unanchored_rows"] == 5 and report["tree_size"] == 0
+
+    created = create_checkpoints(engine)
+    assert [c["last_seq"] for c in created] == [3, 5]
+    report = verify_range(engine, workers=1)
+    assert report["ok"] and report["unanchored_rows"] == 0
+    assert report["tree_size"] == 2 and report["root"] == created[-1]["root"]
+    assert create_checkpoints(engine) == []
+
+
+def test_merkle_tree_matches_rfc6962(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.AUDIT_CHECKPOINT_ROWS", 1)  # 每行一个检查点
+    _write(10)
+    assert len(create_checkpoints(engine)) == 10
+
+    with engine.connect() as conn:
+        leaves = [
+            leaf_hash(r.shard, r.first_seq, r.last_seq, r.start_hash, r.end_hash)
+            for r in conn.execute(text("SELECT * FROM audit_checkpoints ORDER BY leaf_index")).all()
+        ]
+        for size in range(1, 11):
+            assert tree_root(conn, size) == _mth(leaves[:size])
+            for index in range(size):
+                assert inclusion_root(conn, index, leaves[index], size) == _mth(leaves[:size])
+
+
+def test_modified_row_is_detected():
+    _write(7)
+    create_checkpoints(engine)
+    _execute("UPDATE audit_logs SET detail = '改过' WHERE chain_seq = 5")
+
+    report = verify_range(engine, workers=1)
+    assert not report["ok"]
+    assert any("第 5 行哈希不符" in e for e in report["errors"])
+    # 只校验不涉及被改行的时间范围时仍然通过
+    assert verify_range(engine, BASE_TIME, BASE_TIME + timedelta(days=2), workers=1)["ok"]
+
+
+def test_deleted_row_is_detected():
+    _write(6)
+    create_checkpoints(engine)
+    _execute("DELETE FROM audit_logs WHERE chain_seq = 2")
+    report = verify_range(engine, workers=1)
+    assert any("第 2 行缺失" in e for e in report["errors"])
+
+
+def test_tampered_tail_blocks_checkpoint():
+    _write(4)
+    _execute("UPDATE audit_logs SET username = 'mallory' WHERE chain_seq = 4")
+    with pytest.raises(ChainError):
+        create_checkpoints(engine)
+
+
+def test_rewritten_history_is_caught_by_external_root():
+    _write(3)
+    trusted_root = create_checkpoints(engine)[-1]["root"]
+    _write(3, start=3)
+    create_checkpoints(engine)
+    assert verify_range(engine, root=trusted_root, workers=1)["ok"]
+
+    # 改一行后重算整条链并重建检查点和 Merkle 树：库内自洽，只有库外留存的树根能发现
+    _execute("UPDATE audit_logs SET detail = '改过' WHERE chain_seq = 2")
+    with engine.begin() as conn:
+        prev = GENESIS_HASH
+        for row in conn.execute(text("SELECT * FROM audit_logs ORDER BY chain_seq")).all():
+            values = dict(row._mapping, created_at=datetime.fromisoformat(str(row.created_at)))
+            prev = link_hash(prev, row.chain_shard, row.chain_seq, values)
+            conn.execute(text("UPDATE audit_logs SET chain_hash = :h WHERE id = :id"), {"h": prev, "id": row.id})
+        conn.execute(text("UPDATE audit_chain_heads SET hash = :h"), {"h": prev})
+        conn.execute(text("DELETE FROM audit_checkpoints"))
+        conn.execute(text("DELETE FROM audit_merkle_nodes"))
+    create_checkpoints(engine)
+
+    assert verify_range(engine, workers=1)["ok"]
+    with pytest.raises(ChainError):
+        verify_range(engine, root=trusted_root, workers=1)
+
+
+def test_range_touches_only_its_segments():
+    _write(9)
+    create_checkpoints(engine)
+    report = verify_range(engine, BASE_TIME + timedelta(days=4), BASE_TIME + timedelta(days=5), workers=1)
+    assert report["ok"]
+    assert report["segments"] == 1 and report["rows_checked"] == 3
+
+
+def test_parallel_verification_and_rolled_tables():
+    _write(8, days=10)  # 跨越 2026-04 ~ 2026-07
+    create_checkpoints(engine)
+    assert roll_hot_table(engine, datetime(2026, 7, 15)) == ["audit_logs_202604", "audit_logs_202605", "audit_logs_202606"]
+    _write(2, start=8, days=10)
+    create_checkpoints(engine)
+
+    report = verify_range(engine, workers=2)
+    assert report["ok"], report["errors"]
+    assert report["rows_checked"] == 10 and report["segments"] == 4
+
+    _execute("UPDATE audit_logs_202605 SET ip_address = '6.6.6.6' WHERE chain_seq = 3")
+    report = verify_range(engine, workers=2)
+    assert any("第 3 行哈希不符" in e for e in report["errors"])
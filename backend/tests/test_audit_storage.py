@@ -0,0 +1,101 @@
+import gzip
+import json
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from tests.conftest import TestingSessionLocal, engine
+from app.main import app
+from app.services.audit_storage_service import archive_path, list_archives, list_partitions, restore_archive, run_maintenance
+
+client = TestClient(app)
+
+NOW = datetime(2026, 6, 15, 12, 0, 0)
+MONTHS = [datetime(2026, m, 10, 8, 0, 0) for m in (2, 3, 4, 5, 6)]
+
+
+@pytest.fixture(autouse=True)
+def storage_settings(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.AUDIT_ARCHIVE_DIR", str(tmp_path / "archive"))
+    monkeypatch.setattr("app.core.config.settings.AUDIT_HOT_MONTHS", 1)
+    monkeypatch.setattr("app.core.config.settings.AUDIT_ONLINE_MONTHS", 3)
+    monkeypatch.setattr("app.core.config.settings.AUDIT_ARCHIVE_RETENTION_MONTHS", 0)
+    yield
+    with engine.begin() as conn:
+        for partition in list_partitions(conn):
+            conn.execute(text(f'DROP TABLE "{partition.name}"'))
+
+
+def _setup():
+    db = TestingSessionLocal()
+    from app.models.user import User
+    from app.models.audit import AuditLog
+    from app.core.security import get_password_hash
+
+    db.add(User(username="storage_admin", hashed_password=get_password_hash("pass"), role="admin"))
+    for month in MONTHS:
+        for hour in (0, 1):
+            db.add(AuditLog(user_id=1, username="someone", action="create", resource_type="asset",
+                            created_at=month.replace(hour=month.hour + hour)))
+    db.commit()
+    db.close()
+    token = client.post("/api/v1/auth/login", data={"username": "storage_admin", "password": "pass"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _pages(headers, **params):
+    seen, cursor = [], None
+    while True:
+        query = dict(params, limit=3, action="create")
+        if cursor:
+            query["cursor"] = cursor
+        resp = client.get("/api/v1/audit", params=query, headers=headers)
+        assert resp.status_code == 200
+        seen.extend(log["id"] for log in resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            return seen
+
+
+def test_maintenance_rolls_and_archives_old_months():
+    headers = _setup()
+    report = run_maintenance(engine, NOW)
+    assert report["rolled"] == ["audit_logs_202602", "audit_logs_202603", "audit_logs_202604", "audit_logs_202605"]
+    assert [m["table"] for m in report["archived"]] == ["audit_logs_202602", "audit_logs_202603"]
+    assert report["archived"][0]["rows"] == 2
+
+    with engine.connect() as conn:
+        assert [p.name for p in list_partitions(conn)] == ["audit_logs_202604", "audit_logs_202605"]
+        assert conn.execute(text("SELECT count(*) FROM audit_logs")).scalar() == 2
+    assert [p.name for p in list_archives()] == ["audit_logs_202602", "audit_logs_202603"]
+
+    # 跨主表和按月表分页，顺序与未分表时一致；已归档的月份不在结果中
+    assert _pages(headers) == [10, 9, 8, 7, 6, 5]
+    assert _pages(headers, since="2026-05-01T00:00:00", until="2026-06-01T00:00:00") == [8, 7]
+    resp = client.get("/api/v1/audit", params={"limit": 2, "offset": 1, "action": "create"}, headers=headers)
+    assert [log["id"] for log in resp.json()] == [9, 8]
+
+    resp = client.get("/api/v1/audit/export", params={"format": "ndjson", "action": "create"}, headers=headers)
+    assert [json.loads(line)["id"] for line in resp.text.splitlines()] == [5, 6, 7, 8, 9, 10]
+
+
+def test_archive_file_and_restore():
+    headers = _setup()
+    run_maintenance(engine, NOW)
+    with gzip.open(archive_path("audit_logs_202603"), "rt", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert [r["id"] for r in rows] == [3, 4]
+    assert rows[0]["created_at"] == "2026-03-10T08:00:00"
+
+    assert restore_archive(engine, datetime(2026, 3, 1)) == 2
+    assert _pages(headers, since="2026-03-01T00:00:00", until="2026-04-01T00:00:00") == [4, 3]
+
+
+def test_retention_deletes_expired_months(monkeypatch):
+    _setup()
+    run_maintenance(engine, NOW)
+    monkeypatch.setattr("app.core.config.settings.AUDIT_ARCHIVE_RETENTION_MONTHS", 3)
+    report = run_maintenance(engine, NOW)
+    assert report["expired"] == ["audit_logs_202602"]
+    assert [p.name for p in list_archives()] == ["audit_logs_202603"]
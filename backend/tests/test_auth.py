@@ -1,5 +1,7 @@
 from fastapi.testclient import TestClient
+from tests.conftest import TestingSessionLocal, count_queries
 from app.main import app
+from app.models.user import User
 
 client = TestClient(app)
 
@@ -66,3 +68,81 @@ def test_get_me():
 def test_get_me_no_token():
     resp = client.get("/api/v1/auth/me")
     assert resp.status_code == 401
+
+
+def _login(username, role="data_holder"):
+    client.post("/api/v1/auth/register", json={"username": username, "password": "pass123", "role": role})
+    return client.post("/api/v1/auth/login", data={"username": username, "password": "pass123"}).json()["access_token"]
+
+
+def test_warm_cache_skips_user_lookup():
+    token = _login("cached_user")
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get("/api/v1/auth/me", headers=headers)
+
+    with count_queries() as statements:
+        resp = client.get("/api/v1/auth/me", headers=headers)
+    assert resp.status_code == 200
+    assert statements == []
+
+
+def test_deactivation_invalidates_cache():
+    token = _login("deactivated_user")
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+
+    db = TestingSessionLocal()
+    user = db.query(User).filter(User.username == "deactivated_user").one()
+    user.is_active = 0
+    db.commit()
+    db.close()
+
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+
+
+def test_trusted_claims_for_read_endpoints(monkeypatch):
+    token = _login("claims_user", role="regulator")
+    headers = {"Authorization": f"Bearer {token}"}
+    monkeypatch.setattr("app.core.config.settings.AUTH_TRUST_TOKEN_CLAIMS", True)
+
+    with count_queries() as statements:
+        resp = client.get("/api/v1/audit", headers=headers)
+    assert resp.status_code == 200
+    assert not [s for s in statements if "FROM users" in s]
+
+
+def test_login_rate_limited_per_username(monkeypatch):
+    monkeypatch.setattr("app.core.security.login_rate_limiter.max_attempts", 3)
+    client.post("/api/v1/auth/register", json={"username": "storm_user", "password": "right", "role": "admin"})
+    for _ in range(3):
+        resp = client.post("/api/v1/auth/login", data={"username": "storm_user", "password": "wrong"})
+        assert resp.status_code == 401
+    resp = client.post("/api/v1/auth/login", data={"username": "storm_user", "password": "right"})
+    assert resp.status_code == 429
+    assert int(resp.headers["Retry-After"]) > 0
+
+    client.post("/api/v1/auth/register", json={"username": "calm_user", "password": "right", "role": "admin"})
+    resp = client.post("/api/v1/auth/login", data={"username": "calm_user", "password": "right"})
+    assert resp.status_code == 200
+
+
+def test_login_rehashes_when_cost_changes(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.PASSWORD_HASH_ROUNDS", 4)
+    client.post("/api/v1/auth/register", json={"username": "rehash_user", "password": "pw", "role": "admin"})
+    db = TestingSessionLocal()
+    assert db.query(User).filter(User.username == "rehash_user").one().hashed_password.startswith("$2b$04$")
+    db.close()
+
+    monkeypatch.setattr("app.core.config.settings.PASSWORD_HASH_ROUNDS", 5)
+    resp = client.post("/api/v1/auth/login", data={"username": "rehash_user", "password": "pw"})
+    assert resp.status_code == 200
+    db = TestingSessionLocal()
+    assert db.query(User).filter(User.username == "rehash_user").one().hashed_password.startswith("$2b$05$")
+    db.close()
+
+
+def test_login_without_hash_process_pool(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.PASSWORD_HASH_WORKERS", 0)
+    client.post("/api/v1/auth/register", json={"username": "inline_user", "password": "pw", "role": "admin"})
+    assert client.post("/api/v1/auth/login", data={"username": "inline_user", "password": "pw"}).status_code == 200
+    assert client.post("/api/v1/auth/login", data={"username": "inline_user", "password": "bad"}).status_code == 401
@@ -0,0 +1,132 @@
+import time
+
+from fastapi.testclient import TestClient
+from tests.conftest import TestingSessionLocal, count_queries
+from app.core.cache import MemoryCacheBackend
+from app.core.config import settings
+from app.main import app
+
+client = TestClient(app)
+
+
+def _setup_users():
+    db = TestingSessionLocal()
+    from app.models.organization import Organization
+    from app.models.user import User
+    from app.core.security import get_password_hash
+
+    org = Organization(name="测试公司", org_type="enterprise")
+    db.add(org)
+    db.commit()
+    db.add_all([
+        User(username="holder", hashed_password=get_password_hash("pass"), role="data_holder", org_id=org.id),
+        User(username="registry", hashed_password=get_password_hash("pass"), role="registry_center", org_id=org.id),
+    ])
+    db.commit()
+    db.close()
+
+    h_token = client.post("/api/v1/auth/login", data={"username": "holder", "password": "pass"}).json()["access_token"]
+    r_token = client.post("/api/v1/auth/login", data={"username": "registry", "password": "pass"}).json()["access_token"]
+    return h_token, r_token
+
+
+def _h(token, etag=None):
+    headers = {"Authorization": f"Bearer {token}"}
+    if etag:
+        headers["If-None-Match"] = etag
+    return headers
+
+
+def test_if_none_match_returns_304():
+    h_token, _ = _setup_users()
+    asset = client.post("/api/v1/assets", json={"name": "资产"}, headers=_h(h_token)).json()
+
+    first = client.get(f"/api/v1/assets/{asset['id']}", headers=_h(h_token))
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    resp = client.get(f"/api/v1/assets/{asset['id']}", headers=_h(h_token, etag))
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == etag
+
+
+def test_wildcard_if_none_match_does_not_skip_checks():
+    h_token, _ = _setup_users()
+    asset = client.post("/api/v1/assets", json={"name": "资产"}, headers=_h(h_token)).json()
+
+    db = TestingSessionLocal()
+    from app.models.organization import Organization
+    from app.models.user import User
+    from app.core.security import get_password_hash
+    other = Organization(name="其它公司", org_type="enterprise")
+    db.add(other)
+    db.commit()
+    db.add(User(username="other_holder", hashed_password=get_password_hash("pass"), role="data_holder", org_id=other.id))
+    db.commit()
+    db.close()
+    o_token = client.post("/api/v1/auth/login", data={"username": "other_holder", "password": "pass"}).json()["access_token"]
+
+    assert client.get("/api/v1/assets/99999", headers=_h(h_token, "*")).status_code == 404
+    # 其它组织的资产对持有方不可见，与不存在一样返回 404
+    assert client.get(f"/api/v1/assets/{asset['id']}", headers=_h(o_token, "*")).status_code == 404
+    assert client.get(f"/api/v1/assets/{asset['id']}", headers=_h(h_token, "*")).status_code == 200
+
+
+def test_etag_expires_after_ttl(monkeypatch):
+    """其它进程的写入不会递增本进程的版本号，ETag 至多沿用一个 TTL 周期"""
+    h_token, _ = _setup_users()
+    asset = client.post("/api/v1/assets", json={"name": "资产"}, headers=_h(h_token)).json()
+    now = time.time()
+    monkeypatch.setattr("app.core.cache.time.time", lambda: now)
+    etag = client.get(f"/api/v1/assets/{asset['id']}", headers=_h(h_token)).headers["ETag"]
+    assert client.get(f"/api/v1/assets/{asset['id']}", headers=_h(h_token, etag)).status_code == 304
+
+    monkeypatch.setattr("app.core.cache.time.time", lambda: now + settings.CACHE_TTL_SECONDS)
+    resp = client.get(f"/api/v1/assets/{asset['id']}", headers=_h(h_token, etag))
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+
+
+def test_write_changes_etag():
+    h_token, r_token = _setup_users()
+    asset = client.post("/api/v1/assets", json={"name": "资产"}, headers=_h(h_token)).json()
+    etag = client.get(f"/api/v1/assets/{asset['id']}", headers=_h(h_token)).headers["ETag"]
+    stats_etag = client.get("/api/v1/statistics/holder", headers=_h(h_token)).headers["ETag"]
+
+    record = client.post(f"/api/v1/stages/{asset['id']}/submit", headers=_h(h_token)).json()
+    client.post(f"/api/v1/stages/records/{record['id']}/approve", headers=_h(r_token))
+
+    resp = client.get(f"/api/v1/assets/{asset['id']}", headers=_h(h_token, etag))
+    assert resp.status_code == 200
+    assert resp.json()["current_stage"] == "asset_inventory"
+    assert client.get("/api/v1/statistics/holder", headers=_h(h_token, stats_etag)).status_code == 200
+
+
+def test_cache_scoped_by_role():
+    h_token, r_token = _setup_users()
+    holder_etag = client.get("/api/v1/statistics/holder", headers=_h(h_token)).headers["ETag"]
+    registry_etag = client.get("/api/v1/statistics/holder", headers=_h(r_token)).headers["ETag"]
+    assert holder_etag != registry_etag
+    assert client.get("/api/v1/statistics/holder", headers=_h(r_token, holder_etag)).status_code == 200
+
+
+def test_cached_body_skips_queries():
+    h_token, _ = _setup_users()
+    asset = client.post("/api/v1/assets", json={"name": "资产"}, headers=_h(h_token)).json()
+    client.get(f"/api/v1/assets/{asset['id']}", headers=_h(h_token))
+    with count_queries() as statements:
+        resp = client.get(f"/api/v1/assets/{asset['id']}", headers=_h(h_token))
+    assert resp.json()["name"] == "资产"
+    assert not any("data_assets" in s for s in statements)
+
+
+def test_memory_backend_bounded():
+    backend = MemoryCacheBackend(max_entries=2)
+    for key in ("a", "b", "c"):
+        backend.set(key, key.encode(), ttl=60)
+    assert backend.get("a") is None
+    assert backend.get("c") == b"c"
+
+    token = backend.version_token(["x"])
+    backend.bump(["x"])
+    assert backend.version_token(["x"]) != token
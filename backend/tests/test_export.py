@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from tests.conftest import TestingSessionLocal
+from app.main import app
+
+client = TestClient(app)
+
+
+def _setup():
+    db = TestingSessionLocal()
+    from app.models.organization import Organization
+    from app.models.user import User
+    from app.models.asset import DataAsset, AssetStage
+    from app.core.security import get_password_hash
+
+    orgs = [Organization(name=f"公司{i}", org_type="enterprise") for i in range(2)]
+    db.add_all(orgs)
+    db.flush()
+    db.add(User(username="export_holder", hashed_password=get_password_hash("pass"), role="data_holder", org_id=orgs[0].id))
+    db.add(User(username="export_admin", hashed_password=get_password_hash("pass"), role="admin"))
+    for i in range(5):
+        db.add(DataAsset(
+            name=f"资产{i}", org_id=orgs[i % 2].id, current_stage=AssetStage.VALUE_ASSESSMENT if i < 2 else AssetStage.RESOURCE_INVENTORY,
+            valuation_amount=1000.5 if i == 0 else None,
+        ))
+    db.commit()
+    db.close()
+
+    def headers(username):
+        token = client.post("/api/v1/auth/login", data={"username": username, "password": "pass"}).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+    return headers("export_holder"), headers("export_admin")
+
+
+def test_export_assets_csv_honors_rbac(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.EXPORT_BATCH_SIZE", 2)
+    holder, admin = _setup()
+    resp = client.get("/api/v1/assets/export", headers=holder)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    assert "attachment" in resp.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(resp.content.decode("utf-8-sig"))))
+    assert [r["name"] for r in rows] == ["资产0", "资产2", "资产4"]
+    assert rows[0]["current_stage"] == "value_assessment"
+    assert rows[0]["valuation_amount"] == "1000.5"
+    assert rows[1]["valuation_amount"] == ""
+
+    resp = client.get("/api/v1/assets/export", params={"stage": "value_assessment"}, headers=admin)
+    assert [r["name"] for r in csv.DictReader(io.StringIO(resp.content.decode("utf-8-sig")))] == ["资产0", "资产1"]
+
+
+def test_export_assets_ndjson():
+    _, admin = _setup()
+    resp = client.get("/api/v1/assets/export", params={"format": "ndjson"}, headers=admin)
+    assert resp.status_code == 200
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert len(rows) == 5
+    assert rows[0]["name"] == "资产0" and rows[0]["valuation_amount"] == 1000.5
+
+
+def test_export_unknown_format():
+    _, admin = _setup()
+    resp = client.get("/api/v1/assets/export", params={"format": "xlsx"}, headers=admin)
+    assert resp.status_code == 400
+
+
+def test_export_audit_logs_requires_role_and_is_audited():
+    holder, admin = _setup()
+    assert client.get("/api/v1/audit/export", headers=holder).status_code == 403
+
+    client.get("/api/v1/assets/export", headers=admin)
+    resp = client.get("/api/v1/audit/export", params={"format": "ndjson", "action": "export"}, headers=admin)
+    assert resp.status_code == 200
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    # 本次审计导出在开始输出前已记录
+    assert [(r["username"], r["resource_type"]) for r in rows] == [("export_admin", "asset"), ("export_admin", "audit")]
+
+
+def test_export_assets_parquet(monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr("app.core.config.settings.EXPORT_BATCH_SIZE", 2)
+    _, admin = _setup()
+    resp = client.get("/api/v1/assets/export", params={"format": "parquet"}, headers=admin)
+    assert resp.status_code == 200
+    parquet = pq.ParquetFile(io.BytesIO(resp.content))
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert table.column("name").to_pylist() == [f"资产{i}" for i in range(5)]
+    assert table.column("current_stage").to_pylist()[0] == "value_assessment"
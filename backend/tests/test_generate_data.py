@@ -0,0 +1,49 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+from tests.conftest import TestingSessionLocal
+from app.main import app
+from app.models.asset import DataAsset, STAGE_ORDER
+from app.models.audit import AuditLog
+from app.models.stage import StageRecord, StageStatus
+from app.models.statistics import AssetStageSummary
+from app.scripts.generate_data import generate
+
+client = TestClient(app)
+
+
+def test_generate_data_is_consistent():
+    counts = generate(3, 200, 500, materials_per_record=1, batch_size=64, log=lambda msg: None,
+                      session_factory=TestingSessionLocal)
+    assert counts["assets"] == 200
+    assert counts["audit_logs"] == 500
+    assert counts["materials"] == counts["stage_records"]
+
+    db = TestingSessionLocal()
+    assert db.query(func.count(AuditLog.id)).scalar() == 500
+    # 覆盖全部阶段
+    stages = {row.current_stage for row in db.query(DataAsset.current_stage).distinct()}
+    assert stages == set(STAGE_ORDER)
+    # 阶段记录不超过资产当前阶段，待审批的只能是当前阶段
+    for asset in db.query(DataAsset).all():
+        index = STAGE_ORDER.index(asset.current_stage)
+        for record in asset.stage_records:
+            assert STAGE_ORDER.index(record.stage) <= index
+            if record.status == StageStatus.SUBMITTED:
+                assert record.stage == asset.current_stage
+    # 统计汇总表已对账
+    assert db.query(func.sum(AssetStageSummary.asset_count)).scalar() == 200
+    db.close()
+
+
+def test_generated_users_can_login_and_approve():
+    generate(2, 50, 0, log=lambda msg: None, session_factory=TestingSessionLocal)
+    resp = client.post("/api/v1/auth/login", data={"username": "bench_registry_center", "password": "bench123"})
+    assert resp.status_code == 200
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+    db = TestingSessionLocal()
+    record = db.query(StageRecord).filter(StageRecord.status == StageStatus.SUBMITTED).first()
+    db.close()
+    resp = client.post(f"/api/v1/stages/records/{record.id}/approve", headers=headers)
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "approved"
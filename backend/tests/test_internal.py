@@ -0,0 +1,59 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+import asyncio
+
+from app.core.database import PoolMetrics, _AsyncSessionFactories, _create_engine
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_pool_metrics_record_checkouts(tmp_path):
+    metrics = PoolMetrics("test")
+    test_engine = _create_engine(f"sqlite:///{tmp_path}/pool.db", metrics)
+    with test_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        conn.invalidate()
+    with test_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    test_engine.dispose()
+
+    stats = metrics.snapshot()
+    assert stats["checkouts"] == 2
+    assert stats["connects"] == 2
+    assert stats["invalidations"] == 1
+    assert stats["checkout_seconds_max"] >= 0
+    assert stats["checked_out"] == 0
+
+
+def test_db_pool_endpoint(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.METRICS_TOKEN", "secret")
+    resp = client.get("/api/v1/internal/db-pool", headers={"X-Metrics-Token": "secret"})
+    assert resp.status_code == 200
+    assert resp.json()[0]["name"] == "primary"
+
+
+def test_db_pool_endpoint_token(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.METRICS_TOKEN", "secret")
+    assert client.get("/api/v1/internal/db-pool").status_code == 403
+    assert client.get("/api/v1/internal/db-pool", headers={"X-Metrics-Token": "wrong"}).status_code == 403
+
+
+def test_internal_endpoints_disabled_without_token(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.METRICS_TOKEN", "")
+    assert client.get("/api/v1/internal/db-pool").status_code == 403
+    assert client.get("/api/v1/internal/metrics", headers={"X-Metrics-Token": ""}).status_code == 403
+
+
+def test_async_replica_url_override(monkeypatch, tmp_path):
+    monkeypatch.setattr("app.core.database.pool_metrics", [])
+    monkeypatch.setattr("app.core.config.settings.DATABASE_ASYNC_URL", f"sqlite+aiosqlite:///{tmp_path}/primary.db")
+    monkeypatch.setattr("app.core.config.settings.DATABASE_READ_URL", f"sqlite:///{tmp_path}/derived.db")
+    monkeypatch.setattr("app.core.config.settings.DATABASE_READ_ASYNC_URL", f"sqlite+aiosqlite:///{tmp_path}/replica.db")
+    factories = _AsyncSessionFactories()
+    try:
+        assert factories.get(read=True).kw["bind"].url.database.endswith("replica.db")
+        assert factories.get().kw["bind"].url.database.endswith("primary.db")
+    finally:
+        asyncio.run(factories.dispose())
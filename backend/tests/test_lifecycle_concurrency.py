@@ -0,0 +1,188 @@
+import random
+import threading
+
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from tests.conftest import SQLALCHEMY_DATABASE_URL, TestingSessionLocal
+from app.main import app
+from app.engine.lifecycle import approve_stage, review_stages, submit_stage, LifecycleError
+from app.models.approval import ApprovalRecord
+from app.models.asset import DataAsset, AssetStage
+from app.models.organization import Organization
+from app.models.stage import StageRecord, StageStatus
+from app.models.statistics import AssetStageSummary
+from app.models.user import User
+
+client = TestClient(app)
+
+THREADS = 8
+
+# SQLite 没有行锁和 SKIP LOCKED，长事务并发写入会直接报 database is locked；
+# 批量审批的线程改用 BEGIN IMMEDIATE 开启事务，让写事务排队（PostgreSQL 下由 FOR UPDATE 完成）
+immediate_engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False, "timeout": 30})
+
+
+@event.listens_for(immediate_engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(immediate_engine, "begin")
+def _begin_immediate(conn):
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+ImmediateSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=immediate_engine)
+
+
+def _setup(asset_count):
+    from app.core.security import get_password_hash
+
+    db = TestingSessionLocal()
+    org = Organization(name="测试公司", org_type="enterprise")
+    db.add(org)
+    db.commit()
+    holder = User(username="holder", hashed_password=get_password_hash("pass"), role="data_holder", org_id=org.id)
+    registry = User(username="registry", hashed_password=get_password_hash("pass"), role="registry_center", org_id=org.id)
+    db.add_all([holder, registry])
+    db.commit()
+
+    assets = [DataAsset(name=f"资产{i}", org_id=org.id, created_by=holder.id) for i in range(asset_count)]
+    db.add_all(assets)
+    db.flush()
+    records = [
+        StageRecord(asset_id=a.id, stage=AssetStage.RESOURCE_INVENTORY, status=StageStatus.SUBMITTED, submitted_by=holder.id)
+        for a in assets
+    ]
+    db.add_all(records)
+    db.add(AssetStageSummary(org_id=org.id, stage=AssetStage.RESOURCE_INVENTORY, asset_count=asset_count, valued_count=0, valuation_total=0))
+    db.commit()
+    ids = [r.id for r in records]
+    registry_id = registry.id
+    db.close()
+    return ids, registry_id
+
+
+def _hammer(target, session_factory=TestingSessionLocal):
+    errors = []
+    barrier = threading.Barrier(THREADS)
+
+    def run(i):
+        db = session_factory()
+        try:
+            barrier.wait()
+            target(db, i)
+        except Exception as e:  # noqa
+            errors.append(e)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return errors
+
+
+def _assert_advanced_once(record_ids):
+    db = TestingSessionLocal()
+    assets = db.query(DataAsset).all()
+    assert all(a.current_stage == AssetStage.ASSET_INVENTORY for a in assets)
+    assert all(a.version == 2 for a in assets)
+    assert db.query(StageRecord).filter(StageRecord.status == StageStatus.APPROVED).count() == len(record_ids)
+    assert db.query(ApprovalRecord).count() == len(record_ids)
+    summary = {s.stage: s.asset_count for s in db.query(AssetStageSummary).all()}
+    assert summary[AssetStage.RESOURCE_INVENTORY] == 0
+    assert summary[AssetStage.ASSET_INVENTORY] == len(record_ids)
+    db.close()
+
+
+def test_concurrent_single_approvals_advance_once():
+    record_ids, registry_id = _setup(5)
+    outcomes = []
+
+    def target(db, i):
+        for record_id in random.Random(i).sample(record_ids, len(record_ids)):
+            record = db.query(StageRecord).filter(StageRecord.id == record_id).first()
+            try:
+                approve_stage(db, record, registry_id)
+                outcomes.append(record_id)
+            except LifecycleError:
+                pass
+
+    assert _hammer(target) == []
+    assert sorted(outcomes) == sorted(record_ids)
+    _assert_advanced_once(record_ids)
+
+
+def test_concurrent_batch_approvals_advance_once():
+    record_ids, registry_id = _setup(20)
+    approved = []
+
+    def target(db, i):
+        ids = random.Random(i).sample(record_ids, len(record_ids))
+        for item in review_stages(db, ids, registry_id, "approve"):
+            if item["status"] == "approved":
+                approved.append(item["record_id"])
+
+    assert _hammer(target, ImmediateSessionLocal) == []
+    immediate_engine.dispose()
+    assert sorted(approved) == sorted(record_ids)
+    _assert_advanced_once(record_ids)
+
+
+def test_batch_endpoints():
+    record_ids, _ = _setup(3)
+    token = client.post("/api/v1/auth/login", data={"username": "registry", "password": "pass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    resp = client.post("/api/v1/stages/records/batch-approve", json={"record_ids": record_ids[:2] + [9999]}, headers=headers)
+    assert resp.status_code == 200
+    assert [item["status"] for item in resp.json()] == ["approved", "approved", "error"]
+
+    resp = client.post("/api/v1/stages/records/batch-reject", json={"record_ids": record_ids, "reason": "材料不全"}, headers=headers)
+    assert [item["status"] for item in resp.json()] == ["error", "error", "rejected"]
+
+    holder = client.post("/api/v1/auth/login", data={"username": "holder", "password": "pass"}).json()["access_token"]
+    resp = client.post("/api/v1/stages/records/batch-approve", json={"record_ids": record_ids}, headers={"Authorization": f"Bearer {holder}"})
+    assert resp.status_code == 403
+
+
+def test_one_submitted_record_per_asset_stage():
+    record_ids, _ = _setup(1)
+    db = TestingSessionLocal()
+    record = db.get(StageRecord, record_ids[0])
+    # 部分唯一索引只约束 SUBMITTED，退回后可以再次提交
+    db.add(StageRecord(asset_id=record.asset_id, stage=record.stage, status=StageStatus.REJECTED))
+    db.commit()
+    db.add(StageRecord(asset_id=record.asset_id, stage=record.stage, status=StageStatus.SUBMITTED))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
+    db.close()
+
+
+def test_concurrent_submits_create_one_record():
+    record_ids, _ = _setup(1)
+    db = TestingSessionLocal()
+    db.query(StageRecord).delete()
+    db.commit()
+    asset_id = db.query(DataAsset.id).scalar()
+    holder_id = db.query(User.id).filter(User.username == "holder").scalar()
+    db.close()
+
+    submitted = []
+
+    def target(db, i):
+        try:
+            submitted.append(submit_stage(db, db.get(DataAsset, asset_id), holder_id).id)
+        except LifecycleError:
+            pass
+
+    assert _hammer(target, ImmediateSessionLocal) == []
+    immediate_engine.dispose()
+    assert len(submitted) == 1
@@ -1,5 +1,9 @@
+import asyncio
 import hashlib
+import time
 from io import BytesIO
+
+import httpx
 from fastapi.testclient import TestClient
 from tests.conftest import TestingSessionLocal
 from app.main import app
@@ -70,3 +74,86 @@ def test_list_materials():
     resp = client.get(f"/api/v1/materials/{record_id}", headers=headers)
     assert resp.status_code == 200
     assert len(resp.json()) == 2
+
+
+def test_upload_streams_in_chunks(monkeypatch, tmp_path):
+    monkeypatch.setattr("app.core.config.settings.UPLOAD_CHUNK_SIZE", 7)
+    token, record_id = _setup_and_submit()
+    headers = {"Authorization": f"Bearer {token}"}
+    content = bytes(range(256)) * 4
+
+    resp = client.post(f"/api/v1/materials/upload/{record_id}",
+                       files={"file": ("big.bin", BytesIO(content), "application/octet-stream")}, headers=headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["hash_sha256"] == hashlib.sha256(content).hexdigest()
+    assert data["file_size"] == len(content)
+    assert data["version"] == 1
+
+    db = TestingSessionLocal()
+    from app.models.material import StageMaterial
+    material = db.query(StageMaterial).filter(StageMaterial.id == data["id"]).first()
+    db.close()
+    with open(material.file_path, "rb") as f:
+        assert f.read() == content
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    token, record_id = _setup_and_submit()
+    headers = {"Authorization": f"Bearer {token}"}
+    content = b"compliance template"
+
+    for name in ("a.pdf", "b.pdf", "a.pdf"):
+        resp = client.post(f"/api/v1/materials/upload/{record_id}",
+                           files={"file": (name, BytesIO(content), "application/pdf")}, headers=headers)
+        assert resp.status_code == 200
+    assert resp.json()["version"] == 2
+
+    db = TestingSessionLocal()
+    from app.models.material import MaterialBlob
+    blobs = db.query(MaterialBlob).all()
+    db.close()
+    assert len(blobs) == 1
+    assert blobs[0].ref_count == 3
+    assert len([p for p in tmp_path.rglob("*") if p.is_file()]) == 1
+
+
+def test_health_responsive_during_large_upload(monkeypatch):
+    import app.services.material_service as material_service
+    token, record_id = _setup_and_submit()
+    headers = {"Authorization": f"Bearer {token}"}
+    monkeypatch.setattr("app.core.config.settings.UPLOAD_CHUNK_SIZE", 64 * 1024)
+
+    original_iter_chunks = material_service.iter_chunks
+
+    def slow_iter_chunks(fileobj, chunk_size=None):
+        # 模拟大文件：每块都需要可观的哈希/写盘时间
+        for chunk in original_iter_chunks(fileobj, chunk_size):
+            time.sleep(0.05)
+            yield chunk
+
+    monkeypatch.setattr(material_service, "iter_chunks", slow_iter_chunks)
+    content = b"x" * (1024 * 1024)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            upload = asyncio.create_task(ac.post(
+                f"/api/v1/materials/upload/{record_id}",
+                files={"file": ("large.bin", content, "application/octet-stream")},
+                headers=headers,
+            ))
+            await asyncio.sleep(0.3)
+            start = time.perf_counter()
+            health = await ac.get("/api/health")
+            latency = time.perf_counter() - start
+            upload_still_running = not upload.done()
+            return health, latency, upload_still_running, await upload
+
+    health, latency, upload_still_running, upload_resp = asyncio.run(scenario())
+    assert health.status_code == 200
+    assert upload_still_running
+    assert latency < 0.5
+    assert upload_resp.status_code == 200
+    assert upload_resp.json()["hash_sha256"] == hashlib.sha256(content).hexdigest()
@@ -0,0 +1,72 @@
+import logging
+
+from fastapi.testclient import TestClient
+from tests.conftest import TestingSessionLocal
+from app.core.metrics import route_metrics, parameter_shape
+from app.main import app
+
+client = TestClient(app)
+
+
+def _token():
+    db = TestingSessionLocal()
+    from app.models.organization import Organization
+    from app.models.user import User
+    from app.core.security import get_password_hash
+
+    org = Organization(name="测试公司", org_type="enterprise")
+    db.add(org)
+    db.commit()
+    db.add(User(username="holder", hashed_password=get_password_hash("pass"), role="data_holder", org_id=org.id))
+    db.commit()
+    db.close()
+    token = client.post("/api/v1/auth/login", data={"username": "holder", "password": "pass"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_route_metrics_exposed_by_template(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.METRICS_TOKEN", "secret")
+    route_metrics.reset()
+    headers = _token()
+    asset = client.post("/api/v1/assets", json={"name": "资产"}, headers=headers).json()
+    client.get(f"/api/v1/assets/{asset['id']}/full", headers=headers)
+    client.get("/no/such/path")
+
+    resp = client.get("/api/v1/internal/metrics", headers={"X-Metrics-Token": "secret"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    text = resp.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/assets/{asset_id}/full",status="200"} 1' in text
+    assert 'route="unmatched",status="404"' in text
+    statements = [
+        line for line in text.splitlines()
+        if line.startswith('http_request_db_statements_total{method="GET",route="/api/v1/assets/{asset_id}/full"}')
+    ]
+    assert statements and int(statements[0].split()[-1]) >= 2
+    assert "db_pool_checkouts_total" in text
+
+
+def test_server_timing_header(monkeypatch):
+    headers = _token()
+    assert "server-timing" not in client.get("/api/v1/assets", headers=headers).headers
+
+    monkeypatch.setattr("app.core.config.settings.SERVER_TIMING_HEADER", True)
+    resp = client.get("/api/v1/assets", headers=headers)
+    assert resp.headers["server-timing"].startswith("db;dur=")
+    assert "app;dur=" in resp.headers["server-timing"]
+
+
+def test_slow_query_log(monkeypatch, caplog):
+    headers = _token()
+    monkeypatch.setattr("app.core.config.settings.SLOW_QUERY_MS", 0.000001)
+    with caplog.at_level(logging.WARNING, logger="app.slow_query"):
+        client.get("/api/v1/assets?name_prefix=abc", headers=headers)
+    messages = [r.getMessage() for r in caplog.records if r.name == "app.slow_query"]
+    assert any("route=/api/v1/assets" in m and "str" in m for m in messages)
+    assert not any("abc" in m for m in messages)
+
+
+def test_parameter_shape():
+    assert parameter_shape({"a": 1, "b": "x"}) == "{a: int, b: str}"
+    assert parameter_shape((1, None)) == "(int, NoneType)"
+    assert parameter_shape([(1,), (2,)], executemany=True) == "[(int) x 2]"
@@ -0,0 +1,104 @@
+import pytest
+from fastapi.testclient import TestClient
+from tests.conftest import TestingSessionLocal, count_queries, query_budget
+from app.core.cache import response_cache
+from app.main import app
+from app.models.approval import ApprovalRecord
+from app.models.asset import DataAsset, STAGE_ORDER
+from app.models.material import StageMaterial
+from app.models.organization import Organization
+from app.models.stage import StageRecord, StageStatus
+from app.models.user import User
+
+client = TestClient(app)
+
+# 各接口的SQL条数上限（认证用户已缓存）
+ROUTE_BUDGETS = {
+    "/api/v1/assets/{asset_id}/full": 4,
+    "/api/v1/assets/{asset_id}": 1,
+    "/api/v1/assets": 1,
+    "/api/v1/materials/{record_id}": 1,
+    "/api/v1/statistics/holder": 1,
+    "/api/v1/statistics/city": 2,
+    "/api/v1/audit": 2,  # SQLite 另查一次库中的按月滚动表
+}
+
+
+def _setup(stage_count, materials_per_stage, username="admin"):
+    from app.core.security import get_password_hash
+
+    db = TestingSessionLocal()
+    org = Organization(name="测试公司", org_type="enterprise")
+    db.add(org)
+    db.commit()
+    admin = User(username=username, hashed_password=get_password_hash("pass"), role="admin", org_id=org.id)
+    db.add(admin)
+    db.commit()
+
+    asset = DataAsset(name="资产", org_id=org.id, created_by=admin.id, current_stage=STAGE_ORDER[stage_count])
+    db.add(asset)
+    db.flush()
+    record_id = None
+    for stage in STAGE_ORDER[:stage_count]:
+        record = StageRecord(asset_id=asset.id, stage=stage, status=StageStatus.APPROVED, submitted_by=admin.id, approved_by=admin.id)
+        db.add(record)
+        db.flush()
+        record_id = record.id
+        db.add(ApprovalRecord(stage_record_id=record.id, action="approve", operator_id=admin.id))
+        for i in range(materials_per_stage):
+            for version in (1, 2):
+                db.add(StageMaterial(
+                    stage_record_id=record.id, file_name=f"材料{i}.pdf", file_path="/dev/null",
+                    hash_sha256=f"{i}-{version}", version=version, uploaded_by=admin.id,
+                ))
+    db.commit()
+    asset_id = asset.id
+    db.close()
+
+    token = client.post("/api/v1/auth/login", data={"username": username, "password": "pass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get("/api/v1/assets", headers=headers)  # 预热认证用户缓存
+    return asset_id, record_id, headers
+
+
+@pytest.mark.parametrize("route,budget", ROUTE_BUDGETS.items())
+def test_route_query_budget(route, budget):
+    asset_id, record_id, headers = _setup(stage_count=4, materials_per_stage=3)
+    response_cache.clear()
+    with query_budget(budget):
+        resp = client.get(route.format(asset_id=asset_id, record_id=record_id), headers=headers)
+    assert resp.status_code == 200
+
+
+def test_full_detail_query_count_independent_of_history():
+    asset_id, _, headers = _setup(stage_count=1, materials_per_stage=1)
+    with count_queries() as small:
+        client.get(f"/api/v1/assets/{asset_id}/full", headers=headers)
+
+    asset_id, _, headers = _setup(stage_count=7, materials_per_stage=5, username="admin2")
+    with count_queries() as large:
+        resp = client.get(f"/api/v1/assets/{asset_id}/full", headers=headers)
+    assert len(large) == len(small)
+
+    data = resp.json()
+    assert data["organization"]["name"] == "测试公司"
+    assert [r["stage"] for r in data["stage_records"]] == [s.value for s in STAGE_ORDER[:7]]
+    record = data["stage_records"][0]
+    assert len(record["approvals"]) == 1
+    assert [(m["file_name"], m["version"]) for m in record["materials"]] == [(f"材料{i}.pdf", 2) for i in range(5)]
+
+
+def test_full_detail_respects_rbac():
+    asset_id, _, _ = _setup(stage_count=1, materials_per_stage=0)
+    from app.core.security import get_password_hash
+
+    db = TestingSessionLocal()
+    other = Organization(name="其他公司", org_type="enterprise")
+    db.add(other)
+    db.commit()
+    db.add(User(username="holder", hashed_password=get_password_hash("pass"), role="data_holder", org_id=other.id))
+    db.commit()
+    db.close()
+    token = client.post("/api/v1/auth/login", data={"username": "holder", "password": "pass"}).json()["access_token"]
+    resp = client.get(f"/api/v1/assets/{asset_id}/full", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 404
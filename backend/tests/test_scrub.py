@@ -0,0 +1,176 @@
+import hashlib
+import os
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from tests.conftest import TestingSessionLocal
+from app.main import app
+from app.models.material import MaterialBlob, MaterialScrubRun, StageMaterial
+from app.services import scrub_service
+from app.services.material_service import blob_path
+from app.services.scrub_service import Throttle, hash_file, run_scrub
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def scrub_settings(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.SCRUB_READ_CHUNK_SIZE", 4096)
+    monkeypatch.setattr("app.core.config.settings.SCRUB_CHECKPOINT_SECONDS", 0)
+
+
+def _setup(count=6):
+    """在 UPLOAD_DIR 下写入 count 个内容寻址文件并登记，返回按哈希排序的哈希列表"""
+    db = TestingSessionLocal()
+    hashes = []
+    for i in range(count):
+        content = f"材料{i}".encode() * (1000 * (i + 1))
+        hash_value = hashlib.sha256(content).hexdigest()
+        path = blob_path(hash_value)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        db.add(MaterialBlob(hash_sha256=hash_value, file_path=path, file_size=len(content), ref_count=1))
+        db.add(StageMaterial(stage_record_id=1, file_name=f"材料{i}.pdf", file_path=path, file_size=len(content), hash_sha256=hash_value))
+        hashes.append(hash_value)
+    db.commit()
+    db.close()
+    return sorted(hashes)
+
+
+def _blobs():
+    db = TestingSessionLocal()
+    try:
+        return {b.hash_sha256: b for b in db.query(MaterialBlob).all()}
+    finally:
+        db.close()
+
+
+def _headers(role):
+    db = TestingSessionLocal()
+    from app.models.user import User
+    from app.core.security import get_password_hash
+    db.add(User(username=f"scrub_{role}", hashed_password=get_password_hash("pass"), role=role))
+    db.commit()
+    db.close()
+    token = client.post("/api/v1/auth/login", data={"username": f"scrub_{role}", "password": "pass"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_scrub_detects_corruption_and_missing_files():
+    hashes = _setup()
+    with open(blob_path(hashes[1]), "r+b") as f:
+        f.seek(100)
+        f.write(b"\x00")  # 模拟位翻转
+    os.unlink(blob_path(hashes[4]))
+
+    run = run_scrub(TestingSessionLocal, workers=1)
+    assert run.status == "completed"
+    assert (run.scanned_blobs, run.mismatches, run.missing, run.errors) == (6, 1, 1, 0)
+    assert run.cursor == hashes[-1]
+
+    blobs = _blobs()
+    assert blobs[hashes[1]].verify_status == "mismatch" and blobs[hashes[1]].last_verified_at is None
+    assert blobs[hashes[4]].verify_status == "missing"
+    assert all(blobs[h].verify_status == "ok" and blobs[h].last_verified_at for h in hashes if h not in (hashes[1], hashes[4]))
+
+    resp = client.get("/api/v1/materials/integrity", headers=_headers("admin"))
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["run"]["status"] == "completed" and data["run"]["percent"] == 100.0
+    assert data["never_verified_blobs"] == 2
+    issues = {issue["hash_sha256"]: issue for issue in data["issues"]}
+    assert issues[hashes[1]]["status"] == "mismatch"
+    assert issues[hashes[1]]["actual_sha256"] != hashes[1]
+    assert issues[hashes[4]]["status"] == "missing"
+    assert len(issues[hashes[4]]["material_ids"]) == 1
+
+    assert client.get("/api/v1/materials/integrity", headers=_headers("data_holder")).status_code == 403
+
+
+def test_interrupted_scrub_resumes_from_checkpoint(monkeypatch):
+    hashes = _setup()
+    checked, fail = [], True
+    original = scrub_service.check_blob
+
+    def counting(path, expected, chunk_size, bytes_per_sec):
+        if len(checked) == 3 and fail:
+            raise RuntimeError("模拟进程被杀")
+        checked.append(expected)
+        return original(path, expected, chunk_size, bytes_per_sec)
+
+    monkeypatch.setattr(scrub_service, "check_blob", counting)
+    with pytest.raises(RuntimeError):
+        run_scrub(TestingSessionLocal, workers=1)
+    db = TestingSessionLocal()
+    run = db.query(MaterialScrubRun).one()
+    db.close()
+    assert run.status == "paused"
+    # 检查点之后已校验但未写库的文件会重做
+    cursor = run.cursor
+    assert cursor in [""] + hashes[:3] and run.scanned_blobs == len([h for h in hashes if h <= cursor])
+
+    fail, checked[:] = False, []
+    run = run_scrub(TestingSessionLocal, workers=1)
+    assert run.status == "completed" and run.id == 1
+    assert checked == [h for h in hashes if h > cursor]
+    assert all(b.verify_status == "ok" for b in _blobs().values())
+
+
+def test_time_window_pauses_and_next_run_continues():
+    _setup(10)
+    run = run_scrub(TestingSessionLocal, workers=1, max_seconds=1e-9)
+    assert run.status == "paused" and 0 < run.scanned_blobs < 10
+    run = run_scrub(TestingSessionLocal, workers=1)
+    assert run.status == "completed" and run.scanned_blobs == 10
+
+    run = run_scrub(TestingSessionLocal, workers=1, restart=True)
+    assert run.id == 2 and run.scanned_blobs == 10
+
+
+def test_status_rate_excludes_paused_time():
+    _setup(10)
+    run_scrub(TestingSessionLocal, workers=1, max_seconds=1e-9)
+    # 模拟暂停一整天后的下一个维护窗口
+    db = TestingSessionLocal()
+    run = db.query(MaterialScrubRun).one()
+    paused_active = run.active_seconds
+    run.started_at = run.started_at - timedelta(days=1)
+    db.commit()
+    db.close()
+    assert paused_active > 0
+
+    run = run_scrub(TestingSessionLocal, workers=1)
+    assert run.active_seconds > paused_active and run.active_seconds < 60
+
+    headers = _headers("admin")
+    data = client.get("/api/v1/materials/integrity", headers=headers).json()["run"]
+    assert data["active_seconds"] == round(run.active_seconds, 2)
+    assert data["mb_per_sec"] == round(run.scanned_bytes / run.active_seconds / 1024 / 1024, 2)
+    assert client.get("/api/v1/materials/integrity", params={"issue_limit": 0}, headers=headers).status_code == 422
+
+
+def test_process_pool_scrub():
+    hashes = _setup()
+    run = run_scrub(TestingSessionLocal, workers=2)
+    assert run.status == "completed" and run.scanned_blobs == 6 and run.mismatches == 0
+    assert all(b.verify_status == "ok" for b in _blobs().values())
+    assert run.scanned_bytes == sum(b.file_size for b in _blobs().values())
+    assert run.cursor == hashes[-1]
+
+
+def test_hash_file_with_bandwidth_limit(tmp_path):
+    path = tmp_path / "blob"
+    content = os.urandom(200 * 1024)
+    path.write_bytes(content)
+    assert hash_file(str(path), 64 * 1024) == hashlib.sha256(content).hexdigest()
+
+    started = time.monotonic()
+    assert hash_file(str(path), 64 * 1024, Throttle(1024 * 1024)) == hashlib.sha256(content).hexdigest()
+    assert time.monotonic() - started >= 0.15
+
+    empty = tmp_path / "empty"
+    empty.write_bytes(b"")
+    assert hash_file(str(empty), 4096) == hashlib.sha256(b"").hexdigest()
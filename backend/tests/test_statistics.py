@@ -0,0 +1,109 @@
+from fastapi.testclient import TestClient
+from tests.conftest import TestingSessionLocal
+from app.main import app
+from app.models.statistics import AssetStageSummary
+from app.services.statistics_service import reconcile_statistics
+
+client = TestClient(app)
+
+
+def _setup_users():
+    db = TestingSessionLocal()
+    from app.models.organization import Organization
+    from app.models.user import User
+    from app.core.security import get_password_hash
+
+    org = Organization(name="测试公司", org_type="enterprise")
+    other = Organization(name="其他公司", org_type="enterprise")
+    db.add_all([org, other])
+    db.commit()
+
+    db.add_all([
+        User(username="holder", hashed_password=get_password_hash("pass"), role="data_holder", org_id=org.id),
+        User(username="other", hashed_password=get_password_hash("pass"), role="data_holder", org_id=other.id),
+        User(username="registry", hashed_password=get_password_hash("pass"), role="registry_center", org_id=org.id),
+        User(username="assessor", hashed_password=get_password_hash("pass"), role="assessor", org_id=org.id),
+    ])
+    db.commit()
+    db.close()
+
+    return {
+        name: client.post("/api/v1/auth/login", data={"username": name, "password": "pass"}).json()["access_token"]
+        for name in ("holder", "other", "registry", "assessor")
+    }
+
+
+def _h(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _summary_snapshot():
+    db = TestingSessionLocal()
+    rows = db.query(AssetStageSummary).filter(AssetStageSummary.asset_count != 0).all()
+    snapshot = sorted((r.org_id, r.stage, r.asset_count, r.valued_count, float(r.valuation_total)) for r in rows)
+    db.close()
+    return snapshot
+
+
+def test_statistics_follow_lifecycle_and_valuation():
+    tokens = _setup_users()
+    a1 = client.post("/api/v1/assets", json={"name": "资产1"}, headers=_h(tokens["holder"])).json()
+    client.post("/api/v1/assets", json={"name": "资产2"}, headers=_h(tokens["holder"]))
+    client.post("/api/v1/assets", json={"name": "资产3"}, headers=_h(tokens["other"]))
+
+    record = client.post(f"/api/v1/stages/{a1['id']}/submit", headers=_h(tokens["holder"])).json()
+    client.post(f"/api/v1/stages/records/{record['id']}/approve", headers=_h(tokens["registry"]))
+    resp = client.put(f"/api/v1/assets/{a1['id']}/valuation", json={"valuation_amount": 1200.5}, headers=_h(tokens["assessor"]))
+    assert resp.status_code == 200
+    client.put(f"/api/v1/assets/{a1['id']}/valuation", json={"valuation_amount": 1000}, headers=_h(tokens["assessor"]))
+
+    city = client.get("/api/v1/statistics/city", headers=_h(tokens["registry"])).json()
+    assert city["total_assets"] == 3
+    assert city["org_count"] == 2
+    assert city["stage_distribution"] == [
+        {"stage": "resource_inventory", "count": 2},
+        {"stage": "asset_inventory", "count": 1},
+    ]
+
+    holder = client.get("/api/v1/statistics/holder", headers=_h(tokens["holder"])).json()
+    assert holder["total_assets"] == 2
+    assert holder["valued_count"] == 1
+    assert holder["total_valuation"] == 1000.0
+
+    # 增量维护的结果与全量重算一致
+    incremental = _summary_snapshot()
+    db = TestingSessionLocal()
+    reconcile_statistics(db)
+    db.close()
+    assert _summary_snapshot() == incremental
+
+
+def test_clear_valuation():
+    tokens = _setup_users()
+    asset = client.post("/api/v1/assets", json={"name": "资产"}, headers=_h(tokens["holder"])).json()
+    client.put(f"/api/v1/assets/{asset['id']}/valuation", json={"valuation_amount": 500}, headers=_h(tokens["assessor"]))
+    client.put(f"/api/v1/assets/{asset['id']}/valuation", json={"valuation_amount": None}, headers=_h(tokens["assessor"]))
+
+    holder = client.get("/api/v1/statistics/holder", headers=_h(tokens["holder"])).json()
+    assert holder["valued_count"] == 0
+    assert holder["total_valuation"] == 0
+
+
+def test_valuation_forbidden_for_holder():
+    tokens = _setup_users()
+    asset = client.post("/api/v1/assets", json={"name": "资产"}, headers=_h(tokens["holder"])).json()
+    resp = client.put(f"/api/v1/assets/{asset['id']}/valuation", json={"valuation_amount": 1}, headers=_h(tokens["holder"]))
+    assert resp.status_code == 403
+
+
+def test_reconcile_fixes_drift():
+    tokens = _setup_users()
+    client.post("/api/v1/assets", json={"name": "资产"}, headers=_h(tokens["holder"]))
+    db = TestingSessionLocal()
+    db.query(AssetStageSummary).update({AssetStageSummary.asset_count: 99})
+    db.commit()
+    assert reconcile_statistics(db) == 1
+    db.close()
+
+    city = client.get("/api/v1/statistics/city", headers=_h(tokens["registry"])).json()
+    assert city["total_assets"] == 1
@@ -0,0 +1,94 @@
+import hashlib
+from fastapi.testclient import TestClient
+from tests.test_materials import _setup_and_submit
+from app.main import app
+
+client = TestClient(app)
+
+CONTENT = bytes(range(256)) * 10  # 2560 bytes -> 3 parts of 1024
+
+
+def _start(record_id, headers, file_name="dataset.csv"):
+    resp = client.post(f"/api/v1/materials/upload/{record_id}/sessions", json={
+        "file_name": file_name, "file_type": "text/csv", "total_size": len(CONTENT), "part_size": 1024,
+    }, headers=headers)
+    assert resp.status_code == 200
+    return resp.json()
+
+
+def _put(session_id, n, headers, data=None, sha=None):
+    data = CONTENT[(n - 1) * 1024:n * 1024] if data is None else data
+    h = dict(headers)
+    h["X-Content-SHA256"] = sha or hashlib.sha256(data).hexdigest()
+    return client.put(f"/api/v1/materials/upload-sessions/{session_id}/parts/{n}", content=data, headers=h)
+
+
+def test_resumable_upload_out_of_order():
+    token, record_id = _setup_and_submit()
+    headers = {"Authorization": f"Bearer {token}"}
+    session = _start(record_id, headers)
+    assert session["total_parts"] == 3
+    assert session["missing_parts"] == [1, 2, 3]
+
+    assert _put(session["id"], 3, headers).status_code == 200
+    assert _put(session["id"], 1, headers).status_code == 200
+
+    status = client.get(f"/api/v1/materials/upload-sessions/{session['id']}", headers=headers).json()
+    assert status["received_ranges"] == [[0, 1024], [2048, 2560]]
+    assert status["missing_parts"] == [2]
+
+    resp = client.post(f"/api/v1/materials/upload-sessions/{session['id']}/complete", headers=headers)
+    assert resp.status_code == 400
+
+    assert _put(session["id"], 2, headers).status_code == 200
+    resp = client.post(f"/api/v1/materials/upload-sessions/{session['id']}/complete", headers=headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["hash_sha256"] == hashlib.sha256(CONTENT).hexdigest()
+    assert data["file_size"] == len(CONTENT)
+    assert data["version"] == 1
+
+
+def test_part_hash_mismatch_rejected():
+    token, record_id = _setup_and_submit()
+    headers = {"Authorization": f"Bearer {token}"}
+    session = _start(record_id, headers)
+
+    resp = _put(session["id"], 1, headers, sha="0" * 64)
+    assert resp.status_code == 400
+    status = client.get(f"/api/v1/materials/upload-sessions/{session['id']}", headers=headers).json()
+    assert status["missing_parts"] == [1, 2, 3]
+
+    resp = _put(session["id"], 1, headers, data=CONTENT[:1000])
+    assert resp.status_code == 400
+
+
+def test_session_follows_material_versioning():
+    token, record_id = _setup_and_submit()
+    headers = {"Authorization": f"Bearer {token}"}
+    client.post(f"/api/v1/materials/upload/{record_id}",
+                files={"file": ("dataset.csv", b"old", "text/csv")}, headers=headers)
+
+    session = _start(record_id, headers)
+    for n in (1, 2, 3):
+        _put(session["id"], n, headers)
+    resp = client.post(f"/api/v1/materials/upload-sessions/{session['id']}/complete", headers=headers)
+    assert resp.json()["version"] == 2
+
+    resp = _put(session["id"], 1, headers)
+    assert resp.status_code == 400
+
+
+def test_retried_complete_returns_same_material():
+    token, record_id = _setup_and_submit()
+    headers = {"Authorization": f"Bearer {token}"}
+    session = _start(record_id, headers)
+    for n in (1, 2, 3):
+        _put(session["id"], n, headers)
+    first = client.post(f"/api/v1/materials/upload-sessions/{session['id']}/complete", headers=headers)
+    retry = client.post(f"/api/v1/materials/upload-sessions/{session['id']}/complete", headers=headers)
+    assert first.status_code == retry.status_code == 200
+    assert retry.json()["id"] == first.json()["id"]
+
+    materials = client.get(f"/api/v1/materials/{record_id}", headers=headers).json()
+    assert [m["id"] for m in materials] == [first.json()["id"]]
@@ -0,0 +1,158 @@
+import pytest
+from fastapi.testclient import TestClient
+from tests.conftest import TestingSessionLocal
+from app.main import app
+from app.engine import workflow as workflow_module
+from app.engine.workflow import CompiledWorkflow, WorkflowError, BUILTIN_WORKFLOWS, get_workflow, load_workflows
+from app.models.asset import AssetStage, STAGE_ORDER
+
+client = TestClient(app)
+
+
+class _Asset:
+    def __init__(self, asset_type=None, data_classification=None):
+        self.asset_type = asset_type
+        self.data_classification = data_classification
+
+
+def _load_patched_workflows(monkeypatch):
+    # 编译结果也交给 monkeypatch 还原，测试结束时与配置一起恢复，不需要在 fixture 里 undo
+    for name in ("_workflows", "_by_asset_type", "_default"):
+        monkeypatch.setattr(workflow_module, name, getattr(workflow_module, name))
+    load_workflows()
+
+
+@pytest.fixture
+def parallel_for_datasets(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.ASSET_TYPE_WORKFLOWS", {"数据集": "parallel_review"})
+    _load_patched_workflows(monkeypatch)
+
+
+def test_standard_workflow_is_strict_chain():
+    standard = get_workflow("standard")
+    for current, expected in zip(STAGE_ORDER, STAGE_ORDER[1:] + [None]):
+        assert standard.next_stage(current) == expected
+    assert standard.prev_stage(AssetStage.ASSET_INVENTORY) == AssetStage.RESOURCE_INVENTORY
+
+
+def test_guard_skips_value_assessment_for_public_assets():
+    workflow = get_workflow("parallel_review")
+    assert workflow.next_stage(AssetStage.ACCOUNTING_GUIDANCE, _Asset(data_classification="公共")) == AssetStage.OPERATION
+    assert workflow.next_stage(AssetStage.ACCOUNTING_GUIDANCE, _Asset(data_classification="内部")) == AssetStage.VALUE_ASSESSMENT
+    assert workflow.next_stage(AssetStage.COMPLIANCE_ASSESSMENT) == AssetStage.ACCOUNTING_GUIDANCE
+
+
+def test_invalid_definitions_rejected():
+    with pytest.raises(WorkflowError):
+        CompiledWorkflow("bad", ["resource_inventory", "no_such_stage"])
+    with pytest.raises(WorkflowError):
+        CompiledWorkflow("bad", ["resource_inventory", "resource_inventory"])
+    with pytest.raises(WorkflowError):
+        CompiledWorkflow("bad", ["resource_inventory", {"stage": "operation", "when": "unknown"}])
+    with pytest.raises(WorkflowError):
+        CompiledWorkflow("bad", [{"stage": "resource_inventory", "reject_to": "operation"}, "operation"])
+    assert set(BUILTIN_WORKFLOWS) >= {"standard", "parallel_review"}
+
+
+def test_reject_transition():
+    assert get_workflow("standard").reject_stage(AssetStage.QUALITY_REPORT) == AssetStage.QUALITY_REPORT
+    workflow = CompiledWorkflow("custom", [
+        "resource_inventory",
+        "asset_inventory",
+        {"stage": ["compliance_assessment", "quality_report"], "reject_to": "asset_inventory"},
+        {"stage": "operation", "reject_to": "quality_report"},
+    ])
+    assert workflow.reject_stage(AssetStage.COMPLIANCE_ASSESSMENT) == AssetStage.ASSET_INVENTORY
+    # 退回到并行组时回到组的入口阶段
+    assert workflow.reject_stage(AssetStage.OPERATION) == AssetStage.COMPLIANCE_ASSESSMENT
+    assert workflow.reject_stage(AssetStage.RESOURCE_INVENTORY) == AssetStage.RESOURCE_INVENTORY
+
+
+@pytest.fixture
+def send_back_for_datasets(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.WORKFLOW_DEFINITIONS", {"send_back": [
+        "resource_inventory",
+        {"stage": ["compliance_assessment", "quality_report"], "reject_to": "resource_inventory"},
+        "operation",
+    ]})
+    monkeypatch.setattr("app.core.config.settings.ASSET_TYPE_WORKFLOWS", {"数据集": "send_back"})
+    _load_patched_workflows(monkeypatch)
+
+
+def _setup_users():
+    db = TestingSessionLocal()
+    from app.models.organization import Organization
+    from app.models.user import User
+    from app.core.security import get_password_hash
+
+    org = Organization(name="测试公司", org_type="enterprise")
+    db.add(org)
+    db.commit()
+    db.add_all([
+        User(username="holder", hashed_password=get_password_hash("pass"), role="data_holder", org_id=org.id),
+        User(username="registry", hashed_password=get_password_hash("pass"), role="registry_center", org_id=org.id),
+    ])
+    db.commit()
+    db.close()
+    h = client.post("/api/v1/auth/login", data={"username": "holder", "password": "pass"}).json()["access_token"]
+    r = client.post("/api/v1/auth/login", data={"username": "registry", "password": "pass"}).json()["access_token"]
+    return {"Authorization": f"Bearer {h}"}, {"Authorization": f"Bearer {r}"}
+
+
+def _advance(asset_id, holder, registry, stage=None):
+    params = {"stage": stage} if stage else None
+    record = client.post(f"/api/v1/stages/{asset_id}/submit", params=params, headers=holder)
+    assert record.status_code == 200, record.json()
+    resp = client.post(f"/api/v1/stages/records/{record.json()['id']}/approve", headers=registry)
+    assert resp.status_code == 200, resp.json()
+    return client.get(f"/api/v1/assets/{asset_id}", headers=holder).json()["current_stage"]
+
+
+def test_parallel_review_group(parallel_for_datasets):
+    holder, registry = _setup_users()
+    asset = client.post("/api/v1/assets", json={"name": "数据集A", "asset_type": "数据集", "data_classification": "公共"}, headers=holder).json()
+    for _ in range(3):
+        _advance(asset["id"], holder, registry)
+
+    # 合规与质量并行评审，两者都通过后才进入入账指导
+    assert _advance(asset["id"], holder, registry, "quality_report") == "compliance_assessment"
+    resp = client.post(f"/api/v1/stages/{asset['id']}/submit", params={"stage": "quality_report"}, headers=holder)
+    assert resp.status_code == 400
+    assert _advance(asset["id"], holder, registry, "compliance_assessment") == "accounting_guidance"
+
+    # 公共数据跳过价值评估
+    assert _advance(asset["id"], holder, registry) == "operation"
+
+
+def test_submit_stage_outside_current_step_rejected():
+    holder, _ = _setup_users()
+    asset = client.post("/api/v1/assets", json={"name": "资产"}, headers=holder).json()
+    resp = client.post(f"/api/v1/stages/{asset['id']}/submit", params={"stage": "quality_report"}, headers=holder)
+    assert resp.status_code == 400
+
+
+def test_reject_sends_asset_back(send_back_for_datasets):
+    holder, registry = _setup_users()
+    asset = client.post("/api/v1/assets", json={"name": "数据集B", "asset_type": "数据集"}, headers=holder).json()
+    assert _advance(asset["id"], holder, registry) == "compliance_assessment"
+
+    assert _advance(asset["id"], holder, registry, "quality_report") == "compliance_assessment"
+    record = client.post(f"/api/v1/stages/{asset['id']}/submit", params={"stage": "compliance_assessment"}, headers=holder).json()
+    resp = client.post(f"/api/v1/stages/records/{record['id']}/reject", json={"reason": "需补充"}, headers=registry)
+    assert resp.status_code == 200 and resp.json()["status"] == "rejected"
+    assert client.get(f"/api/v1/assets/{asset['id']}", headers=holder).json()["current_stage"] == "resource_inventory"
+
+    # 退回时组内其它待审批的阶段一并退回
+    assert _advance(asset["id"], holder, registry) == "compliance_assessment"
+    pending = client.post(f"/api/v1/stages/{asset['id']}/submit", params={"stage": "quality_report"}, headers=holder).json()
+    record = client.post(f"/api/v1/stages/{asset['id']}/submit", params={"stage": "compliance_assessment"}, headers=holder).json()
+    client.post(f"/api/v1/stages/records/{record['id']}/reject", json={"reason": "需补充"}, headers=registry)
+    db = TestingSessionLocal()
+    from app.models.stage import StageRecord, StageStatus
+    assert db.get(StageRecord, pending["id"]).status == StageStatus.REJECTED
+    db.close()
+
+    # 重新进入并行组后，上一轮的通过记录不再计入
+    assert _advance(asset["id"], holder, registry) == "compliance_assessment"
+    assert _advance(asset["id"], holder, registry, "compliance_assessment") == "compliance_assessment"
+    assert _advance(asset["id"], holder, registry, "quality_report") == "operation"
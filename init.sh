@@ -4,14 +4,13 @@ set -e
 echo "=== 数据资产管理平台 - 环境启动 ==="
 
 # 启动数据库
-docker compose up -d db
 echo "等待数据库就绪..."
-sleep 3
+docker compose up -d --wait db
 
 # 安装后端依赖并启动
 cd backend
 pip3 install -r requirements.txt -q
-python3 -m alembic upgrade head 2>/dev/null || true
+python3 -m alembic upgrade head
 python3 -m uvicorn app.main:app --host 0.0.0.0 --port 8000 &
 BACKEND_PID=$!
 cd ..